@@ -1,23 +1,29 @@
 import sys
 
-from core.database import init_db
+from core.database import close_connection, init_db
+from PyQt6.QtCore import QCoreApplication, Qt
 from PyQt6.QtWidgets import QApplication, QDialog
-from ui.main_window import MainWindow
 from ui.match_selector import MatchSelector
 
 
 def main():
     init_db()
+    # QtWebEngine is imported only when the embed player is first built, i.e.
+    # after the QApplication exists; Qt requires this attribute in that case.
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
+    # checkpoint the WAL and release the file on exit
+    app.aboutToQuit.connect(close_connection)
     # Show a small match selector at startup
     selector = MatchSelector()
     selected_match = None
-    # QDialog.exec() returns a DialogCode; compare against Accepted
-    from PyQt6.QtWidgets import QDialog as _QDialog
-
-    if selector.exec() == _QDialog.DialogCode.Accepted:
+    if selector.exec() == QDialog.DialogCode.Accepted:
         selected_match = selector.selected_match_id
 
+    # imported here so the selector appears without waiting for the main
+    # window's modules
+    from ui.main_window import MainWindow
+
     window = MainWindow(match_id=selected_match)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,173 @@
+"""Command-line entry point for headless use (no display, no Qt).
+
+    python -m app.cli [--db FILE] <command> ...
+
+Commands: init, list-matches, stats, export, import, vacuum, normalize.
+Only `core` and `controllers` are imported, so this runs on a server without
+PyQt6, QtWebEngine or yt_dlp installed; see benchmarks/bench_cli_startup.py
+for the startup time.
+
+Stdout carries the command output only: diagnostics of `core` ("[DB] ...")
+and errors go to stderr. Every command but `init` needs an existing
+database, so a mistyped --db fails instead of creating an empty one.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+# `core` and `controllers` are imported as top-level packages (as app.py does)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from controllers.evento_controller import EventoController  # noqa: E402
+from core import database  # noqa: E402
+
+
+def _tabella(intestazioni, righe):
+    """Print rows as left-aligned text columns."""
+    righe = [["" if v is None else str(v) for v in riga] for riga in righe]
+    larghezze = [
+        max([len(str(titolo))] + [len(riga[i]) for riga in righe])
+        for i, titolo in enumerate(intestazioni)
+    ]
+    for riga in [list(map(str, intestazioni))] + righe:
+        print("  ".join(v.ljust(w) for v, w in zip(riga, larghezze)).rstrip())
+
+
+def _init(controller, args):
+    print(f"database pronto: {args.db} (schema versione {database.init_db()})")
+    return 0
+
+
+def _list_matches(controller, args):
+    righe = controller.lista_matches()
+    _tabella(["id", "nome", "data", "home", "away", "eventi"], righe)
+    return 0
+
+
+def _stats(controller, args):
+    riepilogo = controller.riepilogo_match(args.match_id)
+    print(f"match {args.match_id}: {riepilogo['n_eventi']} eventi")
+    if not riepilogo["n_eventi"]:
+        return 0
+    righe = controller.statistiche_match(args.match_id, args.group_by, args.metric)
+    if righe:
+        _tabella(list(righe[0]), [list(r.values()) for r in righe])
+    return 0
+
+
+def _export(controller, args):
+    if args.matches:
+        scritte = controller.esporta_matches(args.file, args.format)
+    else:
+        scritte = controller.esporta_eventi(
+            args.file,
+            args.format,
+            match_id=args.match,
+            da_data=args.da,
+            a_data=args.a,
+            squadra=args.squadra,
+        )
+    print(f"{scritte} record esportati in {args.file}")
+    return 0
+
+
+def _import(controller, args):
+    esito = controller.importa_csv(
+        args.file, match_id=args.match, delimitatore=args.delimiter
+    )
+    print(esito.riepilogo())
+    return 0 if not esito.scartati else 2
+
+
+def _vacuum(controller, args):
+    prima, dopo = controller.manutenzione()
+    print(f"database compattato: {prima / 2**20:.1f} MiB -> {dopo / 2**20:.1f} MiB")
+    return 0
+
+
+def _normalize(controller, args):
+    convertiti = controller.normalizza_database(args.file)
+    prima, dopo = os.path.getsize(args.db), os.path.getsize(args.file)
+    print(f"{convertiti} eventi convertiti in {args.file}")
+    print(f"dimensione: {prima / 2**20:.1f} MiB -> {dopo / 2**20:.1f} MiB")
+    return 0
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli", description="Analisi Rugby, riga di comando"
+    )
+    parser.add_argument("--db", default=database.DB_NAME, help="file del database")
+    comandi = parser.add_subparsers(dest="comando", required=True)
+
+    p = comandi.add_parser("init", help="crea o aggiorna il database")
+    p.set_defaults(esegui=_init)
+
+    p = comandi.add_parser("list-matches", help="elenca i match")
+    p.set_defaults(esegui=_list_matches)
+
+    p = comandi.add_parser("stats", help="statistiche di un match")
+    p.add_argument("match_id", type=int)
+    p.add_argument(
+        "--group-by",
+        nargs="*",
+        default=["evento_principale", "esito"],
+        help="colonne di raggruppamento",
+    )
+    p.add_argument(
+        "--metric",
+        nargs="+",
+        default=["count", "avg:num_fasi"],
+        help="metriche: count o funzione:colonna (es. avg:num_fasi)",
+    )
+    p.set_defaults(esegui=_stats)
+
+    p = comandi.add_parser("export", help="esporta eventi in CSV, XLSX o Parquet")
+    p.add_argument("file", help="file di destinazione (.csv, .xlsx, .parquet)")
+    p.add_argument("--format", choices=["csv", "xlsx", "parquet"])
+    p.add_argument("--match", type=int, help="solo gli eventi di questo match")
+    p.add_argument("--da", help="dalla data (gg/mm/aaaa)")
+    p.add_argument("--a", help="alla data (gg/mm/aaaa)")
+    p.add_argument("--squadra", help="solo gli eventi di questa squadra")
+    p.add_argument("--matches", action="store_true", help="esporta l'elenco match")
+    p.set_defaults(esegui=_export)
+
+    p = comandi.add_parser("import", help="importa eventi da un CSV")
+    p.add_argument("file")
+    p.add_argument("--match", type=int, help="collega gli eventi a questo match")
+    p.add_argument("--delimiter", help="separatore (default: rilevato)")
+    p.set_defaults(esegui=_import)
+
+    p = comandi.add_parser("vacuum", help="ottimizza e compatta il database")
+    p.set_defaults(esegui=_vacuum)
+
+    p = comandi.add_parser(
+        "normalize", help="scrive una copia del database con layout normalizzato"
+    )
+    p.add_argument("file", help="nuovo file del database (non deve esistere)")
+    p.set_defaults(esegui=_normalize)
+    return parser
+
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    if args.esegui is not _init and not os.path.exists(args.db):
+        print(f"errore: database non trovato: {args.db}", file=sys.stderr)
+        return 1
+    database.DB_NAME = args.db
+    controller = EventoController()
+    try:
+        database.init_db()
+        return args.esegui(controller, args)
+    except (OSError, ValueError, ImportError, sqlite3.DatabaseError) as e:
+        print(f"errore: {e}", file=sys.stderr)
+        return 1
+    finally:
+        controller.shutdown()
+        database.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
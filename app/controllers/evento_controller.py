@@ -1,21 +1,110 @@
-from core import services
+from concurrent.futures import Future
+
+from core import database, dizionario, export, importer, services
 
 
 class EventoController:
+    def __init__(self):
+        # created on first async write, see _scrittore()
+        self._write_behind = None
+
+    def _scrittore(self):
+        if self._write_behind is None:
+            # imported here: headless callers (app.cli) never write async
+            from core.write_behind import WriteBehindExecutor
+
+            self._write_behind = WriteBehindExecutor()
+        return self._write_behind
+
+    def flush(self):
+        """Wait for queued async writes, so the next read or write sees them.
+
+        Writes and the reads meant for worker threads (itera_*, exports,
+        video_urls_match) call it first; the other reads don't block on the
+        writer and see committed data only: on the UI thread, read once
+        flush_async() is done to include the queued writes.
+        """
+        if self._write_behind is not None:
+            self._write_behind.flush()
+
+    def flush_async(self):
+        """Future resolved once the async writes queued so far are committed."""
+        if self._write_behind is None:
+            fatto = Future()
+            fatto.set_result(None)
+            return fatto
+        return self._write_behind.flush_async()
+
+    def shutdown(self):
+        """Flush queued async writes and stop the writer thread."""
+        if self._write_behind is not None:
+            self._write_behind.shutdown()
+            self._write_behind = None
+
     def salva_evento(self, data):
+        self.flush()
         return services.salva_evento(data)
 
     def modifica_evento(self, evento_id, data):
-        services.modifica_evento(evento_id, data)
+        self.flush()
+        services.modifica_evento(self.id_reale(evento_id), data)
+
+    # Write-behind: return immediately, the write is applied on a background
+    # thread (see core.write_behind). Ids may be provisional (negative).
+    def salva_evento_async(self, data):
+        """Return (provisional id, Future of the real id)."""
+        return self._scrittore().salva(data)
+
+    def modifica_evento_async(self, evento_id, data):
+        return self._scrittore().modifica(evento_id, data)
+
+    def elimina_evento_async(self, evento_id):
+        return self._scrittore().elimina(evento_id)
+
+    def id_reale(self, evento_id):
+        if self._write_behind is None:
+            return evento_id
+        return self._write_behind.id_reale(evento_id)
+
+    def salva_eventi_batch(self, eventi):
+        self.flush()
+        return services.salva_eventi_batch(eventi)
+
+    def modifica_eventi_batch(self, eventi):
+        self.flush()
+        return services.modifica_eventi_batch(eventi)
 
     def elimina_evento(self, evento_id):
-        services.elimina_evento(evento_id)
+        self.flush()
+        services.elimina_evento(self.id_reale(evento_id))
 
     def lista_eventi_filtrati(self, data, squadra_home, squadra_away, minuto_kickoff):
         return services.lista_eventi_filtrati(
             data, squadra_home, squadra_away, minuto_kickoff
         )
 
+    def pagina_eventi_filtrati(
+        self,
+        data,
+        squadra_home,
+        squadra_away,
+        minuto_kickoff,
+        after_id=None,
+        limit=services.PAGINA_EVENTI,
+        colonne=None,
+    ):
+        return services.pagina_eventi_filtrati(
+            data, squadra_home, squadra_away, minuto_kickoff, after_id, limit, colonne
+        )
+
+    def itera_eventi_filtrati(
+        self, data, squadra_home, squadra_away, minuto_kickoff, colonne=None
+    ):
+        self.flush()
+        return services.itera_eventi_filtrati(
+            data, squadra_home, squadra_away, minuto_kickoff, colonne
+        )
+
     # Match related
     def salva_match(self, match):
         return services.salva_match(match)
@@ -26,18 +115,101 @@ class EventoController:
     def get_match(self, match_id):
         return services.get_match(match_id)
 
+    def riepilogo_match(self, match_id):
+        return services.riepilogo_match(match_id)
+
+    def video_urls_match(self, match_id):
+        self.flush()
+        return services.video_urls_match(match_id)
+
     def lista_eventi_per_match(self, match_id):
         return services.lista_eventi_per_match(match_id)
 
+    def pagina_eventi_per_match(
+        self, match_id, after_id=None, limit=services.PAGINA_EVENTI, colonne=None
+    ):
+        return services.pagina_eventi_per_match(match_id, after_id, limit, colonne)
+
+    def itera_eventi_per_match(self, match_id, colonne=None):
+        self.flush()
+        return services.itera_eventi_per_match(match_id, colonne)
+
+    def lista_eventi_intervallo(self, match_id, from_ms, to_ms):
+        return services.lista_eventi_intervallo(match_id, from_ms, to_ms)
+
+    def cerca_eventi(self, query, match_id=None, limit=50):
+        return services.cerca_eventi(query, match_id, limit)
+
+    def statistiche_match(
+        self, match_id, group_by=("evento_principale",), metrics=("count",)
+    ):
+        return services.statistiche_match(match_id, group_by, metrics)
+
     def link_events_to_match(
         self, match_id, data, squadra_home, squadra_away, minuto_kickoff
     ):
+        self.flush()
         return services.link_events_to_match(
             match_id, data, squadra_home, squadra_away, minuto_kickoff
         )
 
+    def conta_eventi(self, match_id=None, da_data=None, a_data=None, squadra=None):
+        return services.conta_eventi(match_id, da_data, a_data, squadra)
+
+    def itera_eventi(
+        self, match_id=None, da_data=None, a_data=None, squadra=None, colonne=None
+    ):
+        self.flush()
+        return services.itera_eventi(match_id, da_data, a_data, squadra, colonne)
+
+    # Export (see core.export); `progresso(righe)` returning False cancels
+    def esporta_eventi(
+        self,
+        percorso,
+        formato=None,
+        match_id=None,
+        da_data=None,
+        a_data=None,
+        squadra=None,
+        progresso=None,
+    ):
+        self.flush()
+        return export.esporta_eventi(
+            percorso,
+            formato,
+            match_id=match_id,
+            da_data=da_data,
+            a_data=a_data,
+            squadra=squadra,
+            progresso=progresso,
+        )
+
+    def esporta_matches(self, percorso, formato=None, progresso=None):
+        self.flush()
+        return export.esporta_matches(percorso, formato, progresso)
+
+    def importa_csv(self, percorso, match_id=None, delimitatore=None, progresso=None):
+        """Bulk import a tagging sheet (see core.importer); returns EsitoImport."""
+        self.flush()
+        return importer.importa_csv(
+            percorso, match_id=match_id, delimitatore=delimitatore, progresso=progresso
+        )
+
+    def manutenzione(self):
+        """Optimize the search index and VACUUM; returns (bytes before, after)."""
+        self.flush()
+        services.ottimizza_ricerca()
+        return database.vacuum()
+
+    def normalizza_database(self, destinazione):
+        """Write a dictionary-encoded copy of the database (see core.dizionario);
+        returns the events converted."""
+        self.flush()
+        return dizionario.converti_database(database.DB_NAME, destinazione)
+
     def modifica_match(self, match_id, match):
         return services.modifica_match(match_id, match)
 
     def elimina_match(self, match_id):
+        self.flush()
         return services.elimina_match(match_id)
@@ -1,70 +1,115 @@
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
 
 DB_NAME = "analisi_rugby.db"
 
+# Pragmas applied once to every connection handed out by get_connection().
+# WAL lets the UI keep reading while a save is being written, and with WAL
+# synchronous=NORMAL only fsyncs at checkpoints instead of on every commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # negative = KiB, i.e. ~16 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+_local = threading.local()
+
+
+def _open_connection(path):
+    # isolation_level=None: we manage BEGIN/COMMIT ourselves in transaction()
+    conn = sqlite3.connect(path, isolation_level=None)
+    for pragma in PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.DatabaseError:
+            # e.g. WAL is not available on some network filesystems
+            pass
+    return conn
+
 
 def get_connection():
-    return sqlite3.connect(DB_NAME)
+    """Return the connection for the current thread, opening it on first use.
 
+    Connections are reused for the lifetime of the thread. If `DB_NAME` has
+    been changed since the connection was opened, the old one is closed and
+    a new one is opened on the new path.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DB_NAME:
+        return conn
+    close_connection()
+    conn = _open_connection(DB_NAME)
+    _local.conn = conn
+    _local.path = DB_NAME
+    return conn
 
-def init_db():
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute(
-        """
-    CREATE TABLE IF NOT EXISTS eventi (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        data TEXT,
-        squadra_home TEXT,
-        squadra_away TEXT,
-        giocatore TEXT,
-        minuto TEXT,
-        minuto_kickoff TEXT,
-        tipo_fase TEXT,
-        evento_principale TEXT,
-        origine_possesso TEXT,
-        num_fasi INTEGER,
-        zona TEXT,
-        esito TEXT,
-        linea_guadagno TEXT,
-        velocita_ruck TEXT,
-        penalita TEXT,
-        commento TEXT,
-        video_url TEXT,
-        match_id INTEGER
-    )
+
+def close_connection():
+    """Close the current thread's connection (if any)."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    _local.path = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@contextmanager
+def transaction():
+    """Run a block inside a single transaction and yield a cursor.
+
+    Commits when the block exits normally and rolls back if it raises.
+    Nested calls join the outer transaction, so a services function can be
+    called from within another transaction without committing early.
     """
-    )
-    # If the table exists but the column 'video_url' was added later, ensure the column exists.
+    conn = get_connection()
+    cursor = conn.cursor()
+    if conn.in_transaction:
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+        return
+    conn.execute("BEGIN")
     try:
-        c.execute("PRAGMA table_info(eventi)")
-        cols = [r[1] for r in c.fetchall()]
-        if "video_url" not in cols:
-            c.execute("ALTER TABLE eventi ADD COLUMN video_url TEXT")
-        if "match_id" not in cols:
-            c.execute("ALTER TABLE eventi ADD COLUMN match_id INTEGER")
+        yield cursor
         conn.commit()
-    except Exception:
-        # Don't fail initialization on migration issues; leave DB as-is
-        pass
+    except BaseException:
+        # also when commit() itself fails (e.g. SQLITE_BUSY): release the lock
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
 
-    # Ensure matches table exists
-    try:
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS matches (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data TEXT,
-            squadra_home TEXT,
-            squadra_away TEXT,
-            minuto_kickoff TEXT,
-            video_url TEXT,
-            name TEXT
-        )
-        """
+
+def vacuum():
+    """Checkpoint the WAL, rebuild the file without free pages and refresh the
+    planner statistics. Returns the file size in bytes (before, after)."""
+
+    def dimensione():
+        return sum(
+            os.path.getsize(DB_NAME + suffisso)
+            for suffisso in ("", "-wal")
+            if os.path.exists(DB_NAME + suffisso)
         )
-        conn.commit()
-    except Exception:
-        pass
-    conn.commit()
-    conn.close()
+
+    conn = get_connection()
+    prima = dimensione()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA optimize")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return prima, dimensione()
+
+
+def init_db():
+    """Create or upgrade the schema to the latest version (see core.migrations)."""
+    from core.migrations import migrate
+
+    return migrate()
@@ -0,0 +1,190 @@
+"""Dictionary-encoded (normalized) storage layout for events.
+
+In the normalized layout teams, players and every categorical field are
+stored once in small lookup tables and `eventi_norm` only holds integer
+codes. The `eventi_v` view decodes them back, with the same columns in the
+same order as `SELECT * FROM eventi`, so code written against the tuple
+shape of `eventi` can read a normalized database unchanged.
+
+`converti_database()` is the one-shot converter: it reads an existing
+database and writes a new, normalized file next to it; run it with
+`python -m app.cli normalize FILE`. The app itself keeps using the plain
+`eventi` table; see benchmarks/bench_dizionario.py for the size and latency
+comparison between the two layouts.
+"""
+
+import os
+import sqlite3
+
+from core.models import COLONNE_EVENTI, VOCABOLARI
+from core.utils import parse_minuto_to_ms
+
+CAMPI_CATEGORICI = tuple(VOCABOLARI)
+
+# column in `eventi` -> lookup table holding its values
+TABELLE_LOOKUP = {
+    "squadra_home": "teams",
+    "squadra_away": "teams",
+    "giocatore": "players",
+    **{campo: f"lk_{campo}" for campo in CAMPI_CATEGORICI},
+}
+
+
+def _colonna_codice(campo):
+    return f"{campo}_id" if campo in TABELLE_LOOKUP else campo
+
+
+def crea_schema(conn):
+    """Create lookup tables, `eventi_norm`, its indexes and the `eventi_v` view."""
+    for tabella in sorted(set(TABELLE_LOOKUP.values())):
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {tabella} "
+            "(id INTEGER PRIMARY KEY, valore TEXT NOT NULL UNIQUE)"
+        )
+
+    colonne = []
+    for campo in COLONNE_EVENTI[1:]:
+        if campo in TABELLE_LOOKUP:
+            colonne.append(
+                f"{campo}_id INTEGER REFERENCES {TABELLE_LOOKUP[campo]}(id)"
+            )
+        elif campo in ("num_fasi", "match_id", "minuto_ms"):
+            colonne.append(f"{campo} INTEGER")
+        else:
+            colonne.append(f"{campo} TEXT")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS eventi_norm "
+        f"(id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(colonne)})"
+    )
+    # same query shapes as the indexes on `eventi` (see core.migrations)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_eventi_norm_sessione ON eventi_norm "
+        "(data, squadra_home_id, squadra_away_id, minuto_kickoff, id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_eventi_norm_match ON eventi_norm (match_id, id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_eventi_norm_match_minuto "
+        "ON eventi_norm (match_id, minuto_ms)"
+    )
+
+    select = []
+    join = []
+    for campo in COLONNE_EVENTI:
+        if campo in TABELLE_LOOKUP:
+            alias = f"t_{campo}"
+            select.append(f"{alias}.valore AS {campo}")
+            join.append(
+                f"LEFT JOIN {TABELLE_LOOKUP[campo]} {alias} "
+                f"ON {alias}.id = e.{campo}_id"
+            )
+        else:
+            select.append(f"e.{campo}")
+    conn.execute(
+        f"CREATE VIEW IF NOT EXISTS eventi_v AS SELECT {', '.join(select)} "
+        f"FROM eventi_norm e {' '.join(join)}"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT,
+            squadra_home TEXT,
+            squadra_away TEXT,
+            minuto_kickoff TEXT,
+            video_url TEXT,
+            name TEXT
+        )
+        """
+    )
+
+
+class Codificatore:
+    """Assign and cache integer codes for lookup values, inserting new ones.
+
+    Categorical lookups are seeded with the form vocabularies so the common
+    values get the same small codes in every converted database.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._codici = {}
+        for tabella in set(TABELLE_LOOKUP.values()):
+            righe = conn.execute(f"SELECT valore, id FROM {tabella}").fetchall()
+            self._codici[tabella] = dict(righe)
+        for campo in CAMPI_CATEGORICI:
+            for valore in VOCABOLARI[campo]:
+                self.codice(TABELLE_LOOKUP[campo], valore)
+
+    def codice(self, tabella, valore):
+        if valore is None:
+            return None
+        codici = self._codici[tabella]
+        codice = codici.get(valore)
+        if codice is None:
+            codice = len(codici) + 1
+            self._conn.execute(
+                f"INSERT INTO {tabella} (id, valore) VALUES (?, ?)", (codice, valore)
+            )
+            codici[valore] = codice
+        return codice
+
+    def codifica(self, campi):
+        """Encode a {column: value} mapping into an `eventi_norm` row tuple."""
+        riga = []
+        for campo in COLONNE_EVENTI:
+            valore = campi.get(campo)
+            if campo in TABELLE_LOOKUP:
+                valore = self.codice(TABELLE_LOOKUP[campo], valore)
+            riga.append(valore)
+        return tuple(riga)
+
+
+def converti_database(sorgente, destinazione, chunk_size=5000):
+    """Write a normalized copy of the database at `sorgente` to `destinazione`.
+
+    The source is opened read-only and left untouched; ids of events and
+    matches are preserved. Returns the number of events converted.
+    """
+    if os.path.exists(destinazione):
+        raise FileExistsError(destinazione)
+
+    src = sqlite3.connect(f"file:{sorgente}?mode=ro", uri=True)
+    dst = sqlite3.connect(destinazione)
+    try:
+        crea_schema(dst)
+        codificatore = Codificatore(dst)
+
+        matches = src.execute(
+            "SELECT id, data, squadra_home, squadra_away, minuto_kickoff, video_url, name "
+            "FROM matches"
+        ).fetchall()
+        dst.executemany("INSERT INTO matches VALUES (?, ?, ?, ?, ?, ?, ?)", matches)
+
+        # select by name: legacy databases may have a different column order
+        disponibili = {r[1] for r in src.execute("PRAGMA table_info(eventi)")}
+        colonne = [c for c in COLONNE_EVENTI if c in disponibili]
+        inserisci = (
+            f"INSERT INTO eventi_norm ({', '.join(map(_colonna_codice, COLONNE_EVENTI))}) "
+            f"VALUES ({', '.join('?' * len(COLONNE_EVENTI))})"
+        )
+        cur = src.execute(f"SELECT {', '.join(colonne)} FROM eventi ORDER BY id")
+        convertiti = 0
+        while True:
+            righe = cur.fetchmany(chunk_size)
+            if not righe:
+                break
+            campi = [dict(zip(colonne, r)) for r in righe]
+            if "minuto_ms" not in disponibili:
+                for evento in campi:
+                    evento["minuto_ms"] = parse_minuto_to_ms(evento.get("minuto"))
+            dst.executemany(inserisci, [codificatore.codifica(e) for e in campi])
+            dst.commit()
+            convertiti += len(righe)
+        dst.commit()
+        return convertiti
+    finally:
+        src.close()
+        dst.close()
@@ -0,0 +1,253 @@
+"""Columnar, in-memory batch of events for analytics.
+
+`EventBatch` keeps each column of `eventi` as a NumPy array:
+
+- categorical columns (teams, player, date and the form fields) hold integer
+  codes (uint8 while the vocabulary fits in a byte) plus a vocabulary
+  (code -> value), seeded with VOCABOLARI so the form values get the same
+  small codes in every batch;
+- numeric columns (id, match_id, num_fasi, minuto_ms) hold int64, with
+  NULLO (-1) standing for NULL. Values that are not integers (legacy rows
+  with num_fasi "" or free text) are stored as NULLO too.
+
+Selections are boolean masks: a categorical filter indexes a per-code lookup
+table with the code column, numeric ranges and time windows are array
+comparisons, masks are combined with `&`, and group-by counts are one
+`np.bincount` over the combined codes. No operation loops over events in
+Python; only building the batch does (strings to codes), one block at a time.
+Build a batch with `EventBatch.da_database()` (one query per block of rows,
+see services.righe_eventi) or `EventBatch.da_righe()`.
+"""
+
+from itertools import islice
+
+import numpy as np
+
+from core import services
+from core.models import COLONNE_EVENTI, VOCABOLARI
+
+CATEGORICHE = (
+    "data",
+    "squadra_home",
+    "squadra_away",
+    "giocatore",
+    "tipo_fase",
+    "evento_principale",
+    "origine_possesso",
+    "zona",
+    "esito",
+    "linea_guadagno",
+    "velocita_ruck",
+    "penalita",
+)
+NUMERICHE = ("id", "match_id", "num_fasi", "minuto_ms")
+
+# NULL (or not an integer) in the numeric columns
+NULLO = -1
+
+# rows transposed at a time while building a batch
+BLOCCO = 10000
+
+# conta_per counts with a dense bincount up to this many value combinations
+MAX_COMBINAZIONI = 1 << 22
+
+
+class _Codici(dict):
+    """value -> code, assigning the next code to unseen values."""
+
+    def __missing__(self, valore):
+        codice = self[valore] = len(self)
+        return codice
+
+
+class EventBatch:
+    def __init__(self, colonne, vocabolari):
+        """`colonne`: {name: 1-D array}, all the same length; `vocabolari`:
+        {categorical name: list of values, indexed by code}."""
+        self.colonne = colonne
+        self.vocabolari = vocabolari
+        self._n = len(next(iter(colonne.values()))) if colonne else 0
+
+    # --- construction ---
+    @classmethod
+    def da_database(cls, match_id=None, colonne=None):
+        """Load a match (or every event) from the database.
+
+        By default only the columns a batch stores are selected.
+        """
+        if colonne is None:
+            colonne = [c for c in COLONNE_EVENTI if c in CATEGORICHE + NUMERICHE]
+        colonne = ["id"] + [c for c in colonne if c != "id"]
+        righe = services.righe_eventi(colonne, match_id)
+        try:
+            return cls.da_righe(righe, colonne)
+        finally:
+            righe.close()
+
+    @classmethod
+    def da_righe(cls, righe, colonne=COLONNE_EVENTI, chunk_size=BLOCCO):
+        """Build a batch from tuples whose values follow `colonne`.
+
+        Rows are transposed `chunk_size` at a time and each column block is
+        converted to an array in one call. Columns that are neither
+        categorical nor numeric (commento, minuto, ...) are skipped.
+        """
+        codici = {}
+        pezzi = {}
+        for campo in colonne:
+            if campo in CATEGORICHE:
+                codici[campo] = _Codici(
+                    (v, c) for c, v in enumerate(VOCABOLARI.get(campo, ()))
+                )
+            if campo in CATEGORICHE or campo in NUMERICHE:
+                pezzi[campo] = []
+
+        righe = iter(righe)
+        while True:
+            blocco = list(islice(righe, chunk_size))
+            if not blocco:
+                break
+            for campo, valori in zip(colonne, zip(*blocco)):
+                if campo in codici:
+                    codice = codici[campo].__getitem__
+                    pezzi[campo].append(
+                        np.fromiter(map(codice, valori), np.int64, len(valori))
+                    )
+                elif campo in pezzi:
+                    pezzi[campo].append(_interi(valori))
+
+        dati = {}
+        vocabolari = {}
+        for campo, parti in pezzi.items():
+            colonna = np.concatenate(parti) if parti else np.empty(0, np.int64)
+            if campo in codici:
+                vocabolari[campo] = list(codici[campo])
+                colonna = colonna.astype(_tipo_codici(len(vocabolari[campo])))
+            dati[campo] = colonna
+        return cls(dati, vocabolari)
+
+    def __len__(self):
+        return self._n
+
+    # --- access ---
+    def valori(self, campo):
+        """A column as Python values (categorical codes decoded, NULL as None)."""
+        colonna = self.colonne[campo].tolist()
+        if campo in self.vocabolari:
+            vocabolario = self.vocabolari[campo]
+            return [vocabolario[c] for c in colonna]
+        return [None if v == NULLO else v for v in colonna]
+
+    # --- selections ---
+    def maschera(self, finestra=None, **condizioni):
+        """Boolean array, one per event: AND of every condition given.
+
+        `campo=valore` or `campo=[valori]` for categorical columns,
+        `campo=(minimo, massimo)` (inclusive, NULL never matches) for numeric
+        ones and `finestra=(da_ms, a_ms)` for a match-time window. No
+        conditions select everything.
+        """
+        maschere = [self._maschera_campo(c, v) for c, v in condizioni.items()]
+        if finestra is not None:
+            maschere.append(self._maschera_finestra(*finestra))
+        return combina(maschere, self._n)
+
+    def filtra(self, finestra=None, **condizioni):
+        """New batch with the selected events (same vocabularies)."""
+        maschera = self.maschera(finestra, **condizioni)
+        colonne = {campo: colonna[maschera] for campo, colonna in self.colonne.items()}
+        return EventBatch(colonne, self.vocabolari)
+
+    def conta_per(self, *campi, finestra=None, **condizioni):
+        """{value: count} grouped by one categorical column, or
+        {(value, value, ...): count} for several, over the selected events,
+        most frequent first."""
+        if not campi:
+            raise ValueError("Indicare almeno una colonna di raggruppamento")
+        for campo in campi:
+            if campo not in self.vocabolari:
+                raise ValueError(f"Colonna non categorica: {campo}")
+        colonne = [self.colonne[campo] for campo in campi]
+        dimensioni = [len(self.vocabolari[campo]) for campo in campi]
+        if condizioni or finestra is not None:
+            maschera = self.maschera(finestra, **condizioni)
+            colonne = [colonna[maschera] for colonna in colonne]
+
+        # one int64 key per event: the codes in mixed radix
+        chiavi = np.ravel_multi_index(colonne, dimensioni) if colonne[0].size else None
+        if chiavi is None:
+            presenti = conteggi = np.empty(0, np.int64)
+        elif np.prod(dimensioni, dtype=np.int64) <= MAX_COMBINAZIONI:
+            tutti = np.bincount(chiavi, minlength=int(np.prod(dimensioni)))
+            presenti = np.flatnonzero(tutti)
+            conteggi = tutti[presenti]
+        else:
+            presenti, conteggi = np.unique(chiavi, return_counts=True)
+        # most frequent first; ties in code order
+        ordine = np.argsort(-conteggi, kind="stable")
+        presenti, conteggi = presenti[ordine], conteggi[ordine]
+        codici = np.unravel_index(presenti, dimensioni)
+
+        vocabolari = [self.vocabolari[campo] for campo in campi]
+        risultato = {}
+        for i, n in enumerate(conteggi.tolist()):
+            chiave = tuple(v[c[i]] for v, c in zip(vocabolari, codici))
+            risultato[chiave[0] if len(campi) == 1 else chiave] = n
+        return risultato
+
+    def _maschera_campo(self, campo, valore):
+        if campo in self.vocabolari:
+            valori = [valore] if isinstance(valore, str) or valore is None else valore
+            vocabolario = self.vocabolari[campo]
+            tabella = np.zeros(len(vocabolario), dtype=bool)
+            tabella[[vocabolario.index(v) for v in valori if v in vocabolario]] = True
+            return tabella[self.colonne[campo]]
+        if campo in self.colonne:
+            minimo, massimo = valore
+            colonna = self.colonne[campo]
+            return (colonna >= minimo) & (colonna <= massimo) & (colonna != NULLO)
+        raise ValueError(f"Colonna sconosciuta: {campo}")
+
+    def _maschera_finestra(self, da_ms, a_ms):
+        if "minuto_ms" not in self.colonne:
+            raise ValueError("Colonna minuto_ms non caricata")
+        minuti = self.colonne["minuto_ms"]
+        da_ms = max(da_ms, 0)  # NULL (-1) never matches
+        return (minuti >= da_ms) & (minuti <= a_ms)
+
+
+def _tipo_codici(n):
+    """Narrowest unsigned dtype for codes 0..n-1."""
+    if n <= 1 << 8:
+        return np.uint8
+    if n <= 1 << 16:
+        return np.uint16
+    return np.uint32
+
+
+def _interi(valori):
+    """int64 array of a numeric column block; None and non-integers -> NULLO."""
+    colonna = np.array(valori)
+    if colonna.dtype.kind in "iu":
+        return colonna.astype(np.int64, copy=False)
+    # NULLs or legacy text ("" in num_fasi): convert value by value
+    return np.fromiter(map(_intero, valori), np.int64, len(valori))
+
+
+def _intero(valore):
+    if type(valore) is int:
+        return valore
+    try:
+        return int(str(valore).strip())
+    except ValueError:
+        return NULLO
+
+
+def combina(maschere, n):
+    """AND of boolean masks of length n (all True when there are none)."""
+    if not maschere:
+        return np.ones(n, dtype=bool)
+    risultato = maschere[0]
+    for maschera in maschere[1:]:
+        risultato = risultato & maschera
+    return risultato
@@ -0,0 +1,215 @@
+"""Export events and matches to CSV, Excel (xlsx) or Parquet.
+
+Rows are streamed from the database a page at a time (services.itera_eventi)
+straight into the writer, so memory use does not grow with the number of
+exported rows:
+
+- CSV goes through the `csv` module;
+- xlsx uses an openpyxl write-only workbook (rows are serialized as they
+  are appended);
+- Parquet is written with pyarrow, one row group every RIGHE_PER_GRUPPO rows.
+
+openpyxl and pyarrow are only imported when their format is requested.
+The file is written next to the destination and renamed at the end, so a
+failed or cancelled export never leaves a truncated file behind.
+"""
+
+import csv
+import importlib
+import os
+from operator import attrgetter
+
+from core import services
+from core.models import COLONNE_EVENTI
+
+FORMATI = ("csv", "xlsx", "parquet")
+
+# format -> (module, pip package) needed to write it
+DIPENDENZE = {"xlsx": ("openpyxl", "openpyxl"), "parquet": ("pyarrow", "pyarrow")}
+
+# columns exported by default: everything but internal bookkeeping
+COLONNE_EXPORT = tuple(c for c in COLONNE_EVENTI if c != "hash_contenuto")
+COLONNE_MATCHES = ("id", "name", "data", "squadra_home", "squadra_away", "n_eventi")
+_COLONNE_INTERE = {"id", "num_fasi", "match_id", "minuto_ms", "n_eventi"}
+
+# rows buffered per Parquet row group
+RIGHE_PER_GRUPPO = 50000
+
+
+class EsportazioneAnnullata(Exception):
+    """Raised when the progress callback asks to stop the export."""
+
+
+def formato_da_percorso(percorso):
+    """The export format ("csv", "xlsx" or "parquet") from the file extension."""
+    estensione = os.path.splitext(str(percorso))[1].lower().lstrip(".")
+    formato = {"pq": "parquet"}.get(estensione, estensione)
+    if formato not in FORMATI:
+        raise ValueError(f"Formato di esportazione non supportato: {estensione!r}")
+    return formato
+
+
+def esporta_eventi(
+    percorso,
+    formato=None,
+    match_id=None,
+    da_data=None,
+    a_data=None,
+    squadra=None,
+    colonne=None,
+    progresso=None,
+):
+    """Write the events matching the filters (see services.itera_eventi).
+
+    `progresso(righe_scritte)` is called after every page; returning False
+    cancels the export (EsportazioneAnnullata). Returns the rows written.
+    """
+    colonne = list(colonne or COLONNE_EXPORT)
+    eventi = services.itera_eventi(match_id, da_data, a_data, squadra, colonne=colonne)
+    valori = attrgetter(*colonne)
+    if len(colonne) == 1:
+        righe = ((valori(e),) for e in eventi)
+    else:
+        righe = map(valori, eventi)
+    return esporta_righe(percorso, righe, colonne, formato, progresso)
+
+
+def esporta_matches(percorso, formato=None, progresso=None):
+    """Write the matches with their event count (see services.lista_matches)."""
+    return esporta_righe(
+        percorso, services.lista_matches(), COLONNE_MATCHES, formato, progresso
+    )
+
+
+def esporta_righe(
+    percorso,
+    righe,
+    colonne,
+    formato=None,
+    progresso=None,
+    ogni=services.PAGINA_EVENTI,
+):
+    """Stream tuples into a new file; `progresso` is called every `ogni` rows."""
+    formato = formato or formato_da_percorso(percorso)
+    if formato not in FORMATI:
+        raise ValueError(f"Formato di esportazione non supportato: {formato!r}")
+    temporaneo = f"{percorso}.part"
+    scrittore = _SCRITTORI[formato](temporaneo, colonne)
+    scritte = 0
+    try:
+        try:
+            for riga in righe:
+                scrittore.scrivi(riga)
+                scritte += 1
+                if progresso is not None and scritte % ogni == 0:
+                    if progresso(scritte) is False:
+                        raise EsportazioneAnnullata()
+        finally:
+            scrittore.chiudi()
+        if progresso is not None and progresso(scritte) is False:
+            raise EsportazioneAnnullata()
+        os.replace(temporaneo, percorso)
+    except BaseException:
+        if os.path.exists(temporaneo):
+            os.remove(temporaneo)
+        raise
+    return scritte
+
+
+def _importa(formato):
+    modulo, pacchetto = DIPENDENZE[formato]
+    try:
+        return importlib.import_module(modulo)
+    except ImportError as e:
+        raise ImportError(
+            f"L'esportazione {formato} richiede il pacchetto '{pacchetto}' "
+            f"(pip install {pacchetto})"
+        ) from e
+
+
+class _ScrittoreCsv:
+    def __init__(self, percorso, colonne):
+        # utf-8-sig so Excel detects the encoding of accented names
+        self._file = open(percorso, "w", newline="", encoding="utf-8-sig")
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(colonne)
+        self.scrivi = self._csv.writerow
+
+    def chiudi(self):
+        self._file.close()
+
+
+class _ScrittoreXlsx:
+    def __init__(self, percorso, colonne):
+        openpyxl = _importa("xlsx")
+        self._percorso = percorso
+        self._wb = openpyxl.Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("dati")
+        self._ws.append(list(colonne))
+        self.scrivi = self._ws.append
+
+    def chiudi(self):
+        self._wb.save(self._percorso)
+
+
+class _ScrittoreParquet:
+    def __init__(self, percorso, colonne):
+        _importa("parquet")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._colonne = list(colonne)
+        self._schema = pa.schema(
+            [
+                (c, pa.int64() if c in _COLONNE_INTERE else pa.string())
+                for c in self._colonne
+            ]
+        )
+        self._writer = pq.ParquetWriter(percorso, self._schema)
+        self._buffer = []
+
+    def scrivi(self, riga):
+        self._buffer.append(riga)
+        if len(self._buffer) >= RIGHE_PER_GRUPPO:
+            self._svuota()
+
+    def _svuota(self):
+        if not self._buffer:
+            return
+        colonne = zip(zip(*self._buffer), self._schema.types)
+        tabella = self._pa.Table.from_arrays(
+            [
+                self._pa.array(
+                    list(map(_intero, valori)) if tipo == self._pa.int64() else valori,
+                    tipo,
+                )
+                for valori, tipo in colonne
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_table(tabella)
+        self._buffer = []
+
+    def chiudi(self):
+        try:
+            self._svuota()
+        finally:
+            self._writer.close()
+
+
+def _intero(valore):
+    # legacy rows may hold "" or text in integer columns: write a null
+    if valore is None or type(valore) is int:
+        return valore
+    try:
+        return int(str(valore).strip())
+    except ValueError:
+        return None
+
+
+_SCRITTORI = {
+    "csv": _ScrittoreCsv,
+    "xlsx": _ScrittoreXlsx,
+    "parquet": _ScrittoreParquet,
+}
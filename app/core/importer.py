@@ -0,0 +1,254 @@
+"""Bulk import of tagged events from CSV.
+
+`importa_csv()` streams the file: rows are read, validated and normalized
+one at a time and inserted in batches of `chunk_size`, each batch in one
+transaction. Memory use does not depend on the file size.
+
+- Columns are matched to `eventi` by header name, ignoring case, accents and
+  spaces, so both "velocita_ruck" and the table header "Velocità ruck" work.
+- Categorical fields must be one of the values of the form combos
+  (models.VOCABOLARI); an empty cell means "not set".
+- `minuto` is normalized to "m:ss" via parse_minuto_to_ms, `data` to
+  dd/MM/yyyy, and YouTube links to https://www.youtube.com/watch?v=<id>.
+- Events whose content hash (utils.hash_evento) is already in the database,
+  or earlier in the same batch, are skipped as duplicates. The hash is taken
+  on canonical values, so the normalization above does not hide duplicates
+  of events entered in the form (re-importing an export adds nothing).
+
+Invalid rows are reported in the returned EsitoImport and skipped; they
+never abort the import.
+"""
+
+import csv
+import json
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+from core import services
+from core.database import transaction
+from core.models import VOCABOLARI
+from core.utils import YT_REGEX, hash_evento, leggi_data, parse_minuto_to_ms
+
+# normalized header -> column, for headers that are not the column name
+ALIAS_COLONNE = {
+    "video": "video_url",
+    "url": "video_url",
+    "home": "squadra_home",
+    "away": "squadra_away",
+    "kickoff": "minuto_kickoff",
+    "fasi": "num_fasi",
+}
+COLONNE_IMPORT = (
+    "data",
+    "squadra_home",
+    "squadra_away",
+    "giocatore",
+    "minuto",
+    "minuto_kickoff",
+    "tipo_fase",
+    "evento_principale",
+    "origine_possesso",
+    "num_fasi",
+    "zona",
+    "esito",
+    "linea_guadagno",
+    "velocita_ruck",
+    "penalita",
+    "commento",
+    "video_url",
+)
+OBBLIGATORIE = ("data", "squadra_home", "squadra_away", "minuto_kickoff", "minuto")
+
+# at most this many row errors are kept in EsitoImport.errori (all are counted)
+MAX_ERRORI = 1000
+
+_MINUTO_ZERO = re.compile(r"^0+(?:[:.]0+)?$")
+
+
+@dataclass
+class EsitoImport:
+    letti: int = 0
+    importati: int = 0
+    duplicati: int = 0
+    scartati: int = 0
+    # (CSV line number, message), the first MAX_ERRORI only
+    errori: list = field(default_factory=list)
+
+    def riepilogo(self):
+        testo = (
+            f"{self.letti} righe lette: {self.importati} importate, "
+            f"{self.duplicati} duplicate, {self.scartati} scartate"
+        )
+        righe = [testo] + [f"  riga {n}: {msg}" for n, msg in self.errori]
+        if self.scartati > len(self.errori):
+            righe.append(f"  ... e altri {self.scartati - len(self.errori)} errori")
+        return "\n".join(righe)
+
+
+class ImportAnnullato(Exception):
+    """Raised when the progress callback asks to stop; committed batches stay."""
+
+
+def _normalizza_intestazione(testo):
+    testo = unicodedata.normalize("NFKD", str(testo or "")).encode("ascii", "ignore")
+    testo = re.sub(r"[^a-z0-9]+", "_", testo.decode().strip().lower()).strip("_")
+    return ALIAS_COLONNE.get(testo, testo)
+
+
+def mappa_colonne(intestazioni, mappa=None):
+    """{column index: `eventi` column} for a CSV header row.
+
+    `mappa` ({CSV header: column}) overrides the automatic matching. Raises
+    ValueError if a required column is missing.
+    """
+    mappa = mappa or {}
+    posizioni = {}
+    for i, intestazione in enumerate(intestazioni):
+        campo = mappa.get(intestazione) or _normalizza_intestazione(intestazione)
+        if campo in COLONNE_IMPORT and campo not in posizioni.values():
+            posizioni[i] = campo
+    mancanti = [c for c in OBBLIGATORIE if c not in posizioni.values()]
+    if mancanti:
+        raise ValueError(f"Colonne obbligatorie mancanti: {', '.join(mancanti)}")
+    return posizioni
+
+
+# categorical column -> {lowercase value: canonical value}
+_VOCABOLARI = {
+    campo: {v.lower(): v for v in valori} for campo, valori in VOCABOLARI.items()
+}
+
+
+def normalizza_riga(valori):
+    """Validate and normalize a {column: text} mapping into an event dict.
+
+    Raises ValueError with a message for the user on invalid values.
+    """
+    evento = {campo: (valori.get(campo) or "").strip() for campo in COLONNE_IMPORT}
+    for campo in OBBLIGATORIE:
+        if not evento[campo]:
+            raise ValueError(f"{campo} mancante")
+
+    evento["data"] = _normalizza_data(evento["data"])
+
+    minuto = evento["minuto"]
+    ms = parse_minuto_to_ms(minuto)
+    if ms == 0 and not _MINUTO_ZERO.match(minuto):
+        raise ValueError(f"minuto non valido: {minuto!r}")
+    secondi = ms // 1000
+    evento["minuto"] = f"{secondi // 60}:{secondi % 60:02d}"
+
+    for campo, ammessi in _VOCABOLARI.items():
+        valore = evento[campo]
+        if not valore:
+            continue
+        canonico = ammessi.get(valore.lower())
+        if canonico is None:
+            raise ValueError(f"{campo} non valido: {valore!r}")
+        evento[campo] = canonico
+
+    try:
+        evento["num_fasi"] = int(evento["num_fasi"] or 0)
+    except ValueError:
+        raise ValueError(f"num_fasi non numerico: {evento['num_fasi']!r}") from None
+    if evento["num_fasi"] < 0:
+        raise ValueError("num_fasi negativo")
+
+    url = evento["video_url"]
+    if url:
+        trovato = YT_REGEX.match(url)
+        if not trovato:
+            raise ValueError(f"video_url non è un link YouTube: {url!r}")
+        evento["video_url"] = f"https://www.youtube.com/watch?v={trovato.group(1)}"
+    return evento
+
+
+def _normalizza_data(testo):
+    letta = leggi_data(testo)
+    if letta is None:
+        raise ValueError(f"data non valida: {testo!r}")
+    return letta.strftime("%d/%m/%Y")
+
+
+def importa_csv(
+    percorso,
+    match_id=None,
+    mappa=None,
+    delimitatore=None,
+    chunk_size=services.BATCH_CHUNK,
+    progresso=None,
+):
+    """Import a CSV of tagged events; returns an EsitoImport.
+
+    `match_id` links every imported event to that match. The delimiter is
+    sniffed from the header unless given. `progresso(righe_lette)` is called
+    after every batch; returning False stops the import (ImportAnnullato).
+    """
+    with open(percorso, newline="", encoding="utf-8-sig") as f:
+        if delimitatore is None:
+            delimitatore = _indovina_delimitatore(f.readline())
+            f.seek(0)
+        lettore = csv.reader(f, delimiter=delimitatore)
+        intestazioni = next(lettore, None)
+        if intestazioni is None:
+            raise ValueError("File vuoto")
+        posizioni = list(mappa_colonne(intestazioni, mappa).items())
+
+        esito = EsitoImport()
+        blocco = []
+        for riga in lettore:
+            if not any(cella.strip() for cella in riga):
+                continue
+            esito.letti += 1
+            try:
+                evento = normalizza_riga(
+                    {campo: riga[i] for i, campo in posizioni if i < len(riga)}
+                )
+            except ValueError as e:
+                esito.scartati += 1
+                if len(esito.errori) < MAX_ERRORI:
+                    esito.errori.append((lettore.line_num, str(e)))
+                continue
+            evento["match_id"] = match_id
+            blocco.append(evento)
+            if len(blocco) >= chunk_size:
+                _inserisci(blocco, esito)
+                blocco = []
+                if progresso is not None and progresso(esito.letti) is False:
+                    raise ImportAnnullato(esito.riepilogo())
+        if blocco:
+            _inserisci(blocco, esito)
+        if progresso is not None:
+            progresso(esito.letti)
+    return esito
+
+
+def _indovina_delimitatore(intestazione):
+    try:
+        return csv.Sniffer().sniff(intestazione, delimiters=",;\t").delimiter
+    except csv.Error:
+        return ","
+
+
+def _inserisci(eventi, esito):
+    """Insert one batch, skipping events whose hash is already known."""
+    for evento in eventi:
+        evento["hash_contenuto"] = hash_evento(evento)
+    with transaction() as c:
+        c.execute(
+            "SELECT hash_contenuto FROM eventi "
+            "WHERE hash_contenuto IN (SELECT value FROM json_each(?))",
+            (json.dumps([e["hash_contenuto"] for e in eventi]),),
+        )
+        visti = {r[0] for r in c.fetchall()}
+        nuovi = []
+        for evento in eventi:
+            if evento["hash_contenuto"] in visti:
+                esito.duplicati += 1
+                continue
+            visti.add(evento["hash_contenuto"])
+            nuovi.append(evento)
+        if nuovi:
+            services.salva_eventi_batch(nuovi)
+        esito.importati += len(nuovi)
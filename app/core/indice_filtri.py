@@ -0,0 +1,137 @@
+"""Inverted indexes over the loaded events, for instant table filtering.
+
+IndiceFiltri keeps, for each filterable column, a {value: set of rows} map
+built as events are loaded (rows are positions in load order, as in
+ui.eventi_model.EventiModel). A filter such as
+
+    indice.filtra(evento_principale="Turnover", zona="22A", esito="Negativo")
+
+is resolved without looking at the events: the value sets of each column
+are unioned (a column may accept several values) and the per-column results
+intersected, smallest first. On 20k events this takes well under a
+millisecond (see tests/test_indice_filtri.py).
+"""
+
+# columns offered by the filter bar
+CAMPI_FILTRO = (
+    "giocatore",
+    "tipo_fase",
+    "evento_principale",
+    "zona",
+    "esito",
+    "penalita",
+)
+
+
+class _NonVuoto:
+    def __repr__(self):
+        return "NON_VUOTO"
+
+
+# condition matching any value but "not set" (None or ""), e.g. "penalties only"
+NON_VUOTO = _NonVuoto()
+
+
+class IndiceFiltri:
+    def __init__(self, campi=CAMPI_FILTRO):
+        self.campi = tuple(campi)
+        self._indici = {campo: {} for campo in self.campi}
+        # column values by row, to move a row when it is updated
+        self._colonne = {campo: [] for campo in self.campi}
+
+    def __len__(self):
+        return len(self._colonne[self.campi[0]]) if self.campi else 0
+
+    def ricostruisci(self, eventi=()):
+        """Drop everything and index `eventi` as rows 0, 1, ..."""
+        self._indici = {campo: {} for campo in self.campi}
+        self._colonne = {campo: [] for campo in self.campi}
+        self.aggiungi(eventi)
+
+    def aggiungi(self, eventi):
+        """Index events appended after the current last row."""
+        eventi = list(eventi)
+        inizio = len(self)
+        for campo in self.campi:
+            indice = self._indici[campo]
+            colonna = self._colonne[campo]
+            valori = [_chiave(getattr(e, campo)) for e in eventi]
+            for riga, valore in enumerate(valori, inizio):
+                righe = indice.get(valore)
+                if righe is None:
+                    indice[valore] = {riga}
+                else:
+                    righe.add(riga)
+            colonna.extend(valori)
+
+    def aggiorna(self, riga, evento):
+        """Re-index row `riga` after its event changed."""
+        for campo in self.campi:
+            colonna = self._colonne[campo]
+            vecchio, nuovo = colonna[riga], _chiave(getattr(evento, campo))
+            if vecchio == nuovo:
+                continue
+            righe = self._indici[campo][vecchio]
+            righe.discard(riga)
+            if not righe:
+                del self._indici[campo][vecchio]
+            self._indici[campo].setdefault(nuovo, set()).add(riga)
+            colonna[riga] = nuovo
+
+    def rimuovi(self, riga):
+        """Drop row `riga`; later rows shift down by one (full re-index)."""
+        colonne = {campo: self._colonne[campo] for campo in self.campi}
+        for colonna in colonne.values():
+            del colonna[riga]
+        self._indici = {campo: {} for campo in self.campi}
+        for campo, colonna in colonne.items():
+            indice = self._indici[campo]
+            for r, valore in enumerate(colonna):
+                indice.setdefault(valore, set()).add(r)
+
+    def valori(self, campo):
+        """Distinct values of `campo` in the loaded rows ("" = not set), sorted."""
+        return sorted(self._indici[campo])
+
+    def conteggi(self, campo):
+        """{value: number of rows} for `campo`."""
+        return {valore: len(righe) for valore, righe in self._indici[campo].items()}
+
+    def filtra(self, **condizioni):
+        """Set of rows matching every condition, or None if there is none.
+
+        A condition is a value, a collection of values (any of them) or
+        NON_VUOTO. Conditions whose value is None are ignored, so a filter
+        bar can pass all its fields unconditionally.
+        """
+        insiemi = []
+        for campo, condizione in condizioni.items():
+            if condizione is None:
+                continue
+            indice = self._indici[campo]
+            if condizione is NON_VUOTO:
+                gruppi = [r for v, r in indice.items() if v != ""]
+            elif isinstance(condizione, (set, frozenset, list, tuple)):
+                chiavi = {_chiave(v) for v in condizione}
+                gruppi = [indice[c] for c in chiavi if c in indice]
+            else:
+                gruppi = [indice.get(_chiave(condizione), set())]
+            if len(gruppi) == 1:
+                insiemi.append(gruppi[0])
+            else:
+                insiemi.append(set().union(*gruppi))
+        if not insiemi:
+            return None
+        insiemi.sort(key=len)
+        # copy: the first set may be one of the index's own
+        risultato = set(insiemi[0])
+        for insieme in insiemi[1:]:
+            if not risultato:
+                break
+            risultato &= insieme
+        return risultato
+
+
+def _chiave(valore):
+    # None and "" both mean "not set"; numbers and text index the same way
+    return "" if valore is None else str(valore).strip()
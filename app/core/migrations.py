@@ -0,0 +1,357 @@
+"""Versioned schema migrations keyed on ``PRAGMA user_version``.
+
+Each migration is a function taking a cursor. Its version is its position
+in ``MIGRATIONS`` (1-based): a database at ``user_version`` N only runs the
+migrations after N, each in its own transaction, so startup on an
+up-to-date database costs a single PRAGMA read.
+
+Never edit or reorder a migration that has shipped; append a new one.
+"""
+
+import sys
+
+from core.database import get_connection, transaction
+
+
+def _colonne(c, tabella):
+    c.execute(f"PRAGMA table_info({tabella})")
+    return {r[1] for r in c.fetchall()}
+
+
+def _m001_schema_base(c):
+    """Base tables. Also upgrades pre-versioning databases in place."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS eventi (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT,
+            squadra_home TEXT,
+            squadra_away TEXT,
+            giocatore TEXT,
+            minuto TEXT,
+            minuto_kickoff TEXT,
+            tipo_fase TEXT,
+            evento_principale TEXT,
+            origine_possesso TEXT,
+            num_fasi INTEGER,
+            zona TEXT,
+            esito TEXT,
+            linea_guadagno TEXT,
+            velocita_ruck TEXT,
+            penalita TEXT,
+            commento TEXT,
+            video_url TEXT,
+            match_id INTEGER
+        )
+        """
+    )
+    # Old databases were created before video_url / match_id existed
+    cols = _colonne(c, "eventi")
+    if "video_url" not in cols:
+        c.execute("ALTER TABLE eventi ADD COLUMN video_url TEXT")
+    if "match_id" not in cols:
+        c.execute("ALTER TABLE eventi ADD COLUMN match_id INTEGER")
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT,
+            squadra_home TEXT,
+            squadra_away TEXT,
+            minuto_kickoff TEXT,
+            video_url TEXT,
+            name TEXT
+        )
+        """
+    )
+
+
+def _m002_indici_filtri(c):
+    """Indexes for lista_eventi_filtrati / link_events_to_match and per-match loads.
+
+    `id` is the trailing column so the `ORDER BY id DESC` of both list
+    queries is served by the index instead of a temp B-tree sort.
+    """
+    c.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_eventi_sessione
+        ON eventi (data, squadra_home, squadra_away, minuto_kickoff, id)
+        """
+    )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_eventi_match ON eventi (match_id, id)")
+
+
+def _m003_minuto_ms(c):
+    """Integer match time (ms) parsed once from `minuto`, for range queries."""
+    from core.utils import parse_minuto_to_ms
+
+    if "minuto_ms" not in _colonne(c, "eventi"):
+        c.execute("ALTER TABLE eventi ADD COLUMN minuto_ms INTEGER")
+    c.execute("SELECT id, minuto FROM eventi WHERE minuto_ms IS NULL")
+    valori = [
+        (parse_minuto_to_ms(minuto), evento_id) for evento_id, minuto in c.fetchall()
+    ]
+    c.executemany("UPDATE eventi SET minuto_ms=? WHERE id=?", valori)
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_eventi_match_minuto "
+        "ON eventi (match_id, minuto_ms)"
+    )
+
+
+def _m004_ricerca_testo(c):
+    """FTS5 index over commento/giocatore, kept in sync with `eventi` by triggers.
+
+    External-content table: the text lives only in `eventi`, the FTS table
+    stores just the inverted index. Prefix indexes serve the short prefix
+    queries issued while the user is still typing.
+    """
+    c.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS eventi_fts USING fts5(
+            commento, giocatore,
+            content='eventi', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3 4'
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS eventi_fts_ai AFTER INSERT ON eventi BEGIN
+            INSERT INTO eventi_fts (rowid, commento, giocatore)
+            VALUES (new.id, new.commento, new.giocatore);
+        END
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS eventi_fts_ad AFTER DELETE ON eventi BEGIN
+            INSERT INTO eventi_fts (eventi_fts, rowid, commento, giocatore)
+            VALUES ('delete', old.id, old.commento, old.giocatore);
+        END
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS eventi_fts_au
+        AFTER UPDATE OF commento, giocatore ON eventi BEGIN
+            INSERT INTO eventi_fts (eventi_fts, rowid, commento, giocatore)
+            VALUES ('delete', old.id, old.commento, old.giocatore);
+            INSERT INTO eventi_fts (rowid, commento, giocatore)
+            VALUES (new.id, new.commento, new.giocatore);
+        END
+        """
+    )
+    c.execute("INSERT INTO eventi_fts (eventi_fts) VALUES ('rebuild')")
+
+
+# Categorical columns whose per-value counts match_summary_conteggi keeps.
+CAMPI_RIEPILOGO = ("evento_principale", "esito", "penalita")
+
+
+def _sql_aggiungi(r):
+    """Trigger statements counting row `r` (NEW) into its match's summary."""
+    sql = [
+        f"""
+        INSERT INTO match_summary (match_id, n_eventi, max_minuto_ms, aggiornato_il)
+        VALUES ({r}.match_id, 1, {r}.minuto_ms, datetime('now'))
+        ON CONFLICT (match_id) DO UPDATE SET
+            n_eventi = n_eventi + 1,
+            max_minuto_ms = MAX(
+                COALESCE(max_minuto_ms, excluded.max_minuto_ms),
+                COALESCE(excluded.max_minuto_ms, max_minuto_ms)
+            ),
+            aggiornato_il = excluded.aggiornato_il;
+        """
+    ]
+    for campo in CAMPI_RIEPILOGO:
+        sql.append(
+            f"""
+            INSERT INTO match_summary_conteggi (match_id, campo, valore, n)
+            VALUES ({r}.match_id, '{campo}', COALESCE({r}.{campo}, ''), 1)
+            ON CONFLICT (match_id, campo, valore) DO UPDATE SET n = n + 1;
+            """
+        )
+    return "".join(sql)
+
+
+def _sql_togli(r):
+    """Trigger statements removing row `r` (OLD) from its match's summary.
+
+    Runs AFTER the row changed, so the max is recomputed from what is left
+    (a lookup on idx_eventi_match_minuto).
+    """
+    sql = [
+        f"""
+        UPDATE match_summary SET
+            n_eventi = n_eventi - 1,
+            max_minuto_ms = (
+                SELECT MAX(minuto_ms) FROM eventi WHERE match_id = {r}.match_id
+            ),
+            aggiornato_il = datetime('now')
+        WHERE match_id = {r}.match_id;
+        """
+    ]
+    for campo in CAMPI_RIEPILOGO:
+        sql.append(
+            f"""
+            UPDATE match_summary_conteggi SET n = n - 1
+            WHERE match_id = {r}.match_id AND campo = '{campo}'
+              AND valore = COALESCE({r}.{campo}, '');
+            """
+        )
+    sql.append(
+        f"DELETE FROM match_summary_conteggi WHERE match_id = {r}.match_id AND n <= 0;"
+    )
+    return "".join(sql)
+
+
+def _m005_riepilogo_match(c):
+    """Per-match summary maintained incrementally by triggers on `eventi`."""
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS match_summary (
+            match_id INTEGER PRIMARY KEY,
+            n_eventi INTEGER NOT NULL DEFAULT 0,
+            max_minuto_ms INTEGER,
+            aggiornato_il TEXT
+        )
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS match_summary_conteggi (
+            match_id INTEGER NOT NULL,
+            campo TEXT NOT NULL,
+            valore TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (match_id, campo, valore)
+        ) WITHOUT ROWID
+        """
+    )
+    colonne = ", ".join(("match_id", "minuto_ms") + CAMPI_RIEPILOGO)
+    c.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS match_summary_ai AFTER INSERT ON eventi
+        WHEN new.match_id IS NOT NULL BEGIN {_sql_aggiungi("new")} END
+        """
+    )
+    c.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS match_summary_ad AFTER DELETE ON eventi
+        WHEN old.match_id IS NOT NULL BEGIN {_sql_togli("old")} END
+        """
+    )
+    # an UPDATE is "remove the old row, add the new one"; two triggers because
+    # either side may have no match (relinking events to / from a match)
+    c.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS match_summary_au_old
+        AFTER UPDATE OF {colonne} ON eventi
+        WHEN old.match_id IS NOT NULL BEGIN {_sql_togli("old")} END
+        """
+    )
+    c.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS match_summary_au_new
+        AFTER UPDATE OF {colonne} ON eventi
+        WHEN new.match_id IS NOT NULL BEGIN {_sql_aggiungi("new")} END
+        """
+    )
+    c.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS match_summary_match_ad AFTER DELETE ON matches
+        BEGIN
+            DELETE FROM match_summary WHERE match_id = old.id;
+            DELETE FROM match_summary_conteggi WHERE match_id = old.id;
+        END
+        """
+    )
+
+    # backfill from the events already linked to a match
+    c.execute("DELETE FROM match_summary")
+    c.execute("DELETE FROM match_summary_conteggi")
+    c.execute(
+        """
+        INSERT INTO match_summary (match_id, n_eventi, max_minuto_ms, aggiornato_il)
+        SELECT match_id, COUNT(*), MAX(minuto_ms), datetime('now') FROM eventi
+        WHERE match_id IS NOT NULL GROUP BY match_id
+        """
+    )
+    for campo in CAMPI_RIEPILOGO:
+        c.execute(
+            f"""
+            INSERT INTO match_summary_conteggi (match_id, campo, valore, n)
+            SELECT match_id, '{campo}', COALESCE({campo}, ''), COUNT(*) FROM eventi
+            WHERE match_id IS NOT NULL GROUP BY match_id, COALESCE({campo}, '')
+            """
+        )
+
+
+def _m006_hash_contenuto(c):
+    """Content hash per event (core.utils.hash_evento), for import dedup."""
+    if "hash_contenuto" not in _colonne(c, "eventi"):
+        c.execute("ALTER TABLE eventi ADD COLUMN hash_contenuto TEXT")
+    _ricalcola_hash(c)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_eventi_hash ON eventi(hash_contenuto)")
+
+
+def _m007_hash_canonico(c):
+    """Re-hash events: hash_evento now hashes canonical values (minuto as ms,
+    ISO data, YouTube video id), so form-entered and imported copies match."""
+    _ricalcola_hash(c)
+
+
+def _ricalcola_hash(c):
+    from core.utils import CAMPI_HASH, hash_evento
+
+    colonne = ("id",) + CAMPI_HASH
+    sql = f"SELECT {', '.join(colonne)} FROM eventi WHERE id > ? ORDER BY id LIMIT 5000"
+    ultimo = -1
+    while True:
+        righe = c.execute(sql, (ultimo,)).fetchall()
+        if not righe:
+            break
+        c.executemany(
+            "UPDATE eventi SET hash_contenuto=? WHERE id=?",
+            [(hash_evento(dict(zip(colonne, r))), r[0]) for r in righe],
+        )
+        ultimo = righe[-1][0]
+
+
+MIGRATIONS = [
+    _m001_schema_base,
+    _m002_indici_filtri,
+    _m003_minuto_ms,
+    _m004_ricerca_testo,
+    _m005_riepilogo_match,
+    _m006_hash_contenuto,
+    _m007_hash_canonico,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def versione_corrente():
+    return get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate():
+    """Run every pending migration once and return the resulting version."""
+    versione = versione_corrente()
+    for numero, migrazione in enumerate(MIGRATIONS, start=1):
+        if numero <= versione:
+            continue
+        with transaction() as c:
+            migrazione(c)
+            # PRAGMA does not accept bound parameters
+            c.execute(f"PRAGMA user_version = {numero}")
+        try:
+            print(
+                f"[DB] migrazione {numero} applicata ({migrazione.__name__})",
+                file=sys.stderr,
+            )
+        except Exception:
+            pass
+        versione = numero
+    return versione
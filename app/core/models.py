@@ -1,20 +1,81 @@
 from dataclasses import dataclass
 
-@dataclass
+# Values offered by the form combos (MainWindow.init_form), in display order.
+# The empty string means "not set" where the combo allows it.
+VOCABOLARI = {
+    "tipo_fase": ["Attacco", "Difesa", "Transizione"],
+    "evento_principale": [
+        "Touche",
+        "Mischia",
+        "Ruck",
+        "Maul",
+        "Calcio",
+        "Penalità",
+        "Meta",
+        "Turnover",
+    ],
+    "origine_possesso": ["Touche", "Mischia", "Calcio", "Turnover", "Inizio tempo"],
+    "zona": ["22D", "50D", "50A", "22A"],
+    "esito": ["Neutro", "Negativo", "Positivo"],
+    "linea_guadagno": ["Guadagnata", "Persa", "Neutra"],
+    "velocita_ruck": ["", "Veloce", "Media", "Lenta"],
+    "penalita": ["", "CP+", "CP-", "S+", "S-", "CL+", "CL-"],
+}
+
+# Column order of the `eventi` table as returned by `SELECT *`.
+COLONNE_EVENTI = (
+    "id",
+    "data",
+    "squadra_home",
+    "squadra_away",
+    "giocatore",
+    "minuto",
+    "minuto_kickoff",
+    "tipo_fase",
+    "evento_principale",
+    "origine_possesso",
+    "num_fasi",
+    "zona",
+    "esito",
+    "linea_guadagno",
+    "velocita_ruck",
+    "penalita",
+    "commento",
+    "video_url",
+    "match_id",
+    "minuto_ms",
+    "hash_contenuto",
+)
+
+
+@dataclass(slots=True)
 class Evento:
-    data: str
-    squadra_home: str
-    squadra_away: str
-    giocatore: str
-    minuto: str               # minuto dell'evento, variabile
-    minuto_kickoff: str       # minuto del fischio iniziale, fisso
-    tipo_fase: str
-    evento_principale: str
-    origine_possesso: str
-    num_fasi: int
-    zona: str
-    esito: str
-    linea_guadagno: str
-    velocita_ruck: str
-    penalita: str
-    commento: str
+    """One row of `eventi`. Fields follow COLONNE_EVENTI; all default to None
+    so rows selected with a subset of the columns decode too."""
+
+    id: int | None = None
+    data: str | None = None
+    squadra_home: str | None = None
+    squadra_away: str | None = None
+    giocatore: str | None = None
+    minuto: str | None = None  # minuto dell'evento, variabile
+    minuto_kickoff: str | None = None  # minuto del fischio iniziale, fisso
+    tipo_fase: str | None = None
+    evento_principale: str | None = None
+    origine_possesso: str | None = None
+    num_fasi: int | None = None
+    zona: str | None = None
+    esito: str | None = None
+    linea_guadagno: str | None = None
+    velocita_ruck: str | None = None
+    penalita: str | None = None
+    commento: str | None = None
+    video_url: str | None = None
+    match_id: int | None = None
+    minuto_ms: int | None = None
+    hash_contenuto: str | None = None
+
+    @classmethod
+    def da_dict(cls, valori):
+        """Build an Evento from a form/event dict, ignoring unknown keys."""
+        return cls(**{k: v for k, v in valori.items() if k in COLONNE_EVENTI})
@@ -0,0 +1,86 @@
+"""Typed sort keys for event columns and a stable multi-column sort.
+
+Sorting table cells as text puts "10:05" before "2:30" and 10 phases before
+9. `chiave_ordinamento(campo)` returns a key function that maps an Evento to
+a value that orders correctly for its column:
+
+- minuto / minuto_kickoff: milliseconds (stored minuto_ms, else parsed with
+  parse_minuto_to_ms, so "3", "1:23" and "2.5" compare as times);
+- num_fasi, id and other integer columns: the number (unset first);
+- data: dd/MM/yyyy rearranged to yyyyMMdd;
+- the form's categorical columns (VOCABOLARI): the order of the combo
+  values (e.g. zona 22D < 50D < 50A < 22A), unknown values after them;
+- anything else: case-insensitive text.
+
+`ordina()` sorts row positions by a list of (keys, descending) criteria
+using successive stable sorts, so rows equal on every criterion keep their
+previous relative order.
+"""
+
+from core.models import VOCABOLARI
+from core.utils import parse_minuto_to_ms
+
+# columns compared as integers
+CAMPI_NUMERICI = ("id", "num_fasi", "match_id", "minuto_ms")
+
+# key of unset numbers: before every value
+_NESSUNO = float("-inf")
+
+
+def chiave_ordinamento(campo):
+    """Key function Evento -> sortable value for column `campo`."""
+    if campo == "minuto":
+        return _minuto
+    if campo == "minuto_kickoff":
+        return lambda e: parse_minuto_to_ms(e.minuto_kickoff or "")
+    if campo == "data":
+        return _data
+    if campo in CAMPI_NUMERICI:
+        return lambda e: _numero(getattr(e, campo))
+    if campo in VOCABOLARI:
+        posizioni = {v: i for i, v in enumerate(VOCABOLARI[campo])}
+        fuori = len(posizioni)
+
+        def _categoria(e):
+            valore = getattr(e, campo) or ""
+            return (posizioni.get(valore, fuori), valore)
+
+        return _categoria
+    return lambda e: (getattr(e, campo) or "").casefold()
+
+
+def ordina(n, criteri):
+    """Positions 0..n-1 sorted by `criteri` ([(keys, descending)], first wins).
+
+    `keys` is a sequence of n sort keys (see chiave_ordinamento). The sort is
+    stable: ties on every criterion stay in position order.
+    """
+    ordine = list(range(n))
+    # least significant first: each stable pass keeps the previous ones' order
+    for chiavi, discendente in reversed(criteri):
+        ordine.sort(key=chiavi.__getitem__, reverse=discendente)
+    return ordine
+
+
+def _minuto(evento):
+    if evento.minuto_ms is not None:
+        return evento.minuto_ms
+    return parse_minuto_to_ms(evento.minuto or "")
+
+
+def _data(evento):
+    data = evento.data or ""
+    if len(data) == 10 and data[2] == "/" and data[5] == "/":
+        return data[6:] + data[3:5] + data[:2]
+    return data
+
+
+def _numero(valore):
+    if type(valore) is int:
+        return valore
+    if valore is None or valore == "":
+        return _NESSUNO
+    try:
+        return int(valore)
+    except (TypeError, ValueError):
+        return _NESSUNO
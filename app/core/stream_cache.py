@@ -0,0 +1,155 @@
+"""Cache of resolved stream URLs, in memory (LRU) and on disk.
+
+Resolving a YouTube link with yt_dlp takes seconds, and the direct URL it
+returns stays valid for hours: clicking ten events of the same match should
+pay for one extraction. StreamCache maps the video id (YT_REGEX group 1, so
+youtu.be and youtube.com links of the same video share an entry) to the
+stream URL and its expiry.
+
+googlevideo URLs carry their expiry as a Unix timestamp (`expire=` in the
+query string, or `/expire/<ts>/` in the path); entries are considered stale
+SCADENZA_MARGINE seconds before it, so playback does not start on a URL
+about to die. URLs without one are kept for DURATA_PREDEFINITA.
+
+The disk copy is a small JSON file under cartella_cache(); it is rewritten
+atomically on every change and expired entries are dropped when it is read.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from core.utils import YT_REGEX
+
+# entries kept in memory and on disk
+CAPACITA = 64
+# an entry is stale this many seconds before the URL's own expiry
+SCADENZA_MARGINE = 300
+# lifetime of URLs that do not state an expiry
+DURATA_PREDEFINITA = 3600
+
+FILE_CACHE = "stream_cache.json"
+
+_EXPIRE = re.compile(r"[?&/]expire[=/](\d+)")
+
+
+def cartella_cache():
+    """Per-user cache directory of the app (not created here)."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "AnalisiRugby", "cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/AnalisiRugby")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "analisi_rugby")
+
+
+def id_video(url):
+    """YouTube video id of `url`, or None if it is not a YouTube link."""
+    trovato = YT_REGEX.match((url or "").strip())
+    return trovato.group(1) if trovato else None
+
+
+def scadenza_stream(stream_url, adesso=None):
+    """Unix time at which `stream_url` expires (its `expire` parameter)."""
+    trovata = _EXPIRE.search(stream_url or "")
+    if trovata:
+        return int(trovata.group(1))
+    return (time.time() if adesso is None else adesso) + DURATA_PREDEFINITA
+
+
+class StreamCache:
+    def __init__(self, percorso=None, capacita=CAPACITA, orologio=time.time):
+        """`percorso` is the JSON file (default: cartella_cache()/FILE_CACHE);
+        pass False for a memory-only cache."""
+        if percorso is None:
+            percorso = os.path.join(cartella_cache(), FILE_CACHE)
+        self._percorso = percorso or None
+        self._capacita = capacita
+        self._orologio = orologio
+        self._lock = threading.Lock()
+        # video id -> (stream URL, expiry), least recently used first
+        self._voci = None
+
+    def get(self, url):
+        """Cached stream URL for a YouTube link, or None if missing or stale."""
+        chiave = id_video(url)
+        if chiave is None:
+            return None
+        with self._lock:
+            voci = self._carica()
+            voce = voci.get(chiave)
+            if voce is None:
+                return None
+            if voce[1] - SCADENZA_MARGINE <= self._orologio():
+                del voci[chiave]
+                self._salva()
+                return None
+            voci.move_to_end(chiave)
+            return voce[0]
+
+    def put(self, url, stream_url):
+        """Remember the stream URL resolved for `url` (ignored if not YouTube)."""
+        chiave = id_video(url)
+        if chiave is None or not stream_url:
+            return
+        with self._lock:
+            voci = self._carica()
+            voci[chiave] = (stream_url, scadenza_stream(stream_url, self._orologio()))
+            voci.move_to_end(chiave)
+            while len(voci) > self._capacita:
+                voci.popitem(last=False)
+            self._salva()
+
+    def invalida(self, url):
+        """Forget `url` (e.g. its stream answered 403)."""
+        chiave = id_video(url)
+        with self._lock:
+            voci = self._carica()
+            if voci.pop(chiave, None) is not None:
+                self._salva()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._carica())
+
+    def _carica(self):
+        # called with the lock held; reads the disk copy once
+        if self._voci is not None:
+            return self._voci
+        self._voci = OrderedDict()
+        if self._percorso and os.path.exists(self._percorso):
+            try:
+                with open(self._percorso, encoding="utf-8") as f:
+                    dati = json.load(f)
+                adesso = self._orologio()
+                for chiave, (stream_url, scadenza) in dati.items():
+                    if scadenza - SCADENZA_MARGINE > adesso:
+                        self._voci[chiave] = (stream_url, scadenza)
+            except (OSError, ValueError, TypeError) as e:
+                # a corrupt or unreadable cache is just an empty one
+                print(
+                    f"[CACHE] cache stream ignorata ({self._percorso}): {e}",
+                    file=sys.stderr,
+                )
+        while len(self._voci) > self._capacita:
+            self._voci.popitem(last=False)
+        return self._voci
+
+    def _salva(self):
+        # called with the lock held
+        if not self._percorso:
+            return
+        temporaneo = f"{self._percorso}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self._percorso) or ".", exist_ok=True)
+            with open(temporaneo, "w", encoding="utf-8") as f:
+                json.dump({k: list(v) for k, v in self._voci.items()}, f)
+            os.replace(temporaneo, self._percorso)
+        except OSError as e:
+            # the memory copy still works; the next run just starts colder
+            print(f"[CACHE] impossibile salvare {self._percorso}: {e}", file=sys.stderr)
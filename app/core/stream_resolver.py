@@ -0,0 +1,260 @@
+"""Resolve YouTube links to direct stream URLs off the UI thread.
+
+yt_dlp's extract_info takes seconds (network round trips to YouTube), so
+StreamResolver runs it on a small thread pool and hands back a
+`concurrent.futures.Future` of the stream URL. Threads rather than processes:
+the work is network-bound, and a thread pool needs no pickling of yt_dlp
+state.
+
+Requests made through `risolvi()` supersede each other: when the user clicks
+a new event before the previous video is resolved, the older Future is
+cancelled and, if no one else is waiting for its URL, the extraction is
+dropped from the queue (an extraction already running cannot be stopped;
+its result is simply not delivered). Requests for a URL that is already
+being resolved share that extraction.
+
+With a `cache` (core.stream_cache.StreamCache) a video resolved once, in
+this run or a previous one, is answered at once while its URL is valid.
+
+`precarica()` warms the cache at low priority: prefetches run one at a time
+on their own thread, so they never queue ahead of risolvi(). A prefetch that
+has started is shared with a later risolvi() of the same URL; one still
+queued when the URL is requested (or cached) does nothing once it starts.
+
+yt_dlp is imported on the first extraction, so importing this module is
+cheap (app.cli, tests).
+"""
+
+import atexit
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from core.stream_cache import StreamCache
+
+OPZIONI_YTDL = {
+    "quiet": True,
+    "skip_download": True,
+    "no_warnings": True,
+    "format": "best",
+}
+
+
+def seleziona_stream_url(info):
+    """Choose a playable URL from a yt_dlp info dict (None if there is none).
+
+    Prefers info["url"], then the last http(s) format (usually the best).
+    """
+    if not info:
+        return None
+    if "url" in info and isinstance(info["url"], str):
+        return info["url"]
+    formats = info.get("formats") or []
+    for fmt in reversed(formats):
+        url = fmt.get("url")
+        protocol = fmt.get("protocol", "")
+        if url and protocol.startswith("http"):
+            return url
+    for fmt in formats:
+        if fmt.get("url"):
+            return fmt.get("url")
+    return None
+
+
+def estrai_stream_url(url):
+    """Extract the direct stream URL of a video with yt_dlp (blocking)."""
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL(OPZIONI_YTDL) as ydl:
+        info = ydl.extract_info(url, download=False)
+    stream_url = seleziona_stream_url(info if isinstance(info, dict) else {})
+    if not stream_url:
+        raise RuntimeError("Nessun flusso disponibile dal link fornito.")
+    return stream_url
+
+
+class StreamResolver:
+    def __init__(self, estrai=estrai_stream_url, max_workers=2, cache=None):
+        self._estrai = estrai
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="stream-resolver"
+        )
+        # prefetches: one at a time, apart from the user's requests
+        self._pool_sfondo = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="stream-prefetch"
+        )
+        # queued or running precarica() Futures, cancelled by annulla_precarica()
+        self._precariche = set()
+        # reentrant: an extraction that finishes at once runs _completato from
+        # inside _richiedi
+        self._lock = threading.RLock()
+        # url -> (extraction Future, caller Futures waiting for it)
+        self._in_corso = {}
+        # caller Future of the latest risolvi(), superseded by the next one
+        self._ultima = None
+
+    def risolvi(self, url, aggiorna=False) -> Future:
+        """Future of the stream URL of `url`; cancels the previous request.
+
+        A cached URL is returned as an already completed Future, unless
+        `aggiorna` asks for a fresh extraction (e.g. the cached one failed).
+        """
+        url = url.strip()
+        in_cache = None
+        if self.cache is not None and not aggiorna:
+            in_cache = self.cache.get(url)
+        with self._lock:
+            precedente, self._ultima = self._ultima, None
+            if in_cache is not None:
+                risultato = Future()
+                risultato.set_result(in_cache)
+            else:
+                risultato = self._richiedi(url)
+            self._ultima = risultato
+        if precedente is not None:
+            precedente.cancel()
+        return risultato
+
+    def precarica(self, url) -> Future:
+        """Resolve `url` in the background to warm the cache; Future of its URL.
+
+        Does not supersede risolvi() requests. A cached URL gives an already
+        completed Future.
+        """
+        url = url.strip()
+        in_cache = self.cache.get(url) if self.cache is not None else None
+        if in_cache is not None:
+            risultato = Future()
+            risultato.set_result(in_cache)
+            return risultato
+        with self._lock:
+            risultato = self._pool_sfondo.submit(self._precarica, url)
+            self._precariche.add(risultato)
+        risultato.add_done_callback(self._precarica_finita)
+        return risultato
+
+    def annulla_precarica(self) -> None:
+        """Drop the queued prefetches (the running one completes)."""
+        with self._lock:
+            precariche = list(self._precariche)
+        for risultato in precariche:
+            risultato.cancel()
+
+    def invalida(self, url) -> None:
+        """Drop `url` from the cache (its stream URL stopped working)."""
+        if self.cache is not None:
+            self.cache.invalida(url)
+
+    def annulla(self) -> None:
+        """Cancel the pending risolvi() request, if any."""
+        with self._lock:
+            precedente, self._ultima = self._ultima, None
+        if precedente is not None:
+            precedente.cancel()
+
+    def chiudi(self) -> None:
+        """Stop the pools; queued extractions and prefetches are dropped."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool_sfondo.shutdown(wait=False, cancel_futures=True)
+
+    def _richiedi(self, url):
+        # called with the lock held
+        risultato = Future()
+        voce = self._in_corso.get(url)
+        nuova = voce is None
+        if nuova:
+            lavoro = self._pool.submit(self._estrai_e_memorizza, url)
+            voce = self._in_corso[url] = (lavoro, [])
+        lavoro, attese = voce
+        attese.append(risultato)
+        risultato.add_done_callback(lambda f: self._abbandonato(url, f))
+        if nuova:
+            lavoro.add_done_callback(lambda f: self._completato(url, f))
+        return risultato
+
+    def _estrai_e_memorizza(self, url):
+        # worker thread
+        stream_url = self._estrai(url)
+        if self.cache is not None:
+            self.cache.put(url, stream_url)
+        return stream_url
+
+    def _precarica(self, url):
+        # prefetch thread: skip what was resolved or requested while queued
+        in_cache = self.cache.get(url) if self.cache is not None else None
+        if in_cache is not None:
+            return in_cache
+        with self._lock:
+            voce = self._in_corso.get(url)
+            if voce is None:
+                # publish the extraction so risolvi() of this URL shares it
+                lavoro = Future()
+                lavoro.set_running_or_notify_cancel()
+                self._in_corso[url] = (lavoro, [])
+                lavoro.add_done_callback(lambda f: self._completato(url, f))
+        if voce is not None:
+            # already being extracted for the user: share its result
+            return voce[0].result()
+        try:
+            stream_url = self._estrai_e_memorizza(url)
+        except BaseException as e:
+            lavoro.set_exception(e)
+            raise
+        lavoro.set_result(stream_url)
+        return stream_url
+
+    def _precarica_finita(self, risultato):
+        with self._lock:
+            self._precariche.discard(risultato)
+
+    def _abbandonato(self, url, risultato):
+        """A caller Future was cancelled: drop the extraction if it was the last."""
+        if not risultato.cancelled():
+            return
+        with self._lock:
+            voce = self._in_corso.get(url)
+            if voce is None:
+                return
+            lavoro, attese = voce
+            if risultato in attese:
+                attese.remove(risultato)
+            if not attese:
+                # succeeds only if the extraction has not started; its
+                # done callback (_completato) then drops the entry
+                lavoro.cancel()
+
+    def _completato(self, url, lavoro):
+        with self._lock:
+            voce = self._in_corso.get(url)
+            if voce is None or voce[0] is not lavoro:
+                return
+            del self._in_corso[url]
+            attese = list(voce[1])
+        if lavoro.cancelled():
+            # only when the pool was shut down: nobody will resolve these
+            for risultato in attese:
+                risultato.cancel()
+            return
+        errore = lavoro.exception()
+        for risultato in attese:
+            # a caller may have cancelled in the meantime: skip it
+            if not risultato.set_running_or_notify_cancel():
+                continue
+            if errore is None:
+                risultato.set_result(lavoro.result())
+            else:
+                risultato.set_exception(errore)
+
+
+_condiviso = None
+_condiviso_lock = threading.Lock()
+
+
+def resolver_condiviso():
+    """The process-wide StreamResolver (created on first use)."""
+    global _condiviso
+    with _condiviso_lock:
+        if _condiviso is None:
+            _condiviso = StreamResolver(cache=StreamCache())
+            atexit.register(_condiviso.chiudi)
+        return _condiviso
@@ -1,4 +1,7 @@
+import hashlib
 import re
+from datetime import date, datetime
+from functools import lru_cache
 
 YT_REGEX = re.compile(
     r"^(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([A-Za-z0-9_-]{11})(?:[&?#].*)?$",
@@ -49,3 +52,122 @@ def parse_minuto_to_ms(text: str) -> int:
         return minutes * 60 * 1000
     except Exception:
         return 0
+
+
+# Event fields that make up its content hash: everything the analyst enters,
+# not the match link nor values derived from other fields (minuto_ms).
+CAMPI_HASH = (
+    "data",
+    "squadra_home",
+    "squadra_away",
+    "giocatore",
+    "minuto",
+    "minuto_kickoff",
+    "tipo_fase",
+    "evento_principale",
+    "origine_possesso",
+    "num_fasi",
+    "zona",
+    "esito",
+    "linea_guadagno",
+    "velocita_ruck",
+    "penalita",
+    "commento",
+    "video_url",
+)
+
+
+# formats accepted for dates (the stored dd/mm/yyyy one has a fast path)
+_FORMATI_DATA = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%d.%m.%Y")
+_DATA_MEMORIZZATA = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+
+
+def leggi_data(testo):
+    """A date in one of the usual formats -> datetime.date, or None.
+
+    Impossible days (31/02/2025) are not dates: None as well. The importer,
+    the date filters of services.itera_eventi and hash_evento all read
+    dates through here.
+    """
+    testo = str(testo or "").strip()
+    trovata = _DATA_MEMORIZZATA.match(testo)
+    if trovata:
+        giorno, mese, anno = map(int, trovata.groups())
+        try:
+            return date(anno, mese, giorno)
+        except ValueError:
+            return None
+    for formato in _FORMATI_DATA:
+        try:
+            return datetime.strptime(testo, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def data_iso(testo):
+    """A date in one of the usual formats -> "yyyy-mm-dd", or None."""
+    letta = leggi_data(testo)
+    return None if letta is None else letta.isoformat()
+
+
+def _testo(valore):
+    return "" if valore is None else str(valore).strip()
+
+
+def _minuto_hash(valore):
+    testo = _testo(valore)
+    return str(parse_minuto_to_ms(testo)) if testo else ""
+
+
+# a match has one date and a few videos: their canonical forms are cached
+@lru_cache(maxsize=1024)
+def _data_hash(valore):
+    testo = _testo(valore)
+    return data_iso(testo) or testo
+
+
+@lru_cache(maxsize=1024)
+def _video_hash(valore):
+    testo = _testo(valore)
+    trovato = YT_REGEX.match(testo) if testo else None
+    return trovato.group(1) if trovato else testo
+
+
+def _num_fasi_hash(valore):
+    if type(valore) is int:
+        return str(valore)
+    testo = _testo(valore) or "0"
+    try:
+        return str(int(testo))
+    except ValueError:
+        return testo
+
+
+# (field, canonical text function) in CAMPI_HASH order, for hash_evento
+_CANONICI_HASH = [
+    (
+        campo,
+        {
+            "minuto": _minuto_hash,
+            "data": _data_hash,
+            "video_url": _video_hash,
+            "num_fasi": _num_fasi_hash,
+        }.get(campo, _testo),
+    )
+    for campo in CAMPI_HASH
+]
+
+
+def hash_evento(evento) -> str:
+    """Content hash of an event dict, used to recognise duplicate events.
+
+    Values are hashed in canonical form, so an event typed in the form and
+    the same event re-imported from an export (where the importer rewrote
+    it) hash the same: minuto as milliseconds ("12" == "12:00"), data as
+    yyyy-mm-dd, YouTube links as their video id, num_fasi as an integer
+    ("" == 0). Other values are compared as stripped strings, so 3 and "3"
+    or None and "" hash the same. Returns 32 hex characters.
+    """
+    testo = "\x1f".join([canonico(evento.get(c)) for c, canonico in _CANONICI_HASH])
+    return hashlib.blake2b(testo.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,191 @@
+"""Write-behind executor for event saves.
+
+Writes are queued and applied on a dedicated thread (with its own
+connection, see core.database), so callers never wait on disk or on a
+locked database. Every queued write returns a `concurrent.futures.Future`.
+
+The writer drains whatever is queued and applies it in one transaction:
+consecutive inserts go through `salva_eventi_batch`, consecutive updates of
+the same event are coalesced (last one wins) and go through
+`modifica_eventi_batch`. Futures are resolved only after the commit.
+
+Inserts get a provisional id (negative, unique for the executor lifetime)
+right away; it can be passed to `modifica`/`elimina` before the insert is
+committed and is translated to the real id on the writer thread. An update
+or delete whose event does not exist (its insert failed, or the row is gone)
+fails its Future with LookupError.
+
+`flush()` blocks until the queue is drained and is meant for worker threads;
+on the UI thread use `flush_async()` and read once its Future is done.
+"""
+
+import atexit
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+
+from core import services
+from core.database import close_connection, transaction
+
+_SALVA = "salva"
+_MODIFICA = "modifica"
+_ELIMINA = "elimina"
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+class WriteBehindExecutor:
+    def __init__(self, max_batch=1000):
+        self._max_batch = max_batch
+        self._coda = queue.Queue()
+        self._provvisori = itertools.count(-1, -1)
+        # provisional id -> real id, filled once the insert is committed
+        self._id_reali = {}
+        self._lock = threading.Lock()
+        self._chiuso = False
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    # --- API (any thread) ---
+    def salva(self, evento):
+        """Queue an insert. Returns (provisional id, Future of the real id)."""
+        id_provvisorio = next(self._provvisori)
+        return id_provvisorio, self._accoda(_SALVA, id_provvisorio, dict(evento))
+
+    def modifica(self, evento_id, evento):
+        """Queue an update; `evento_id` may be a provisional id."""
+        return self._accoda(_MODIFICA, evento_id, dict(evento))
+
+    def elimina(self, evento_id):
+        """Queue a delete; `evento_id` may be a provisional id."""
+        return self._accoda(_ELIMINA, evento_id, None)
+
+    def id_reale(self, evento_id):
+        """Translate a provisional id if its insert is already committed."""
+        return self._id_reali.get(evento_id, evento_id)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is committed (or failed)."""
+        self.flush_async().result(timeout)
+
+    def flush_async(self):
+        """Future resolved once everything queued so far is committed (or failed)."""
+        if self._chiuso:
+            fatto = Future()
+            fatto.set_result(None)
+            return fatto
+        return self._accoda(_FLUSH, None, None)
+
+    def shutdown(self, timeout=None):
+        """Flush pending writes and stop the writer thread. Idempotent."""
+        with self._lock:
+            if self._chiuso:
+                return
+            self._chiuso = True
+            fine = Future()
+            self._coda.put((_STOP, None, None, fine))
+        fine.result(timeout)
+        self._thread.join(timeout)
+        atexit.unregister(self.shutdown)
+
+    def _accoda(self, operazione, evento_id, evento):
+        future = Future()
+        with self._lock:
+            if self._chiuso:
+                raise RuntimeError("WriteBehindExecutor chiuso")
+            self._coda.put((operazione, evento_id, evento, future))
+        return future
+
+    # --- writer thread ---
+    def _run(self):
+        try:
+            while True:
+                lotto = [self._coda.get()]
+                while len(lotto) < self._max_batch:
+                    try:
+                        lotto.append(self._coda.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = [op for op in lotto if op[0] == _STOP]
+                self._applica([op for op in lotto if op[0] != _STOP])
+                if stop:
+                    for op in stop:
+                        op[3].set_result(None)
+                    return
+        finally:
+            close_connection()
+
+    def _applica(self, lotto):
+        scritture = [op for op in lotto if op[0] != _FLUSH]
+        esiti = {}
+        try:
+            if scritture:
+                with transaction():
+                    for gruppo in _gruppi(scritture):
+                        self._applica_gruppo(gruppo, esiti)
+        except Exception as exc:
+            # rolled back: the ids assigned inside the transaction don't exist
+            for op in scritture:
+                if op[0] == _SALVA:
+                    self._id_reali.pop(op[1], None)
+            if len(scritture) > 1:
+                # replay one by one so only the offending write fails
+                for op in scritture:
+                    self._applica([op])
+            else:
+                scritture[0][3].set_exception(exc)
+        else:
+            for op in scritture:
+                if op[0] == _SALVA:
+                    self._id_reali[op[1]] = esiti[id(op)]
+                op[3].set_result(esiti.get(id(op)))
+        for op in lotto:
+            if op[0] == _FLUSH:
+                op[3].set_result(None)
+
+    def _applica_gruppo(self, gruppo, esiti):
+        operazione = gruppo[0][0]
+        if operazione == _SALVA:
+            ids = services.salva_eventi_batch(op[2] for op in gruppo)
+            for op, evento_id in zip(gruppo, ids):
+                esiti[id(op)] = evento_id
+                # later ops in this batch may refer to the provisional id
+                self._id_reali[op[1]] = evento_id
+        elif operazione == _MODIFICA:
+            ultimi = {}
+            for op in gruppo:
+                ultimi[self._id_esistente(op[1])] = op[2]
+            aggiornati = services.modifica_eventi_batch(
+                dict(evento, id=evento_id) for evento_id, evento in ultimi.items()
+            )
+            if aggiornati != len(ultimi):
+                # rolled back and replayed one by one: the missing event fails
+                raise LookupError(
+                    f"{len(ultimi) - aggiornati} eventi da aggiornare non trovati"
+                )
+            for op in gruppo:
+                esiti[id(op)] = self.id_reale(op[1])
+        else:
+            with transaction() as c:
+                c.executemany(
+                    "DELETE FROM eventi WHERE id=?",
+                    [(self._id_esistente(op[1]),) for op in gruppo],
+                )
+            for op in gruppo:
+                esiti[id(op)] = self.id_reale(op[1])
+
+    def _id_esistente(self, evento_id):
+        # a provisional id still unmapped here belongs to an insert that failed
+        reale = self.id_reale(evento_id)
+        if reale < 0:
+            raise LookupError(f"Evento {evento_id} non salvato")
+        return reale
+
+
+def _gruppi(operazioni):
+    """Split queued writes into runs of the same operation, preserving order."""
+    return [list(g) for _, g in itertools.groupby(operazioni, key=lambda op: op[0])]
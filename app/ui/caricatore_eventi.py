@@ -0,0 +1,71 @@
+import threading
+from itertools import islice
+
+from core.database import close_connection
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# events per page delivered to the UI thread: small enough that appending one
+# to the table model fits well inside a frame
+PAGINA = 500
+# pages emitted but not yet taken by the UI thread; the worker waits beyond this
+IN_VOLO = 2
+
+
+class CaricatoreEventi(QThread):
+    """Read events on a worker thread and hand them to the UI a page at a time.
+
+    `sorgente()` runs on the worker thread and returns an iterable of Evento
+    (e.g. controller.itera_eventi_per_match). Each page is delivered through
+    `pagina`; the receiving slot must call `pagina_consumata()` once it has
+    added it. At most IN_VOLO pages are in the event queue at once, so the
+    UI thread alternates between pages and repaints instead of falling behind
+    a queue of 100 pages.
+
+    Every signal carries `generazione`, the id the caller gave this load, so
+    pages still queued from a superseded load can be told apart and dropped.
+    """
+
+    # (generazione, list of Evento)
+    pagina = pyqtSignal(int, list)
+    # (generazione, events delivered)
+    completato = pyqtSignal(int, int)
+    # (generazione, error message)
+    fallito = pyqtSignal(int, str)
+
+    def __init__(self, sorgente, generazione, parent=None):
+        super().__init__(parent)
+        self.generazione = generazione
+        self._sorgente = sorgente
+        self._annullato = threading.Event()
+        self._posti = threading.Semaphore(IN_VOLO)
+
+    def annulla(self) -> None:
+        """Stop after the current page; no further signal is emitted."""
+        self._annullato.set()
+        # wake the worker if it is waiting for the UI to take a page
+        self._posti.release()
+
+    def pagina_consumata(self) -> None:
+        self._posti.release()
+
+    def run(self) -> None:
+        caricati = 0
+        try:
+            eventi = iter(self._sorgente())
+            while not self._annullato.is_set():
+                blocco = list(islice(eventi, PAGINA))
+                if not blocco:
+                    break
+                self._posti.acquire()
+                if self._annullato.is_set():
+                    break
+                self.pagina.emit(self.generazione, blocco)
+                caricati += len(blocco)
+            if not self._annullato.is_set():
+                self.completato.emit(self.generazione, caricati)
+        except Exception as e:
+            if not self._annullato.is_set():
+                self.fallito.emit(self.generazione, str(e))
+        finally:
+            # the thread ends here: release its database connection
+            close_connection()
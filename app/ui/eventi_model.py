@@ -0,0 +1,234 @@
+from operator import attrgetter
+
+from core.indice_filtri import IndiceFiltri
+from core.ordinamento import chiave_ordinamento, ordina
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+# (Evento attribute, column header) in display order
+COLONNE_TABELLA = [
+    ("data", "Data"),
+    ("squadra_home", "Squadra Home"),
+    ("squadra_away", "Squadra Away"),
+    ("giocatore", "Giocatore"),
+    ("minuto_kickoff", "Minuto Kickoff"),
+    ("minuto", "Minuto"),
+    ("tipo_fase", "Tipo fase"),
+    ("evento_principale", "Evento principale"),
+    ("origine_possesso", "Origine possesso"),
+    ("num_fasi", "Num fasi"),
+    ("zona", "Zona"),
+    ("esito", "Esito"),
+    ("linea_guadagno", "Linea guadagno"),
+    ("velocita_ruck", "Velocità ruck"),
+    ("penalita", "Penalità"),
+    ("commento", "Commento"),
+    ("video_url", "Video URL"),
+    ("id", "ID"),
+]
+COLONNA = {campo: i for i, (campo, _) in enumerate(COLONNE_TABELLA)}
+
+# columns remembered for multi-column sorting (most recent click first)
+MAX_CRITERI = 3
+
+
+class EventiModel(QAbstractTableModel):
+    """Read-only table model over a list of Evento records.
+
+    Nothing is allocated per cell: `data()` formats the requested value when
+    the view paints it, so only the visible rows cost anything. The Evento
+    objects (slotted, see core.models) stay in load order; sorting only
+    reorders `_ordine` (row -> load position). Load positions are what
+    `indice` (core.indice_filtri) and EventiProxyModel's filter work on, so
+    sorting never invalidates the filter.
+
+    Sorting uses typed keys (core.ordinamento) computed once per column and
+    kept in step with the rows. Clicking a column makes it the primary sort
+    key and keeps the previous ones as tie-breakers (up to MAX_CRITERI); the
+    criteria survive reloads. Rows added later go to the end until the next
+    sort (riordina()), so rows don't jump while a match is loading.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._eventi = []
+        self._ordine = []
+        # [(column, descending)], primary first
+        self._criteri = []
+        # column -> sort keys by load position, filled on first sort
+        self._chiavi = {}
+        self.indice = IndiceFiltri()
+        self._valori = [attrgetter(campo) for campo, _ in COLONNE_TABELLA]
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._eventi)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLONNE_TABELLA)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        evento = self._eventi[self._ordine[index.row()]]
+        valore = self._valori[index.column()](evento)
+        return "" if valore is None else str(valore)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return COLONNE_TABELLA[section][1]
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sort by `column`, keeping the previous sort columns as tie-breakers.
+
+        A negative column clears the sort (back to load order).
+        """
+        if column < 0:
+            self._criteri = []
+        else:
+            discendente = order == Qt.SortOrder.DescendingOrder
+            altri = [c for c in self._criteri if c[0] != column]
+            self._criteri = [(column, discendente)] + altri[: MAX_CRITERI - 1]
+        self.riordina()
+
+    # --- event store ---
+    def evento(self, row):
+        """The Evento shown at row `row`."""
+        return self._eventi[self._ordine[row]]
+
+    def posizione(self, row) -> int:
+        """Load position of row `row` (the row numbering of `indice`)."""
+        return self._ordine[row]
+
+    def riga_per_id(self, evento_id) -> int:
+        """Row of the event with this id, or -1."""
+        for row, posizione in enumerate(self._ordine):
+            if self._eventi[posizione].id == evento_id:
+                return row
+        return -1
+
+    def imposta_eventi(self, eventi) -> None:
+        """Replace the whole content (one model reset, not one signal per row)."""
+        self.beginResetModel()
+        self._eventi = list(eventi)
+        self._chiavi = {}
+        self._ordine = self._calcola_ordine()
+        self.indice.ricostruisci(self._eventi)
+        self.endResetModel()
+
+    def aggiungi(self, evento) -> None:
+        self.aggiungi_eventi([evento])
+
+    def aggiungi_eventi(self, eventi) -> None:
+        """Append a page of events with a single rows-inserted notification."""
+        if not eventi:
+            return
+        row = len(self._eventi)
+        self.beginInsertRows(QModelIndex(), row, row + len(eventi) - 1)
+        self._eventi.extend(eventi)
+        self._ordine.extend(range(row, row + len(eventi)))
+        for column, chiavi in self._chiavi.items():
+            chiavi.extend(map(self._chiave(column), eventi))
+        self.indice.aggiungi(eventi)
+        self.endInsertRows()
+
+    def aggiorna(self, row, evento) -> None:
+        posizione = self._ordine[row]
+        self._eventi[posizione] = evento
+        for column, chiavi in self._chiavi.items():
+            chiavi[posizione] = self._chiave(column)(evento)
+        self.indice.aggiorna(posizione, evento)
+        self.dataChanged.emit(
+            self.index(row, 0), self.index(row, len(COLONNE_TABELLA) - 1)
+        )
+
+    def imposta_id(self, vecchio, nuovo) -> None:
+        """Swap a provisional (write-behind) id for the committed one."""
+        row = self.riga_per_id(vecchio)
+        if row >= 0:
+            evento = self.evento(row)
+            evento.id = nuovo
+            if COLONNA["id"] in self._chiavi:
+                chiave = self._chiave(COLONNA["id"])(evento)
+                self._chiavi[COLONNA["id"]][self._ordine[row]] = chiave
+            indice = self.index(row, COLONNA["id"])
+            self.dataChanged.emit(indice, indice)
+
+    def rimuovi(self, row) -> None:
+        self.beginRemoveRows(QModelIndex(), row, row)
+        posizione = self._ordine.pop(row)
+        del self._eventi[posizione]
+        # later load positions shift down by one
+        self._ordine = [p - (p > posizione) for p in self._ordine]
+        for chiavi in self._chiavi.values():
+            del chiavi[posizione]
+        self.indice.rimuovi(posizione)
+        self.endRemoveRows()
+
+    def riordina(self) -> None:
+        """Re-apply the current sort criteria (e.g. after rows were appended)."""
+        self.layoutAboutToBeChanged.emit()
+        persistenti = self.persistentIndexList()
+        posizioni = [self._ordine[i.row()] for i in persistenti]
+        self._ordine = self._calcola_ordine()
+        righe = [0] * len(self._ordine)
+        for row, posizione in enumerate(self._ordine):
+            righe[posizione] = row
+        self.changePersistentIndexList(
+            persistenti,
+            [self.index(righe[p], i.column()) for p, i in zip(posizioni, persistenti)],
+        )
+        self.layoutChanged.emit()
+
+    def _calcola_ordine(self):
+        criteri = [(self._chiavi_colonna(c), d) for c, d in self._criteri]
+        return ordina(len(self._eventi), criteri)
+
+    def _chiavi_colonna(self, column):
+        chiavi = self._chiavi.get(column)
+        if chiavi is None:
+            chiavi = self._chiavi[column] = list(
+                map(self._chiave(column), self._eventi)
+            )
+        return chiavi
+
+    @staticmethod
+    def _chiave(column):
+        return chiave_ordinamento(COLONNE_TABELLA[column][0])
+
+
+class EventiProxyModel(QSortFilterProxyModel):
+    """Filtering layer between EventiModel and the table view.
+
+    Sorting is delegated to EventiModel (typed keys, multi-column, stable):
+    the proxy keeps the source order. Filtering is by a set of load
+    positions (see MainWindow.applica_filtri) coming from EventiModel.indice,
+    so accepting a row is one set lookup.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._righe = None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def imposta_righe(self, righe) -> None:
+        """Show only the events at these load positions; None shows them all."""
+        self._righe = righe
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._righe is None:
+            return True
+        return self.sourceModel().posizione(source_row) in self._righe
+
+    def evento(self, row):
+        """The Evento shown at view row `row`."""
+        sorgente = self.mapToSource(self.index(row, 0))
+        return self.sourceModel().evento(sorgente.row())
+
+    def riga_sorgente(self, row) -> int:
+        return self.mapToSource(self.index(row, 0)).row()
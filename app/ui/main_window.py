@@ -1,10 +1,17 @@
 from controllers.evento_controller import EventoController
+from core.export import EsportazioneAnnullata
+from core.importer import ImportAnnullato
+from core.indice_filtri import NON_VUOTO
+from core.models import VOCABOLARI, Evento
 from core.utils import is_valid_youtube_url, parse_minuto_to_ms
-from PyQt6.QtCore import QDate, QPoint, Qt, QUrl
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtCore import QDate, QObject, QPoint, Qt, QTimer, pyqtSignal
 from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QApplication,
+    QCheckBox,
     QComboBox,
     QDateEdit,
+    QFileDialog,
     QFrame,
     QGridLayout,
     QHBoxLayout,
@@ -12,22 +19,43 @@ from PyQt6.QtWidgets import (
     QInputDialog,
     QLabel,
     QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMenu,
     QMessageBox,
+    QProgressBar,
+    QProgressDialog,
     QPushButton,
     QSizePolicy,
     QSpinBox,
     QSplitter,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-# New imports for the two player options
-from ui.video_player_embed import VideoPlayerEmbed
-from ui.video_player_stream import VideoPlayerStream
+from ui.caricatore_eventi import CaricatoreEventi
+from ui.eventi_model import COLONNA, EventiModel, EventiProxyModel
+from ui.player_manager import PlayerManager
+from ui.precaricatore_video import PrecaricatoreVideo
+from ui.stats_panel import StatsPanel
+
+
+class _SegnaliScrittura(QObject):
+    """Deliver write-behind results (writer thread) to the Qt main thread."""
+
+    # (event id as passed to the controller, result of the future)
+    completata = pyqtSignal(int, object)
+    # (event id as passed to the controller, operation, error message,
+    #  Evento to put back in the table or None)
+    fallita = pyqtSignal(int, str, str, object)
+    # callable to run now that the queued writes are committed
+    applicate = pyqtSignal(object)
+
+
+# export format -> label used in the menu and in the file dialog filter
+_FORMATI_EXPORT = {"csv": "CSV", "xlsx": "Excel", "parquet": "Parquet"}
 
 
 class MainWindow(QWidget):
@@ -44,6 +72,12 @@ class MainWindow(QWidget):
         self.setGeometry(100, 100, 1500, 700)
         self.controller = EventoController()
         self.match_id = match_id
+        # Event saves are write-behind: the table is updated immediately and
+        # the outcome comes back through these signals.
+        self._segnali_scrittura = _SegnaliScrittura(self)
+        self._segnali_scrittura.completata.connect(self._on_scrittura_completata)
+        self._segnali_scrittura.fallita.connect(self._on_scrittura_fallita)
+        self._segnali_scrittura.applicate.connect(lambda funzione: funzione())
         # -1 means "not editing"; use integer index for rows when editing
         self.editing_row = -1
         # When editing an existing evento we store its DB id here. None means not editing.
@@ -81,35 +115,46 @@ class MainWindow(QWidget):
         self.change_match_btn.clicked.connect(self.change_match)
         left_layout.addWidget(self.change_match_btn)
 
+        # Export the current match's events (or all of them) / the matches list
+        self.export_btn = QPushButton("Esporta")
+        self.export_btn.setToolTip("Esporta gli eventi in CSV, Excel o Parquet")
+        export_menu = QMenu(self.export_btn)
+        for formato, etichetta in _FORMATI_EXPORT.items():
+            azione = export_menu.addAction(f"Eventi ({etichetta})")
+            azione.triggered.connect(
+                lambda _=False, f=formato: self.esporta("eventi", f)
+            )
+        export_menu.addSeparator()
+        azione = export_menu.addAction("Elenco match (CSV)")
+        azione.triggered.connect(lambda _=False: self.esporta("match", "csv"))
+        self.export_btn.setMenu(export_menu)
+        left_layout.addWidget(self.export_btn)
+
+        self.import_btn = QPushButton("Importa CSV")
+        self.import_btn.setToolTip("Importa eventi taggati da un file CSV")
+        self.import_btn.clicked.connect(self.importa_csv)
+        left_layout.addWidget(self.import_btn)
+
+        # Per-match statistics (GROUP BY in SQLite)
+        self.stats_panel = StatsPanel(self.controller)
+        left_layout.addWidget(self.stats_panel)
+
         # --- Lato destro: tabella ---
-        self.table = QTableWidget()
-        # include 'Giocatore' and one column for Video URL (before ID)
-        self.table.setColumnCount(18)
-        self.table.setHorizontalHeaderLabels(
-            [
-                "Data",
-                "Squadra Home",
-                "Squadra Away",
-                "Giocatore",
-                "Minuto Kickoff",
-                "Minuto",
-                "Tipo fase",
-                "Evento principale",
-                "Origine possesso",
-                "Num fasi",
-                "Zona",
-                "Esito",
-                "Linea guadagno",
-                "Velocità ruck",
-                "Penalità",
-                "Commento",
-                "Video URL",
-                "ID",
-            ]
-        )
+        # Events live in EventiModel; the view only formats the visible rows
+        self._modello = EventiModel(self)
+        self._proxy = EventiProxyModel(self)
+        self._proxy.setSourceModel(self._modello)
+        self.table = QTableView()
+        self.table.setModel(self._proxy)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         hh = self.table.horizontalHeader()
         if hh is not None:
-            hh.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+            # no ResizeToContents: it measures every row on each change
+            hh.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+            hh.setSectionResizeMode(COLONNA["commento"], QHeaderView.ResizeMode.Stretch)
+        vh = self.table.verticalHeader()
+        if vh is not None:
+            vh.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.setAlternatingRowColors(True)
         self.table.setSortingEnabled(True)
         self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -119,7 +164,9 @@ class MainWindow(QWidget):
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
         )
         # When a table row is clicked, load the video at the 'Minuto' column time
-        self.table.cellClicked.connect(self.on_table_cell_clicked)
+        self.table.clicked.connect(
+            lambda index: self.on_table_cell_clicked(index.row(), index.column())
+        )
         # --- Lato destro: tabella + video ---
         right_widget = QWidget()
         right_layout = QVBoxLayout()
@@ -147,10 +194,17 @@ class MainWindow(QWidget):
         self.add_video_btn.setToolTip("Add or change the current video URL")
         self.add_video_btn.clicked.connect(self.add_video)
         mode_layout.addWidget(self.add_video_btn)
+        # progress of the match's videos being pre-resolved (see precarica_video)
+        self.precarica_label = QLabel("")
+        self.precarica_label.hide()
+        mode_layout.addWidget(self.precarica_label)
         # Keep mode bar compact vertically
         mode_bar.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
         right_layout.addWidget(mode_bar)
 
+        self.init_ricerca(right_layout)
+        self.init_filtri(right_layout)
+
         # Create a vertical splitter so the table and video are resizable by the user
         splitter = QSplitter(Qt.Orientation.Vertical)
 
@@ -165,16 +219,16 @@ class MainWindow(QWidget):
         self.video_container_layout = QVBoxLayout(self.video_container)
         self.video_container_layout.setContentsMargins(0, 0, 0, 0)
 
-        # instantiate initial player according to use_embed
-        if self.use_embed:
-            self.video_player = VideoPlayerEmbed(self)
-        else:
-            self.video_player = VideoPlayerStream(self)
-        # ensure the player expands to fill the container
-        self.video_player.setSizePolicy(
-            QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
-        )
-        self.video_container_layout.addWidget(self.video_player)
+        # Players are built on first use (see the `video_player` property):
+        # QtWebEngine / QtMultimedia and yt_dlp take seconds to load, so only
+        # the active player's modules are imported, after the window is shown.
+        # Once built, a player stays in the stack and is only suspended when
+        # the user switches mode.
+        self._players = PlayerManager(self._crea_player)
+        self._segnaposto_video = QLabel("Il video verrà caricato al primo utilizzo")
+        self._segnaposto_video.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._players.addWidget(self._segnaposto_video)
+        self.video_container_layout.addWidget(self._players)
 
         self.video_container.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
@@ -187,11 +241,31 @@ class MainWindow(QWidget):
 
         right_layout.addWidget(splitter)
 
+        # videos of the open match, resolved in the background once its
+        # events are loaded (see precarica_video)
+        self._precaricatore = PrecaricatoreVideo(self.controller.video_urls_match, self)
+        self._precaricatore.avanzamento.connect(self._on_precarica_avanzamento)
+        self._precaricatore.completato.connect(self._on_precarica_completata)
+        self._match_caricamento = None
+
+        # progress of the background event load (see carica_eventi_match)
+        self._caricatore = None
+        self._generazione_caricamento = 0
+        self.caricamento_bar = QWidget()
+        caricamento_layout = QHBoxLayout(self.caricamento_bar)
+        caricamento_layout.setContentsMargins(0, 0, 0, 0)
+        self.caricamento_progress = QProgressBar()
+        self.caricamento_progress.setFormat("Caricamento eventi %v / %m")
+        caricamento_layout.addWidget(self.caricamento_progress, 1)
+        annulla_btn = QPushButton("Annulla")
+        annulla_btn.clicked.connect(lambda: self.annulla_caricamento())
+        caricamento_layout.addWidget(annulla_btn)
+        self.caricamento_bar.hide()
+        right_layout.addWidget(self.caricamento_bar)
+
         # store current video url and prompt user on startup after the window is shown
         self.current_video_url = ""
         # Use QTimer.singleShot to prompt after the event loop starts so the window is visible
-        from PyQt6.QtCore import QTimer
-
         # If a match_id was provided, load the match metadata and events, and
         # avoid prompting for a startup video URL because the match may already
         # contain a video URL.
@@ -201,10 +275,8 @@ class MainWindow(QWidget):
                 if m and len(m) > 5 and m[5]:
                     # m[5] is video_url per schema: id, data, squadra_home, squadra_away, minuto_kickoff, video_url, name
                     self.current_video_url = m[5]
-                    try:
-                        self.video_player.set_url(self.current_video_url)
-                    except Exception:
-                        pass
+                    # load it once the window is up, not while building it
+                    QTimer.singleShot(0, self._carica_video_corrente)
                 # populate the fixed fields from match so the filtered table loads correctly
                 try:
                     if m and len(m) > 3:
@@ -217,30 +289,7 @@ class MainWindow(QWidget):
                 except Exception:
                     pass
 
-                eventi = self.controller.lista_eventi_per_match(self.match_id)
-                self.table.setRowCount(0)
-                for evento in eventi:
-                    data = {
-                        "data": evento[1],
-                        "squadra_home": evento[2],
-                        "squadra_away": evento[3],
-                        "giocatore": evento[4],
-                        "minuto": evento[5],
-                        "minuto_kickoff": evento[6],
-                        "tipo_fase": evento[7],
-                        "evento_principale": evento[8],
-                        "origine_possesso": evento[9],
-                        "num_fasi": evento[10],
-                        "zona": evento[11],
-                        "esito": evento[12],
-                        "linea_guadagno": evento[13],
-                        "velocita_ruck": evento[14],
-                        "penalita": evento[15],
-                        "commento": evento[16],
-                        "video_url": self._evento_video_url(evento),
-                        "id": evento[0],
-                    }
-                    self.aggiungi_riga_tabella(data)
+                self.carica_eventi_match(self.match_id)
             except Exception:
                 # fallback to prompting for a URL and loading filtered events
                 QTimer.singleShot(0, self._prompt_for_video_url)
@@ -290,42 +339,29 @@ class MainWindow(QWidget):
         self.minuto_input = QLineEdit()
         self.video_url_input = QLineEdit()
         self.tipo_fase_input = QComboBox()
-        self.tipo_fase_input.addItems(["Attacco", "Difesa", "Transizione"])
+        self.tipo_fase_input.addItems(VOCABOLARI["tipo_fase"])
 
         self.evento_principale_input = QComboBox()
-        self.evento_principale_input.addItems(
-            [
-                "Touche",
-                "Mischia",
-                "Ruck",
-                "Maul",
-                "Calcio",
-                "Penalità",
-                "Meta",
-                "Turnover",
-            ]
-        )
+        self.evento_principale_input.addItems(VOCABOLARI["evento_principale"])
 
         self.origine_possesso_input = QComboBox()
-        self.origine_possesso_input.addItems(
-            ["Touche", "Mischia", "Calcio", "Turnover", "Inizio tempo"]
-        )
+        self.origine_possesso_input.addItems(VOCABOLARI["origine_possesso"])
 
         self.num_fasi_input = QSpinBox()
         self.zona_input = QComboBox()
-        self.zona_input.addItems(["22D", "50D", "50A", "22A"])
+        self.zona_input.addItems(VOCABOLARI["zona"])
 
         self.esito_input = QComboBox()
-        self.esito_input.addItems(["Neutro", "Negativo", "Positivo"])
+        self.esito_input.addItems(VOCABOLARI["esito"])
 
         self.linea_guadagno_input = QComboBox()
-        self.linea_guadagno_input.addItems(["Guadagnata", "Persa", "Neutra"])
+        self.linea_guadagno_input.addItems(VOCABOLARI["linea_guadagno"])
 
         self.velocita_ruck_input = QComboBox()
-        self.velocita_ruck_input.addItems(["", "Veloce", "Media", "Lenta"])
+        self.velocita_ruck_input.addItems(VOCABOLARI["velocita_ruck"])
 
         self.penalita_input = QComboBox()
-        self.penalita_input.addItems(["", "CP+", "CP-", "S+", "S-", "CL+", "CL-"])
+        self.penalita_input.addItems(VOCABOLARI["penalita"])
 
         self.commento_input = QTextEdit()
 
@@ -364,6 +400,167 @@ class MainWindow(QWidget):
             grid.addWidget(QLabel(label_text + ":"), i, 0)
             grid.addWidget(widget, i, 1)
 
+    # ==========================
+    # Ricerca full-text
+    # ==========================
+    def init_ricerca(self, layout):
+        search_bar = QWidget()
+        search_layout = QHBoxLayout(search_bar)
+        search_layout.setContentsMargins(0, 0, 0, 0)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Cerca nei commenti e nei giocatori...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_match_only = QCheckBox("Solo questo match")
+        search_layout.addWidget(QLabel("Cerca:"))
+        search_layout.addWidget(self.search_input, 1)
+        search_layout.addWidget(self.search_match_only)
+        search_bar.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        layout.addWidget(search_bar)
+
+        self.search_results = QListWidget()
+        self.search_results.setMaximumHeight(160)
+        self.search_results.hide()
+        self.search_results.itemClicked.connect(self._on_risultato_ricerca_clicked)
+        layout.addWidget(self.search_results)
+
+        # debounce: search once typing pauses instead of on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self.esegui_ricerca)
+        self.search_input.textChanged.connect(lambda _: self._search_timer.start())
+        self.search_match_only.toggled.connect(lambda _: self._search_timer.start())
+
+    def init_filtri(self, layout):
+        """Filter bar over the loaded events (resolved in memory, no query)."""
+        filter_bar = QWidget()
+        filter_layout = QHBoxLayout(filter_bar)
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout.addWidget(QLabel("Filtri:"))
+        self.filtri = {}
+        for campo, titolo in (
+            ("giocatore", "Giocatore"),
+            ("tipo_fase", "Tipo fase"),
+            ("evento_principale", "Evento"),
+            ("zona", "Zona"),
+            ("esito", "Esito"),
+            ("penalita", "Penalità"),
+        ):
+            combo = QComboBox()
+            combo.setToolTip(titolo)
+            combo.addItem(f"{titolo}: tutti", None)
+            if campo == "penalita":
+                combo.addItem("Solo penalità", NON_VUOTO)
+            for valore in VOCABOLARI.get(campo, []):
+                if valore:
+                    combo.addItem(valore, valore)
+            combo.currentIndexChanged.connect(lambda _: self._filtri_timer.start())
+            filter_layout.addWidget(combo)
+            self.filtri[campo] = combo
+        azzera_btn = QPushButton("Azzera")
+        azzera_btn.clicked.connect(self.azzera_filtri)
+        filter_layout.addWidget(azzera_btn)
+        self.filtri_label = QLabel("")
+        filter_layout.addWidget(self.filtri_label)
+        filter_layout.addStretch(1)
+        filter_bar.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        layout.addWidget(filter_bar)
+
+        # debounce: one intersection once the user stops changing filters
+        self._filtri_timer = QTimer(self)
+        self._filtri_timer.setSingleShot(True)
+        self._filtri_timer.setInterval(120)
+        self._filtri_timer.timeout.connect(self.applica_filtri)
+        # new or edited rows: re-filter (debounced); removals and resets shift
+        # row numbers, so those re-filter at once
+        self._modello.rowsInserted.connect(self._rifiltra_se_attivi)
+        self._modello.dataChanged.connect(self._rifiltra_se_attivi)
+        self._modello.rowsRemoved.connect(lambda *_: self.applica_filtri())
+        self._modello.modelReset.connect(self.applica_filtri)
+
+    def _condizioni_filtri(self):
+        return {campo: combo.currentData() for campo, combo in self.filtri.items()}
+
+    def applica_filtri(self):
+        righe = self._modello.indice.filtra(**self._condizioni_filtri())
+        self._proxy.imposta_righe(righe)
+        if righe is None:
+            self.filtri_label.setText("")
+        else:
+            self.filtri_label.setText(f"{len(righe)} / {self._modello.rowCount()}")
+
+    def _rifiltra_se_attivi(self, *_):
+        if any(v is not None for v in self._condizioni_filtri().values()):
+            self._filtri_timer.start()
+
+    def azzera_filtri(self):
+        for combo in self.filtri.values():
+            combo.blockSignals(True)
+            combo.setCurrentIndex(0)
+            combo.blockSignals(False)
+        self.applica_filtri()
+
+    def _aggiorna_giocatori_filtro(self):
+        """Offer the players of the loaded events in the Giocatore filter."""
+        combo = self.filtri["giocatore"]
+        selezionato = combo.currentData()
+        combo.blockSignals(True)
+        while combo.count() > 1:
+            combo.removeItem(1)
+        for giocatore in self._modello.indice.valori("giocatore"):
+            if giocatore:
+                combo.addItem(giocatore, giocatore)
+        indice = combo.findData(selezionato) if selezionato is not None else 0
+        combo.setCurrentIndex(max(indice, 0))
+        combo.blockSignals(False)
+        if combo.currentData() != selezionato:
+            # the selected player is not in the new rows: filter cleared
+            self.applica_filtri()
+
+    def esegui_ricerca(self):
+        testo = self.search_input.text().strip()
+        self.search_results.clear()
+        if not testo:
+            self.search_results.hide()
+            return
+        match_id = self.match_id if self.search_match_only.isChecked() else None
+        # search once the queued saves are in the index
+        self._dopo_scritture(lambda: self._mostra_ricerca(testo, match_id))
+
+    def _mostra_ricerca(self, testo, match_id):
+        if self.search_input.text().strip() != testo:
+            return  # the text changed meanwhile: a newer search follows
+        self.search_results.clear()
+        try:
+            risultati = self.controller.cerca_eventi(testo, match_id=match_id)
+        except Exception as e:
+            self.status_label.setText(f"Errore ricerca: {e}")
+            return
+        for evento in risultati:
+            commento = (evento.commento or "").replace("\n", " ")
+            testo_item = (
+                f"{evento.data}  {evento.minuto}  {evento.evento_principale}"
+                f"  {evento.giocatore or ''}"
+            )
+            if commento:
+                testo_item += f" — {commento[:120]}"
+            item = QListWidgetItem(testo_item)
+            minuto_ms = evento.minuto_ms
+            if minuto_ms is None:
+                minuto_ms = parse_minuto_to_ms(evento.minuto)
+            item.setData(Qt.ItemDataRole.UserRole, (evento.video_url or "", minuto_ms))
+            self.search_results.addItem(item)
+        if not risultati:
+            self.search_results.addItem("Nessun risultato")
+        self.search_results.show()
+
+    def _on_risultato_ricerca_clicked(self, item):
+        dati = item.data(Qt.ItemDataRole.UserRole)
+        if not dati:
+            return
+        video_url, minuto_ms = dati
+        self.apri_video_evento(video_url, minuto_ms)
+
     # ==========================
     # Funzioni principali
     # ==========================
@@ -409,8 +606,8 @@ class MainWindow(QWidget):
         if not data.get("video_url"):
             try:
                 player_url = ""
-                if hasattr(self.video_player, "get_current_url"):
-                    player_url = self.video_player.get_current_url() or ""
+                if hasattr(self._players.attivo, "get_current_url"):
+                    player_url = self._players.attivo.get_current_url() or ""
                 if not player_url:
                     player_url = self.current_video_url or ""
                 if player_url:
@@ -439,10 +636,16 @@ class MainWindow(QWidget):
         ):
             evento_id = self.editing_evento_id
             try:
-                self.controller.modifica_evento(evento_id, data)
+                # by id: rows may have been added or removed since the form
+                # was filled
+                row = self._modello.riga_per_id(evento_id)
+                precedente = self._modello.evento(row) if row >= 0 else None
+                future = self.controller.modifica_evento_async(evento_id, data)
+                self._monitora_scrittura(evento_id, future, "aggiornamento", precedente)
                 data["id"] = evento_id
                 try:
-                    self.aggiorna_riga_tabella(self.editing_row, data)
+                    if row >= 0:
+                        self.aggiorna_riga_tabella(row, Evento.da_dict(data))
                 except Exception:
                     pass
             except Exception as e:
@@ -461,7 +664,9 @@ class MainWindow(QWidget):
                     pass
         else:
             try:
-                evento_id = self.controller.salva_evento(data)
+                # provisional (negative) id until the writer commits the row
+                evento_id, future = self.controller.salva_evento_async(data)
+                self._monitora_scrittura(evento_id, future, "salvataggio")
                 data["id"] = evento_id
             except Exception as e:
                 QMessageBox.warning(self, "Errore", f"Impossibile salvare evento: {e}")
@@ -485,7 +690,7 @@ class MainWindow(QWidget):
 
             if inserted_matches:
                 try:
-                    self.aggiungi_riga_tabella(data)
+                    self.aggiungi_riga_tabella(Evento.da_dict(data))
                 except Exception:
                     try:
                         self.carica_eventi_tabella()
@@ -500,6 +705,70 @@ class MainWindow(QWidget):
         # --- Pulisci solo campi variabili ---
         self.pulisci_form_variabili()
 
+    def _monitora_scrittura(self, evento_id, future, azione, precedente=None):
+        """Report the outcome of a queued write; on failure `precedente` (the
+        Evento as it was before the write) is put back in the table."""
+        segnali = self._segnali_scrittura
+
+        def _fatto(f):
+            # runs on the writer thread: only emit, the slots run on the UI thread
+            exc = f.exception()
+            if exc is None:
+                segnali.completata.emit(evento_id, f.result())
+            else:
+                segnali.fallita.emit(evento_id, azione, str(exc), precedente)
+
+        future.add_done_callback(_fatto)
+
+    def _dopo_scritture(self, funzione):
+        """Run `funzione()` on the UI thread once the queued writes are committed.
+
+        Reads go through here instead of blocking on controller.flush(), so a
+        slow or locked database never freezes the window.
+        """
+        segnali = self._segnali_scrittura
+        self.controller.flush_async().add_done_callback(
+            lambda _f: segnali.applicate.emit(funzione)
+        )
+
+    def _on_scrittura_completata(self, evento_id, risultato):
+        # an insert committed: swap the provisional id for the real one
+        if evento_id < 0 and risultato is not None:
+            self._modello.imposta_id(evento_id, risultato)
+            if self.editing_evento_id == evento_id:
+                self.editing_evento_id = risultato
+        self.stats_panel.aggiorna()
+
+    def _on_scrittura_fallita(self, evento_id, azione, errore, precedente):
+        row = self._modello.riga_per_id(evento_id)
+        if azione == "salvataggio":
+            # the row was never written: drop its optimistic table entry
+            if row >= 0:
+                self._modello.rimuovi(row)
+        elif precedente is not None:
+            # the database still holds the previous version: show it again
+            if row >= 0:
+                self.aggiorna_riga_tabella(row, precedente)
+            elif azione == "eliminazione":
+                self.aggiungi_riga_tabella(precedente)
+        messaggio = f"Errore {azione} evento: {errore}"
+        try:
+            self.status_label.setText(messaggio)
+        except Exception:
+            pass
+        QMessageBox.warning(self, "Errore", messaggio)
+
+    def closeEvent(self, event):
+        self.annulla_caricamento(attendi=True)
+        self._precaricatore.annulla()
+        self._players.sospendi_tutti()
+        # make sure queued event saves reach the database before quitting
+        try:
+            self.controller.shutdown()
+        except Exception as e:
+            QMessageBox.warning(self, "Errore", f"Salvataggio eventi in sospeso: {e}")
+        super().closeEvent(event)
+
     def pulisci_form_variabili(self):
         self.giocatore_input.clear()
         self.minuto_input.clear()
@@ -571,11 +840,16 @@ class MainWindow(QWidget):
                 )
                 # remember current match id
                 self.match_id = match_id
+            self.stats_panel.set_match(self.match_id)
         except Exception as e:
             QMessageBox.warning(self, "Errore", f"Impossibile salvare match: {e}")
 
     def change_match(self):
         """Show the MatchSelector to pick or create a match, then reload events."""
+        # the selector has its own controller: let it see our pending saves
+        self._dopo_scritture(self._scegli_match)
+
+    def _scegli_match(self):
         try:
             from ui.match_selector import MatchSelector
 
@@ -608,64 +882,115 @@ class MainWindow(QWidget):
                                     pass
                     except Exception:
                         pass
-                    # reload events for the selected match
-                    try:
-                        self.table.setRowCount(0)
-                        eventi = self.controller.lista_eventi_per_match(self.match_id)
-                        for evento in eventi:
-                            data = {
-                                "data": evento[1],
-                                "squadra_home": evento[2],
-                                "squadra_away": evento[3],
-                                "giocatore": evento[4],
-                                "minuto": evento[5],
-                                "minuto_kickoff": evento[6],
-                                "tipo_fase": evento[7],
-                                "evento_principale": evento[8],
-                                "origine_possesso": evento[9],
-                                "num_fasi": evento[10],
-                                "zona": evento[11],
-                                "esito": evento[12],
-                                "linea_guadagno": evento[13],
-                                "velocita_ruck": evento[14],
-                                "penalita": evento[15],
-                                "commento": evento[16],
-                                "video_url": self._evento_video_url(evento),
-                                "id": evento[0],
-                            }
-                            self.aggiungi_riga_tabella(data)
-                    except Exception:
-                        self.carica_eventi_tabella()
+                    # reload events for the selected match (cancels a load
+                    # still running for the previous one)
+                    self.carica_eventi_match(self.match_id)
         except Exception:
             pass
 
-    def _table_text(self, row: int, col: int) -> str:
-        """Safely return the text of a QTableWidget cell or empty string.
+    def esporta(self, cosa: str, formato: str) -> None:
+        """Export "eventi" (current match, or every event) or the "match" list.
 
-        Central helper to avoid calling .text() on None.
+        Runs on the UI thread; the progress dialog keeps the window responsive
+        and its Cancel button stops the export (no partial file is left).
         """
-        item = self.table.item(row, col)
-        if item is None:
-            return ""
-        txt = item.text()
-        return txt if txt is not None else ""
+        if cosa == "eventi" and self.match_id:
+            nome = f"eventi_match_{self.match_id}.{formato}"
+        else:
+            nome = f"{cosa}.{formato}"
+        percorso, _ = QFileDialog.getSaveFileName(
+            self, "Esporta", nome, f"{_FORMATI_EXPORT[formato]} (*.{formato})"
+        )
+        if not percorso:
+            return
+        if not percorso.lower().endswith(f".{formato}"):
+            percorso += f".{formato}"
+        # export once the queued saves are committed
+        self._dopo_scritture(lambda: self._esegui_esportazione(cosa, formato, percorso))
 
-    def _evento_video_url(self, evento) -> str:
-        """Robustly extract a video_url from an evento row tuple.
+    def _esegui_esportazione(self, cosa, formato, percorso):
+        try:
+            if cosa == "eventi":
+                totale = self.controller.conta_eventi(match_id=self.match_id)
+            else:
+                totale = len(self.controller.lista_matches())
+        except Exception:
+            totale = 0
+        dialog = QProgressDialog("Esportazione in corso...", "Annulla", 0, totale, self)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+
+        def progresso(righe):
+            dialog.setValue(min(righe, totale))
+            QApplication.processEvents()
+            return not dialog.wasCanceled()
+
+        try:
+            if cosa == "eventi":
+                scritte = self.controller.esporta_eventi(
+                    percorso, formato, match_id=self.match_id, progresso=progresso
+                )
+            else:
+                scritte = self.controller.esporta_matches(percorso, formato, progresso)
+        except EsportazioneAnnullata:
+            self.status_label.setText("Esportazione annullata")
+            return
+        except Exception as e:
+            QMessageBox.warning(self, "Errore", f"Esportazione non riuscita: {e}")
+            return
+        finally:
+            dialog.close()
+        QMessageBox.information(
+            self, "Esportazione", f"Esportati {scritte} record in {percorso}"
+        )
+
+    def importa_csv(self) -> None:
+        """Import a CSV tagging sheet into the current match (if any)."""
+        percorso, _ = QFileDialog.getOpenFileName(
+            self, "Importa CSV", "", "CSV (*.csv *.txt)"
+        )
+        if not percorso:
+            return
+        # the row count is unknown while streaming: busy indicator + label
+        dialog = QProgressDialog("Importazione in corso...", "Annulla", 0, 0, self)
+        dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+
+        def progresso(righe):
+            dialog.setLabelText(f"Importazione in corso... {righe} righe lette")
+            QApplication.processEvents()
+            return not dialog.wasCanceled()
+
+        try:
+            esito = self.controller.importa_csv(
+                percorso, match_id=self.match_id, progresso=progresso
+            )
+        except ImportAnnullato as e:
+            esito = None
+            riepilogo = f"Importazione annullata.\n{e}"
+        except Exception as e:
+            QMessageBox.warning(self, "Errore", f"Importazione non riuscita: {e}")
+            return
+        finally:
+            dialog.close()
+        if esito is not None:
+            riepilogo = esito.riepilogo()
+        righe = riepilogo.splitlines()
+        if len(righe) > 25:
+            righe = righe[:25] + [f"... ({len(righe) - 25} righe omesse)"]
+        QMessageBox.information(self, "Importazione", "\n".join(righe))
 
-        Some databases may have different column ordering depending on
-        migrations. Prefer index 17, then 16, else empty string.
-        """
         try:
-            if evento is None:
-                return ""
-            if len(evento) > 17 and evento[17]:
-                return evento[17]
-            if len(evento) > 16 and evento[16]:
-                return evento[16]
+            if self.match_id:
+                self.carica_eventi_match(self.match_id)
+            else:
+                self.carica_eventi_tabella()
         except Exception:
             pass
-        return ""
+
+    def _evento_riga(self, row: int):
+        """The Evento shown at view row `row` (after sorting)."""
+        return self._proxy.evento(row)
 
     # ==========================
     # Tabella e menu contestuale
@@ -696,19 +1021,16 @@ class MainWindow(QWidget):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
         if confirm == QMessageBox.StandardButton.Yes:
-            # ID shifted to column 17
-            evento_id = self._table_text(row, 17)
-            self.controller.elimina_evento(evento_id)
-            self.table.removeRow(row)
+            evento = self._evento_riga(row)
+            future = self.controller.elimina_evento_async(evento.id)
+            self._monitora_scrittura(evento.id, future, "eliminazione", evento)
+            self._modello.rimuovi(self._proxy.riga_sorgente(row))
 
     def carica_form_per_modifica(self, row):
+        evento = self._evento_riga(row)
         self.editing_row = row
-        # Store the DB id for the event being edited (ID at column 17)
-        try:
-            id_text = self._table_text(row, 17)
-            self.editing_evento_id = int(id_text) if id_text else None
-        except Exception:
-            self.editing_evento_id = None
+        # Store the DB id for the event being edited
+        self.editing_evento_id = evento.id
         # Visual cue: set save button into edit mode
         try:
             if hasattr(self, "save_button"):
@@ -718,162 +1040,238 @@ class MainWindow(QWidget):
                 )
         except Exception:
             pass
-        # Columns: 0=Data,1=Squadra Home,2=Squadra Away,3=Giocatore,4=Minuto Kickoff,
-        # 5=Minuto,6=Tipo fase,7=Evento principale,8=Origine possesso,9=Num fasi,...
-        self.giocatore_input.setText(self._table_text(row, 3))
-        self.minuto_kickoff_input.setText(self._table_text(row, 4))
-        self.minuto_input.setText(self._table_text(row, 5))
-        self.tipo_fase_input.setCurrentText(self._table_text(row, 6))
-        self.evento_principale_input.setCurrentText(self._table_text(row, 7))
-        self.origine_possesso_input.setCurrentText(self._table_text(row, 8))
+
+        def testo(valore):
+            return "" if valore is None else str(valore)
+
+        self.giocatore_input.setText(testo(evento.giocatore))
+        self.minuto_kickoff_input.setText(testo(evento.minuto_kickoff))
+        self.minuto_input.setText(testo(evento.minuto))
+        self.tipo_fase_input.setCurrentText(testo(evento.tipo_fase))
+        self.evento_principale_input.setCurrentText(testo(evento.evento_principale))
+        self.origine_possesso_input.setCurrentText(testo(evento.origine_possesso))
 
         # num_fasi might be empty; guard conversion
-        num_fasi_txt = self._table_text(row, 9)
         try:
-            self.num_fasi_input.setValue(int(num_fasi_txt) if num_fasi_txt else 0)
+            self.num_fasi_input.setValue(int(evento.num_fasi or 0))
         except Exception:
             self.num_fasi_input.setValue(0)
-        self.zona_input.setCurrentText(self._table_text(row, 10))
-        self.esito_input.setCurrentText(self._table_text(row, 11))
-        self.linea_guadagno_input.setCurrentText(self._table_text(row, 12))
-        self.velocita_ruck_input.setCurrentText(self._table_text(row, 13))
-        self.penalita_input.setCurrentText(self._table_text(row, 14))
-        self.commento_input.setPlainText(self._table_text(row, 15))
-        # Video URL is in column 16
-        self.video_url_input.setText(self._table_text(row, 16))
+        self.zona_input.setCurrentText(testo(evento.zona))
+        self.esito_input.setCurrentText(testo(evento.esito))
+        self.linea_guadagno_input.setCurrentText(testo(evento.linea_guadagno))
+        self.velocita_ruck_input.setCurrentText(testo(evento.velocita_ruck))
+        self.penalita_input.setCurrentText(testo(evento.penalita))
+        self.commento_input.setPlainText(testo(evento.commento))
+        self.video_url_input.setText(testo(evento.video_url))
+
+    def carica_eventi_match(self, match_id):
+        """Load a match's events into the table on a worker thread.
+
+        The table is emptied and filled a page at a time as CaricatoreEventi
+        delivers them, so the window stays responsive on large matches. A
+        load still running (e.g. for the previous match) is cancelled first.
+        """
+        self.annulla_caricamento()
+        self.mostra_eventi([])
+        self._match_caricamento = match_id
+        try:
+            totale = self.controller.riepilogo_match(match_id)["n_eventi"]
+        except Exception:
+            totale = 0
+        self._generazione_caricamento += 1
+        controller = self.controller
+        caricatore = CaricatoreEventi(
+            lambda: controller.itera_eventi_per_match(match_id),
+            self._generazione_caricamento,
+            self,
+        )
+        caricatore.pagina.connect(self._on_pagina_caricata)
+        caricatore.completato.connect(self._on_caricamento_completato)
+        caricatore.fallito.connect(self._on_caricamento_fallito)
+        caricatore.finished.connect(caricatore.deleteLater)
+        self._caricatore = caricatore
+        self.caricamento_progress.setRange(0, totale)
+        self.caricamento_progress.setValue(0)
+        self.caricamento_bar.setVisible(totale > 0)
+        caricatore.start()
+        self.stats_panel.set_match(match_id)
+
+    def annulla_caricamento(self, attendi=False) -> None:
+        """Stop the background event load, if any (rows loaded so far stay)."""
+        caricatore, self._caricatore = self._caricatore, None
+        self.caricamento_bar.hide()
+        if caricatore is None:
+            return
+        try:
+            caricatore.annulla()
+            if attendi:
+                caricatore.wait()
+        except RuntimeError:
+            # already finished and deleted
+            pass
+
+    def _on_pagina_caricata(self, generazione, eventi):
+        if generazione != self._generazione_caricamento:
+            return  # queued by a load that has since been cancelled
+        self._modello.aggiungi_eventi(eventi)
+        self.caricamento_progress.setValue(
+            min(self._modello.rowCount(), self.caricamento_progress.maximum())
+        )
+        if self._caricatore is not None:
+            self._caricatore.pagina_consumata()
+
+    def _on_caricamento_completato(self, generazione, caricati):
+        if generazione != self._generazione_caricamento:
+            return
+        self._caricatore = None
+        self.caricamento_bar.hide()
+        # pages were appended as they arrived: apply the sort once, at the end
+        self._modello.riordina()
+        self._aggiorna_giocatori_filtro()
+        if self._match_caricamento is not None:
+            self.precarica_video(self._match_caricamento)
+
+    def precarica_video(self, match_id) -> None:
+        """Resolve the videos of `match_id` in the background (stream cache).
+
+        Started once the events are on screen, so the extractions do not
+        compete with the window coming up; the first click on any event of
+        the match then plays without waiting for yt_dlp.
+        """
+        self.precarica_label.hide()
+        self._precaricatore.avvia(match_id)
+
+    def _on_precarica_avanzamento(self, generazione, fatti, totale):
+        if generazione != self._precaricatore.generazione:
+            return
+        self.precarica_label.setVisible(totale > 0)
+        self.precarica_label.setText(f"Preparazione video {fatti}/{totale}")
+
+    def _on_precarica_completata(self, generazione, pronti, falliti):
+        if generazione != self._precaricatore.generazione:
+            return
+        totale = pronti + falliti
+        self.precarica_label.setVisible(totale > 0)
+        self.precarica_label.setText(f"Video pronti {pronti}/{totale}")
+        self.precarica_label.setToolTip(
+            f"{falliti} video non risolti: verranno estratti al primo click"
+            if falliti
+            else ""
+        )
+
+    def _on_caricamento_fallito(self, generazione, errore):
+        if generazione != self._generazione_caricamento:
+            return
+        self._caricatore = None
+        self.caricamento_bar.hide()
+        self.status_label.setText(f"Errore caricamento eventi: {errore}")
 
     def carica_eventi_tabella(self):
         """Carica solo gli eventi che hanno stessi campi fissi della sessione corrente"""
-        self.table.setRowCount(0)
+        self.annulla_caricamento()
         data_fissa = self.data_input.date().toString("dd/MM/yyyy")
         squadra_home = self.squadra_home_input.text()
         squadra_away = self.squadra_away_input.text()
         minuto_kickoff = self.minuto_kickoff_input.text()
+        # a match load started meanwhile supersedes this one
+        self._generazione_caricamento += 1
+        generazione = self._generazione_caricamento
 
-        eventi = self.controller.lista_eventi_filtrati(
-            data_fissa, squadra_home, squadra_away, minuto_kickoff
-        )
-        for evento in eventi:
-            data = {
-                "data": evento[1],
-                "squadra_home": evento[2],
-                "squadra_away": evento[3],
-                "giocatore": evento[4],
-                "minuto": evento[5],
-                "minuto_kickoff": evento[6],
-                "tipo_fase": evento[7],
-                "evento_principale": evento[8],
-                "origine_possesso": evento[9],
-                "num_fasi": evento[10],
-                "zona": evento[11],
-                "esito": evento[12],
-                "linea_guadagno": evento[13],
-                "velocita_ruck": evento[14],
-                "penalita": evento[15],
-                "commento": evento[16],
-                "video_url": self._evento_video_url(evento),
-                "id": evento[0],
-            }
-            self.aggiungi_riga_tabella(data)
-
-    def aggiungi_riga_tabella(self, data):
-        row_pos = self.table.rowCount()
-        self.table.insertRow(row_pos)
-        self.aggiorna_riga_tabella(row_pos, data)
-
-    def aggiorna_riga_tabella(self, row, data):
-        values = [
-            data["data"],
-            data["squadra_home"],
-            data["squadra_away"],
-            data.get("giocatore", ""),
-            data.get("minuto_kickoff", ""),
-            data.get("minuto", ""),
-            data.get("tipo_fase", ""),
-            data.get("evento_principale", ""),
-            data.get("origine_possesso", ""),
-            str(data.get("num_fasi", "")),
-            data.get("zona", ""),
-            data.get("esito", ""),
-            data.get("linea_guadagno", ""),
-            data.get("velocita_ruck", ""),
-            data.get("penalita", ""),
-            data.get("commento", ""),
-            data.get("video_url", ""),
-            str(data["id"]),
-        ]
-        for col, value in enumerate(values):
-            self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        def _carica():
+            if generazione != self._generazione_caricamento:
+                return
+            eventi = self.controller.lista_eventi_filtrati(
+                data_fissa, squadra_home, squadra_away, minuto_kickoff
+            )
+            self.mostra_eventi(eventi)
 
-    def switch_video_player(self, mode: str) -> None:
-        """
-        Switch the video player implementation at runtime.
+        # read once the queued saves are committed (the new rows included)
+        self._dopo_scritture(_carica)
 
-        Args:
-            mode: "embed" to use [`VideoPlayerEmbed`](app/ui/video_player_embed.py)
-                  or "stream" to use [`VideoPlayerStream`](app/ui/video_player_stream.py).
-        """
-        if mode == self.current_video_mode:
-            return
+    def mostra_eventi(self, eventi):
+        """Replace the table content with `eventi` (Evento records)."""
+        self._modello.imposta_eventi(eventi)
+        self._aggiorna_giocatori_filtro()
 
-        # Remove and delete existing widget(s) inside the container
-        while self.video_container_layout.count():
-            item = self.video_container_layout.takeAt(0)
-            if item is None:
-                continue
-            widget = item.widget()
-            if widget:
-                widget.setParent(None)
-                widget.deleteLater()
-
-        # Instantiate the requested player
+    def aggiungi_riga_tabella(self, evento):
+        self._modello.aggiungi(evento)
+
+    def aggiorna_riga_tabella(self, row, evento):
+        """Replace the event at source row `row` (see EventiModel)."""
+        self._modello.aggiorna(row, evento)
+
+    @property
+    def video_player(self):
+        """The active player, built (and its modules imported) on first use."""
+        if self._players.attivo is None:
+            self._players.mostra(self.current_video_mode)
+        return self._players.attivo
+
+    def _crea_player(self, mode: str) -> QWidget:
+        """Import and instantiate the player for `mode` ("embed" or "stream")."""
         if mode == "embed":
-            new_player = VideoPlayerEmbed(self)
+            from ui.video_player_embed import VideoPlayerEmbed
+
+            player = VideoPlayerEmbed(self)
         else:
-            new_player = VideoPlayerStream(self)
+            from ui.video_player_stream import VideoPlayerStream
+
+            player = VideoPlayerStream(self)
         # Ensure the new player expands to fill the video container
         try:
-            new_player.setSizePolicy(
+            player.setSizePolicy(
                 QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding
             )
         except Exception:
             pass
+        return player
 
-        self.video_player = new_player
-        self.video_container_layout.addWidget(self.video_player)
-        self.current_video_mode = mode
-
-        # Try to reload the current video URL (fallback to demo if not present)
-        url_to_load = (
-            self.current_video_url or "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
-        )
+    def _carica_video_corrente(self) -> None:
+        """Load `current_video_url` into the player (building it if needed)."""
         try:
-            try:
-                self.video_player.set_url(url_to_load, 0)
-            except TypeError:
-                self.video_player.set_url(url_to_load)
+            self.video_player.set_url(self.current_video_url)
         except Exception:
-            # Keep UI stable if player doesn't accept set_url or fails
             pass
 
-    def on_table_cell_clicked(self, row: int, column: int) -> None:
-        """Handle table clicks: load/seek the video to the time specified in the 'Minuto' column.
+    def switch_video_player(self, mode: str) -> None:
+        """
+        Switch the video player implementation at runtime.
+
+        Args:
+            mode: "embed" to use [`VideoPlayerEmbed`](app/ui/video_player_embed.py)
+                  or "stream" to use [`VideoPlayerStream`](app/ui/video_player_stream.py).
 
-        The 'Minuto' column is at index 4. It may contain a minute value (int) or a time
-        string like '1:23' meaning 1 minute 23 seconds. We convert that to milliseconds
-        and instruct the current video player to seek to that position.
+        Only the requested player's modules are imported; the other one is
+        never loaded unless the user switches to it. Built players are kept
+        (see [`PlayerManager`](app/ui/player_manager.py)): the hidden one is
+        suspended and the shown one continues the same video at the same
+        position.
         """
-        # Minuto now lives in column 5 (after inserting 'Giocatore' and 'Minuto Kickoff')
-        minuto_item = self.table.item(row, 5)
-        if minuto_item is None:
+        if mode == self.current_video_mode:
             return
-        minuto_text = minuto_item.text().strip() if minuto_item.text() else ""
-        if not minuto_text:
+        self.current_video_mode = mode
+        self._players.passa_a(mode, self.current_video_url or "")
+
+    def on_table_cell_clicked(self, row: int, column: int) -> None:
+        """Handle table clicks: load/seek the video to the event's 'Minuto'.
+
+        `row` is a view row; the event behind it comes from the proxy, so
+        this works whatever the current sort order. The minute may be a plain
+        number or a time string like '1:23'; the stored minuto_ms is used
+        when present, otherwise the text is parsed.
+        """
+        evento = self._evento_riga(row)
+        if not (evento.minuto or "").strip():
             return
-        ms = parse_minuto_to_ms(minuto_text)
+        ms = evento.minuto_ms
+        if ms is None:
+            ms = parse_minuto_to_ms(evento.minuto)
 
-        # Prefer the per-row video URL (col 16). Fallback to currently loaded URL or demo.
-        row_video_url = self._table_text(row, 16)
+        # Prefer the per-row video URL. Fallback to currently loaded URL or demo.
+        self.apri_video_evento(evento.video_url or "", ms)
+
+    def apri_video_evento(self, row_video_url: str, ms: int) -> None:
+        """Load (or seek) the player to an event: its video URL at `ms` milliseconds."""
         demo = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
         url = row_video_url or self.current_video_url or demo
 
@@ -1001,10 +1399,11 @@ class MainWindow(QWidget):
         """
         prefill = ""
         try:
-            if hasattr(self.video_player, "get_current_url"):
-                prefill = self.video_player.get_current_url() or ""
+            if hasattr(self._players.attivo, "get_current_url"):
+                prefill = self._players.attivo.get_current_url() or ""
         except Exception:
-            prefill = self.current_video_url or ""
+            prefill = ""
+        prefill = prefill or self.current_video_url or ""
 
         text, ok = QInputDialog.getText(
             self, "Add Video URL", "Video URL:", text=prefill
@@ -52,8 +52,10 @@ class MatchSelector(QDialog):
         self.list_widget.clear()
         rows = self.controller.lista_matches()
         for r in rows:
-            # r = (id, name, data, squadra_home, squadra_away)
+            # r = (id, name, data, squadra_home, squadra_away, n_eventi)
             display = f"{r[1] or 'Match ' + str(r[0])} - {r[2]} {r[3]} vs {r[4]}"
+            if len(r) > 5:
+                display += f" ({r[5]} eventi)"
             item = QListWidgetItem(display)
             # use ItemDataRole enum for user role
             try:
@@ -0,0 +1,107 @@
+"""Keep the embed and stream players alive and switch between them.
+
+Rebuilding a player on every mode switch re-creates a Chromium view or runs
+yt_dlp again, and the video restarts from zero. PlayerManager is a
+QStackedWidget holding one player per mode: a player is built the first
+time its mode is shown (by the factory passed in, so its modules are still
+imported lazily) and then only hidden.
+
+On a switch the hidden player is suspended (`sospendi()`: playback paused,
+decoder or page resources released) and the shown one takes over the URL
+and position of the previous one, resuming (`riprendi()`) without reloading
+when it already has that video. Besides set_url/seek/play a player may
+provide:
+
+- current_time_ms() -> int: the current position;
+- is_playing() -> bool: whether it is playing (or about to);
+- sospendi(): release resources while hidden;
+- riprendi(ms, avvia) -> bool: resume at `ms` (False: call set_url instead).
+"""
+
+from typing import Callable, Optional
+
+from PyQt6.QtWidgets import QStackedWidget, QWidget
+
+
+class PlayerManager(QStackedWidget):
+    def __init__(
+        self, crea: Callable[[str], QWidget], parent: Optional[QWidget] = None
+    ) -> None:
+        """`crea(mode)` builds the player of `mode` ("embed" or "stream")."""
+        super().__init__(parent)
+        self._crea = crea
+        # mode -> player, built on first use
+        self._player = {}
+        self.modalita = None
+
+    @property
+    def attivo(self) -> Optional[QWidget]:
+        """The player on show, or None before the first one is built."""
+        return self._player.get(self.modalita)
+
+    def creato(self, mode: str) -> bool:
+        """Whether the player of `mode` has already been built."""
+        return mode in self._player
+
+    def player(self, mode: str) -> QWidget:
+        """The player of `mode`, built and added to the stack if needed."""
+        player = self._player.get(mode)
+        if player is None:
+            player = self._player[mode] = self._crea(mode)
+            self.addWidget(player)
+        return player
+
+    def mostra(self, mode: str) -> QWidget:
+        """Show the player of `mode` without handing anything over to it."""
+        player = self.player(mode)
+        self.modalita = mode
+        self.setCurrentWidget(player)
+        return player
+
+    def passa_a(self, mode: str, url_predefinito: str = "") -> QWidget:
+        """Show the player of `mode`, continuing the video of the current one.
+
+        The URL is the one the current player shows (else `url_predefinito`);
+        playback resumes at the same position, playing only if it was.
+        """
+        precedente = self.attivo
+        if mode == self.modalita and precedente is not None:
+            return precedente
+        url, posizione, in_riproduzione = url_predefinito or "", 0, False
+        if precedente is not None:
+            url = _chiama(precedente, "get_current_url", "") or url
+            posizione = _chiama(precedente, "current_time_ms", 0) or 0
+            in_riproduzione = bool(_chiama(precedente, "is_playing", False))
+
+        nuovo = self.mostra(mode)
+        if precedente is not None:
+            _chiama(precedente, "sospendi")
+        if not url:
+            return nuovo
+        try:
+            if _chiama(nuovo, "get_current_url", "") == url and _chiama(
+                nuovo, "riprendi", False, posizione, in_riproduzione
+            ):
+                return nuovo
+            nuovo.set_url(url, posizione)
+            if in_riproduzione:
+                nuovo.play()
+        except Exception as e:
+            print(f"[PLAYER] impossibile riprendere {url} in modalità {mode}: {e}")
+        return nuovo
+
+    def sospendi_tutti(self) -> None:
+        """Suspend every player (e.g. when the window closes)."""
+        for player in self._player.values():
+            _chiama(player, "sospendi")
+
+
+def _chiama(player, metodo, predefinito=None, *argomenti):
+    # optional player methods: missing or failing ones give `predefinito`
+    funzione = getattr(player, metodo, None)
+    if funzione is None:
+        return predefinito
+    try:
+        return funzione(*argomenti)
+    except Exception:
+        return predefinito
@@ -0,0 +1,106 @@
+"""Pre-resolve the videos of a match in the background.
+
+A match may reference several videos (two halves, another camera angle set
+per event in video_url) and the first click on each one would wait for a
+yt_dlp extraction. Once a match is open, PrecaricatoreVideo lists its
+videos (services.video_urls_match) on a worker thread and hands them to
+StreamResolver.precarica(), which resolves them one at a time behind the
+user's own requests and stores the results in the stream cache.
+
+YouTube links of the same video (youtu.be / youtube.com) are resolved once;
+links that are not YouTube are skipped, as the cache does not keep them.
+Progress reaches the UI thread through the `avanzamento` and `completato`
+signals, tagged with the generation returned by avvia() so that results of
+a previous match can be told apart.
+"""
+
+import threading
+
+from core.database import close_connection
+from core.stream_cache import id_video
+from core.stream_resolver import resolver_condiviso
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class PrecaricatoreVideo(QObject):
+    # (generation, videos done so far, total videos)
+    avanzamento = pyqtSignal(int, int, int)
+    # (generation, videos resolved, videos that failed)
+    completato = pyqtSignal(int, int, int)
+
+    def __init__(self, elenca_url, parent=None, resolver=None):
+        """`elenca_url(match_id)` returns the match's video URLs; it runs on
+        the worker thread (e.g. EventoController.video_urls_match)."""
+        super().__init__(parent)
+        self._elenca_url = elenca_url
+        self._resolver = resolver
+        self.generazione = 0
+
+    def avvia(self, match_id) -> int:
+        """Start pre-resolving the videos of `match_id`; returns the generation."""
+        self.annulla()
+        generazione = self.generazione
+        threading.Thread(
+            target=self.esegui,
+            args=(generazione, match_id),
+            name="video-prefetch",
+            daemon=True,
+        ).start()
+        return generazione
+
+    def annulla(self) -> None:
+        """Forget the running prefetch; its queued videos are not resolved."""
+        self.generazione += 1
+        if self._resolver is not None:
+            self._resolver.annulla_precarica()
+
+    def esegui(self, generazione, match_id) -> None:
+        """List and submit the videos (worker thread; run directly in tests)."""
+        try:
+            urls = self._elenca_url(match_id)
+        except Exception as e:
+            print(f"[VIDEO] elenco video del match {match_id} non disponibile: {e}")
+            urls = []
+        finally:
+            close_connection()
+        if generazione != self.generazione:
+            return
+        per_video = {}
+        for url in urls:
+            chiave = id_video(url)
+            if chiave is not None:
+                per_video.setdefault(chiave, url)
+        totale = len(per_video)
+        if not self._emetti(self.avanzamento, generazione, 0, totale):
+            return
+        if not totale:
+            self._emetti(self.completato, generazione, 0, 0)
+            return
+
+        if self._resolver is None:
+            self._resolver = resolver_condiviso()
+        lock = threading.Lock()
+        esiti = {"pronti": 0, "falliti": 0}
+
+        def _fatto(futuro):
+            if futuro.cancelled():
+                return  # dropped by annulla(): a newer generation took over
+            with lock:
+                esiti["falliti" if futuro.exception() else "pronti"] += 1
+                pronti, falliti = esiti["pronti"], esiti["falliti"]
+            self._emetti(self.avanzamento, generazione, pronti + falliti, totale)
+            if pronti + falliti == totale:
+                self._emetti(self.completato, generazione, pronti, falliti)
+
+        for url in per_video.values():
+            if generazione != self.generazione:
+                return
+            self._resolver.precarica(url).add_done_callback(_fatto)
+
+    def _emetti(self, segnale, *argomenti) -> bool:
+        try:
+            segnale.emit(*argomenti)
+        except RuntimeError:
+            # the window was closed and this object deleted
+            return False
+        return True
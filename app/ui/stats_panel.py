@@ -0,0 +1,95 @@
+from core.services import COLONNE_RAGGRUPPAMENTO
+from PyQt6.QtWidgets import (
+    QComboBox,
+    QGroupBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+# metrics shown by the panel, with their column headers
+METRICHE = [
+    ("count", "Eventi"),
+    ("avg:num_fasi", "Media fasi"),
+    ("max:num_fasi", "Max fasi"),
+]
+
+
+class StatsPanel(QGroupBox):
+    """
+    Per-match statistics computed by SQLite (EventoController.statistiche_match).
+
+    Call `set_match(match_id)` when the current match changes and `aggiorna()`
+    after events are saved.
+    """
+
+    def __init__(self, controller, parent=None):
+        super().__init__("Statistiche match", parent)
+        self.controller = controller
+        self.match_id = None
+
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        self.group_combo = QComboBox()
+        self.group_combo.addItems(COLONNE_RAGGRUPPAMENTO)
+        self.group_combo.setCurrentText("evento_principale")
+        self.group2_combo = QComboBox()
+        self.group2_combo.addItem("")
+        self.group2_combo.addItems(COLONNE_RAGGRUPPAMENTO)
+        self.group2_combo.setCurrentText("esito")
+        refresh_btn = QPushButton("Aggiorna")
+        controls.addWidget(QLabel("Per:"))
+        controls.addWidget(self.group_combo, 1)
+        controls.addWidget(QLabel("e:"))
+        controls.addWidget(self.group2_combo, 1)
+        controls.addWidget(refresh_btn)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget()
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        layout.addWidget(self.table)
+
+        self.group_combo.currentIndexChanged.connect(lambda _: self.aggiorna())
+        self.group2_combo.currentIndexChanged.connect(lambda _: self.aggiorna())
+        refresh_btn.clicked.connect(self.aggiorna)
+
+    def set_match(self, match_id) -> None:
+        self.match_id = match_id
+        self.aggiorna()
+
+    def aggiorna(self) -> None:
+        group_by = [self.group_combo.currentText()]
+        secondo = self.group2_combo.currentText()
+        if secondo and secondo not in group_by:
+            group_by.append(secondo)
+
+        self.table.setRowCount(0)
+        intestazioni = group_by + [titolo for _, titolo in METRICHE]
+        self.table.setColumnCount(len(intestazioni))
+        self.table.setHorizontalHeaderLabels(intestazioni)
+        if not self.match_id:
+            return
+        try:
+            righe = self.controller.statistiche_match(
+                self.match_id, group_by, [m for m, _ in METRICHE]
+            )
+        except Exception as e:
+            self.setTitle(f"Statistiche match (errore: {e})")
+            return
+        self.setTitle("Statistiche match")
+        self.table.setRowCount(len(righe))
+        for r, riga in enumerate(righe):
+            for c, valore in enumerate(riga.values()):
+                if valore is None:
+                    valore = ""
+                elif isinstance(valore, float):
+                    valore = f"{valore:.1f}"
+                self.table.setItem(r, c, QTableWidgetItem(str(valore)))
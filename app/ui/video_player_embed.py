@@ -1,17 +1,91 @@
-from typing import Optional
+import json
+import os
+from typing import Callable, Optional
 
-from PyQt6.QtCore import QTimer, QUrl
+from core.stream_cache import id_video
+from PyQt6.QtCore import (
+    QFile,
+    QIODevice,
+    QObject,
+    QTimer,
+    QUrl,
+    pyqtSignal,
+    pyqtSlot,
+)
+from PyQt6.QtWebChannel import QWebChannel
+from PyQt6.QtWebEngineCore import (
+    QWebEnginePage,
+    QWebEngineScript,
+    QWebEngineSettings,
+)
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from PyQt6.QtWidgets import QLabel, QSizePolicy, QVBoxLayout, QWidget
 
+# host page of the YouTube IFrame API player (see the page for its JS functions)
+PAGINA_PLAYER = os.path.join(os.path.dirname(__file__), "player_youtube.html")
+# origin the page is served from: the IFrame API refuses pages without one
+ORIGINE_PAGINA = QUrl("http://localhost/")
+
+# YouTube player error codes (onError) worth a readable message
+ERRORI_YOUTUBE = {
+    2: "ID video non valido",
+    5: "Video non riproducibile nel player HTML5",
+    100: "Video non trovato o privato",
+    101: "Il proprietario non consente la riproduzione incorporata",
+    150: "Il proprietario non consente la riproduzione incorporata",
+}
+
+# YT.PlayerState values reported by onStateChange
+STATO_IN_RIPRODUZIONE = 1
+STATO_IN_PAUSA = 2
+STATO_BUFFERING = 3
+
+
+class _Ponte(QObject):
+    """Object "ponte" of the page's QWebChannel: player events from JS."""
+
+    pronto = pyqtSignal()
+    errore = pyqtSignal(int)
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.stato = -1
+        self.tempo_s = 0.0
+
+    @pyqtSlot()
+    def onReady(self) -> None:
+        self.pronto.emit()
+
+    @pyqtSlot(int)
+    def onStateChange(self, stato: int) -> None:
+        self.stato = stato
+
+    @pyqtSlot(int)
+    def onError(self, codice: int) -> None:
+        self.errore.emit(codice)
+
+    @pyqtSlot(float)
+    def onTime(self, secondi: float) -> None:
+        self.tempo_s = secondi
+
 
 class VideoPlayerEmbed(QWidget):
     """
-    Simple YouTube embed player using QWebEngineView.
+    YouTube player using the IFrame Player API inside a QWebEngineView.
+
+    The page (player_youtube.html) is loaded once; videos are then changed
+    with loadVideoById/cueVideoById and seek/play/pause call the player's
+    JS API through runJavaScript, so clicking an event seeks in the loaded
+    video instead of reloading the iframe. The player reports back (ready,
+    errors, current time) through a QWebChannel.
+
+    Commands issued before the API is ready are kept and applied when it
+    is. Links that are not YouTube are opened directly in the view.
 
     Usage:
         player = VideoPlayerEmbed()
-        player.set_url("https://www.youtube.com/watch?v=XXXX")
+        player.set_url("https://www.youtube.com/watch?v=XXXX", 90_000)
+        player.seek(120_000)
     """
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
@@ -29,6 +103,27 @@ class VideoPlayerEmbed(QWidget):
         layout.addWidget(self._view, 1)
         layout.addWidget(self._info, 0)
 
+        # True once the host page is in the view / its player is ready
+        self._pagina = False
+        self._pronto = False
+        # video to show, start (seconds) and autoplay: applied when ready
+        self._video_id = None
+        self._start_s = 0.0
+        self._autoplay = False
+
+        self._ponte = _Ponte(self)
+        self._ponte.pronto.connect(self._on_pronto)
+        self._ponte.errore.connect(self._on_errore)
+        pagina = self._view.page()
+        self._canale = QWebChannel(pagina)
+        self._canale.registerObject("ponte", self._ponte)
+        pagina.setWebChannel(self._canale)
+        _inietta_qwebchannel(pagina)
+        # playVideo() comes from the app, not from a click in the page
+        pagina.settings().setAttribute(
+            QWebEngineSettings.WebAttribute.PlaybackRequiresUserGesture, False
+        )
+
     def _to_embed_url(self, url: str) -> str:
         """
         Convert common YouTube URLs to an embed URL.
@@ -51,41 +146,46 @@ class VideoPlayerEmbed(QWidget):
 
     def set_url(self, url: str, start_ms: int = 0) -> None:
         """
-        Set the video URL. Automatically converts to embed URL where applicable.
+        Show the video of `url`, cued at `start_ms` milliseconds.
 
-        An optional start time (milliseconds) can be provided — the embed URL will
-        receive the `start` parameter in seconds.
+        The same video as the current one is only seeked; another YouTube
+        video replaces it in the loaded player without reloading the page.
         """
         try:
             # remember the original provided URL (useful for persisting or reusing)
             self._orig_url = url.strip()
-            embed = self._to_embed_url(self._orig_url)
-            # store base for later seeks
-            self._last_base = embed.split("?")[0]
-            if start_ms and start_ms > 0:
-                start_s = int(start_ms // 1000)
-                url_with_start = f"{self._last_base}?start={start_s}"
-                # remember last seek in seconds for play()
-                self._last_seek_s = start_s
-            else:
-                url_with_start = self._last_base
-                self._last_seek_s = 0
-            self._view.setUrl(QUrl(url_with_start))
+            start_s = max(0, int(start_ms or 0)) / 1000.0
+            video_id = id_video(self._orig_url)
+            if video_id is None:
+                # not YouTube: let the web view open it as it is
+                self._pagina = self._pronto = False
+                self._video_id = None
+                self._view.setUrl(QUrl(self._to_embed_url(self._orig_url)))
+                self._info.setText("")
+                return
             self._info.setText("")
+            if video_id == self._video_id:
+                self.seek(int(start_s * 1000))
+                return
+            self._video_id = video_id
+            self._start_s = start_s
+            self._autoplay = False
+            self._ponte.tempo_s = start_s
+            if self._pronto:
+                self._esegui("caricaVideo", video_id, start_s, False)
+            else:
+                self._carica_pagina()
         except Exception as exc:  # keep robust and simple
             self._info.setText(f"Errore caricamento video: {exc}")
 
     def set_url_with_start(self, url: str, start_ms: int = 0) -> None:
-        """Set the video URL and jump to start_ms (milliseconds).
-
-        For embedded YouTube this adds the `start` parameter (in seconds).
-        """
+        """Set the video URL and jump to start_ms (milliseconds)."""
         # Keep backward compatibility but delegate to the normalized set_url
         self.set_url(url, start_ms=start_ms)
 
     def seek(self, ms: int) -> None:
-        """Seek to ms milliseconds by reloading embed URL with start parameter."""
-        if not hasattr(self, "_last_base"):
+        """Seek to ms milliseconds in the loaded video (no page reload)."""
+        if self._video_id is None:
             # nothing loaded yet; show a short status so the user knows why
             try:
                 self._info.setText("Nessun video caricato per il seek")
@@ -93,46 +193,149 @@ class VideoPlayerEmbed(QWidget):
             except Exception:
                 pass
             return
-        try:
-            start_s = int(max(0, ms // 1000))
-            url_with_start = f"{self._last_base}?start={start_s}"
-            # remember last seek in seconds so play() can enable autoplay
-            self._last_seek_s = start_s
-            self._view.setUrl(QUrl(url_with_start))
-        except Exception as exc:
-            # show a transient message so users aren't left guessing
+        secondi = max(0, int(ms)) / 1000.0
+        self._ponte.tempo_s = secondi
+        if not self._pronto:
+            # still bootstrapping: start the video from here instead
+            self._start_s = secondi
+            return
+        self._esegui("seekTo", secondi)
+
+    def play(self) -> None:
+        """Start playback (once the player is ready, if it is still loading)."""
+        if self._video_id is None:
+            return
+        if not self._pronto:
+            self._autoplay = True
+            return
+        self._esegui("playVideo")
+
+    def pause(self) -> None:
+        """Pause playback."""
+        self._autoplay = False
+        if self._pronto:
+            self._esegui("pauseVideo")
+
+    def current_time_ms(self) -> int:
+        """Last position reported by the player, in milliseconds (no round trip).
+
+        The page reports it four times a second, so it may lag by up to 250 ms;
+        use get_current_time() for the exact value.
+        """
+        return int(self._ponte.tempo_s * 1000)
+
+    def get_current_time(self, callback: Callable[[int], None]) -> None:
+        """Ask the player for its position; `callback(ms)` runs on the UI thread."""
+        if not self._pronto:
+            callback(self.current_time_ms())
+            return
+
+        def _risposta(secondi):
             try:
-                self._info.setText(f"Errore seek: {exc}")
-                QTimer.singleShot(3000, lambda: self._info.setText(""))
+                callback(int(float(secondi or 0) * 1000))
             except Exception:
                 pass
 
-    def play(self) -> None:
-        """Attempt to start playback for the embedded player.
+        self._view.page().runJavaScript("getCurrentTime()", _risposta)
+
+    def is_playing(self) -> bool:
+        """Whether the video is playing (or buffering, or about to start)."""
+        if not self._pronto:
+            return self._video_id is not None and self._autoplay
+        return self._ponte.stato in (STATO_IN_RIPRODUZIONE, STATO_BUFFERING)
 
-        For YouTube embeds we try to reload the iframe with autoplay=1. Note that
-        browser/autoplay policies may block audio autoplay; this will still try.
+    def sospendi(self) -> None:
+        """Pause, then freeze the hidden page (see ui.player_manager).
+
+        A frozen page runs no scripts or timers and Chromium may release its
+        media resources; the next command unfreezes it (see _esegui).
         """
-        if not hasattr(self, "_last_base"):
+        self._autoplay = False
+        if not self._pronto:
             return
-        try:
-            # Build URL including start and autoplay
-            params = []
-            if hasattr(self, "_last_seek_s") and self._last_seek_s:
-                params.append(f"start={int(self._last_seek_s)}")
-            params.append("autoplay=1")
-            sep = "?" if "?" not in self._last_base else "&"
-            url = f"{self._last_base}{sep}{'&'.join(params)}"
-            self._view.setUrl(QUrl(url))
-        except Exception:
-            # best-effort; ignore errors
-            pass
+        self._ponte.stato = STATO_IN_PAUSA
+        pagina = self._view.page()
+
+        def _congela(_risultato=None):
+            # only hidden pages can be frozen; shown again meanwhile: skip
+            if self._view.isVisible():
+                return
+            try:
+                pagina.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            except Exception:
+                pass
+
+        pagina.runJavaScript("pauseVideo()", _congela)
+
+    def riprendi(self, ms: int, avvia: bool = False) -> bool:
+        """Continue the current video at `ms` milliseconds after sospendi()."""
+        if self._video_id is None:
+            return False
+        self.seek(ms)
+        if avvia:
+            self.play()
+        return True
 
     def clear(self) -> None:
-        """Clear the player view."""
-        self._view.setHtml("")
+        """Stop the video; the host page stays loaded for the next one."""
+        self._video_id = None
+        self._autoplay = False
+        self._ponte.tempo_s = 0.0
+        if self._pronto:
+            self._esegui("stopVideo")
+        elif not self._pagina:
+            self._view.setHtml("")
         self._info.setText("")
 
     def get_current_url(self) -> str:
         """Return the last-provided original URL for this player (or empty string)."""
         return getattr(self, "_orig_url", "")
+
+    def _carica_pagina(self) -> None:
+        if self._pagina:
+            return  # _on_pronto will load self._video_id
+        with open(PAGINA_PLAYER, encoding="utf-8") as f:
+            html = f.read()
+        self._pagina = True
+        self._pronto = False
+        self._view.setHtml(html, ORIGINE_PAGINA)
+
+    def _on_pronto(self) -> None:
+        self._pronto = True
+        if self._video_id is not None:
+            self._esegui("caricaVideo", self._video_id, self._start_s, self._autoplay)
+        self._autoplay = False
+
+    def _on_errore(self, codice: int) -> None:
+        messaggio = ERRORI_YOUTUBE.get(codice, "errore sconosciuto")
+        self._info.setText(f"Errore player YouTube ({codice}): {messaggio}")
+
+    def _esegui(self, funzione: str, *argomenti) -> None:
+        """Call a function of the host page with JSON-encoded arguments."""
+        pagina = self._view.page()
+        try:
+            if pagina.lifecycleState() != QWebEnginePage.LifecycleState.Active:
+                pagina.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        except Exception:
+            pass
+        codice = f"{funzione}({', '.join(json.dumps(a) for a in argomenti)})"
+        try:
+            pagina.runJavaScript(codice)
+        except Exception as exc:
+            self._info.setText(f"Errore player: {exc}")
+
+
+def _inietta_qwebchannel(pagina) -> None:
+    """Make qwebchannel.js (from Qt's resources) available to every page load."""
+    sorgente = QFile(":/qtwebchannel/qwebchannel.js")
+    if not sorgente.open(QIODevice.OpenModeFlag.ReadOnly):
+        print("[PLAYER] qwebchannel.js non disponibile")
+        return
+    script = QWebEngineScript()
+    script.setName("qwebchannel")
+    script.setSourceCode(bytes(sorgente.readAll()).decode("utf-8"))
+    script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+    script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
+    script.setRunsOnSubFrames(False)
+    sorgente.close()
+    pagina.scripts().insert(script)
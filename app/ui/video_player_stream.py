@@ -1,7 +1,7 @@
 from typing import Optional
 
-import yt_dlp
-from PyQt6.QtCore import Qt, QTimer, QUrl
+from core.stream_resolver import resolver_condiviso, seleziona_stream_url
+from PyQt6.QtCore import Qt, QTimer, QUrl, pyqtSignal
 from PyQt6.QtMultimedia import QAudioOutput, QMediaPlayer
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtWidgets import (
@@ -18,13 +18,27 @@ from PyQt6.QtWidgets import (
 class VideoPlayerStream(QWidget):
     """
     Stream player using QMediaPlayer + QVideoWidget.
-    Uses yt_dlp to extract a direct streamable URL from YouTube.
+    Uses yt_dlp to extract a direct streamable URL from YouTube; extraction
+    runs on a core.stream_resolver thread pool so the UI never waits on it.
 
     Controls: Play, Pause, Stop, Volume, Seek.
     """
 
-    def __init__(self, parent: Optional[QWidget] = None) -> None:
+    # (request number, stream URL, error message) from the resolver thread
+    _risolto = pyqtSignal(int, str, str)
+
+    def __init__(self, parent: Optional[QWidget] = None, resolver=None) -> None:
         super().__init__(parent)
+        self._resolver = resolver or resolver_condiviso()
+        # number of the latest set_url(); results of older ones are ignored
+        self._richiesta = 0
+        self._in_attesa = False
+        self._start_ms = 0
+        # True once the current video has been re-extracted after an error
+        self._ritentato = False
+        # source released by sospendi(), restored by riprendi()
+        self._sospeso = None
+        self._risolto.connect(self._applica_stream)
 
         # Media objects
         self._player = QMediaPlayer(self)
@@ -142,69 +156,85 @@ class VideoPlayerStream(QWidget):
         return f"{minutes}:{seconds:02d}"
 
     def _on_error(self, error):
+        # The stream URL may come from the cache and be refused (HTTP 403 once
+        # YouTube expires it early): drop it and extract again, once per video.
+        if getattr(self, "_orig_url", "") and not self._ritentato:
+            self._ritentato = True
+            self._resolver.invalida(self._orig_url)
+            posizione = int(self._player.position() or 0)
+            self._risolvi(self._orig_url, posizione, aggiorna=True)
+            return
         # Display a readable message; keep simple
         self._info_label.setText(f"Player error: {self._player.errorString()}")
 
     def _select_stream_url(self, info: dict) -> Optional[str]:
-        """
-        Choose a suitable stream URL from yt_dlp info dict.
-        Prefer a direct http(s) url from formats or info['url'] when present.
-        """
-        if not info:
-            return None
-        if "url" in info and isinstance(info["url"], str):
-            return info["url"]
-        formats = info.get("formats") or []
-        # Try to prefer a format that has 'protocol' http/https and has a url
-        for fmt in reversed(formats):  # reversed often yields higher quality later
-            url = fmt.get("url")
-            protocol = fmt.get("protocol", "")
-            if url and protocol.startswith("http"):
-                return url
-        # Fallback to first available format url
-        for fmt in formats:
-            if fmt.get("url"):
-                return fmt.get("url")
-        return None
+        """Choose a suitable stream URL from a yt_dlp info dict."""
+        return seleziona_stream_url(info)
 
     def set_url(self, url: str, start_ms: int = 0) -> None:
         """
-        Extract a direct stream URL from YouTube via yt_dlp and set it on the player.
-        If extraction fails, show an error message.
+        Resolve a direct stream URL for a YouTube link and play it.
+
+        Returns at once: the player shows a loading message until the
+        resolver's future completes, then sets the source (see
+        _applica_stream). A newer set_url() supersedes a pending one.
+        Videos already resolved (core.stream_cache) start immediately.
         """
         # remember the original URL provided by the user
         self._orig_url = url.strip()
+        self._ritentato = False
+        self._risolvi(self._orig_url, start_ms)
+
+    def _risolvi(self, url: str, start_ms: int, aggiorna: bool = False) -> None:
+        self._richiesta += 1
+        richiesta = self._richiesta
+        self._in_attesa = True
+        self._start_ms = int(start_ms or 0)
+        self._sospeso = None
+        self._player.stop()
         self._info_label.setText("Caricamento video...")
+        segnale = self._risolto
+
+        def _fatto(futuro):
+            # resolver thread: only emit, the slot runs on the UI thread
+            if futuro.cancelled():
+                return
+            errore = futuro.exception()
+            try:
+                if errore is None:
+                    segnale.emit(richiesta, futuro.result(), "")
+                else:
+                    segnale.emit(richiesta, "", str(errore) or repr(errore))
+            except RuntimeError:
+                # the player was deleted while resolving
+                pass
+
+        self._resolver.risolvi(url, aggiorna).add_done_callback(_fatto)
+
+    def _applica_stream(self, richiesta: int, stream_url: str, errore: str) -> None:
+        if richiesta != self._richiesta:
+            return  # superseded by a later set_url()
+        self._in_attesa = False
+        if errore:
+            self._info_label.setText(f"Errore estrazione/streaming: {errore}")
+            return
         try:
-            ydl_opts = {
-                "quiet": True,
-                "skip_download": True,
-                "no_warnings": True,
-                "format": "best",
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url.strip(), download=False)
-            info_dict = info if isinstance(info, dict) else {}
-            stream_url = self._select_stream_url(info_dict)
-            if not stream_url:
-                raise RuntimeError("Nessun flusso disponibile dal link fornito.")
-            # Use QUrl to set media source
             self._player.setSource(QUrl(stream_url))
             self._info_label.setText("")
             # Auto-play after setting source
             self._player.play()
-            # If a start_ms was requested, schedule a seek after play begins
-            if start_ms and start_ms > 0:
-                try:
-                    # Some backends require a short delay; setPosition should work after source set
-                    self._player.setPosition(int(start_ms))
-                except Exception:
-                    pass
+            # Seek to the requested start (or to the last seek made while loading)
+            if self._start_ms > 0:
+                self._player.setPosition(self._start_ms)
         except Exception as exc:
             self._info_label.setText(f"Errore estrazione/streaming: {exc}")
 
     def clear(self) -> None:
         """Stop and clear the current media."""
+        self._richiesta += 1
+        self._in_attesa = False
+        self._sospeso = None
+        self._resolver.annulla()
         try:
             self._player.stop()
             self._player.setSource(QUrl())
@@ -214,6 +244,10 @@ class VideoPlayerStream(QWidget):
 
     def seek(self, ms: int) -> None:
         """Seek to the given position in milliseconds."""
+        if self._in_attesa:
+            # still resolving: start from here once the source is set
+            self._start_ms = int(ms)
+            return
         try:
             # If no source is set, inform the user briefly
             if not self._player.source() or not str(self._player.source().toString()):
@@ -233,11 +267,61 @@ class VideoPlayerStream(QWidget):
 
     def play(self) -> None:
         """Start playback using the underlying QMediaPlayer."""
+        if self._in_attesa:
+            return  # playback starts when the resolved source is applied
         try:
             self._player.play()
         except Exception:
             pass
 
+    def current_time_ms(self) -> int:
+        """Current position in milliseconds (the start, while resolving)."""
+        if self._in_attesa:
+            return self._start_ms
+        return int(self._player.position() or 0)
+
+    def is_playing(self) -> bool:
+        """Whether the video is playing, or will once its source is resolved."""
+        if self._in_attesa:
+            return True
+        return self._player.playbackState() == QMediaPlayer.PlaybackState.PlayingState
+
+    def sospendi(self) -> None:
+        """Stop and release the decoder while hidden (see ui.player_manager)."""
+        if self._in_attesa:
+            # nobody is watching: drop it, the next set_url() resolves again
+            self._richiesta += 1
+            self._in_attesa = False
+            self._resolver.annulla()
+            self._sospeso = None
+        elif self._sospeso is None:
+            sorgente = self._player.source()
+            self._sospeso = None if sorgente.isEmpty() else sorgente
+        try:
+            self._player.stop()
+            # an empty source frees the decoder and the network stream
+            self._player.setSource(QUrl())
+        except Exception:
+            pass
+
+    def riprendi(self, ms: int, avvia: bool = False) -> bool:
+        """Restore the source released by sospendi() at `ms` milliseconds.
+
+        Returns False when there is nothing to restore (use set_url()).
+        """
+        if self._sospeso is None:
+            return False
+        sorgente, self._sospeso = self._sospeso, None
+        try:
+            self._player.setSource(sorgente)
+            if avvia:
+                self._player.play()
+            self._player.setPosition(max(0, int(ms)))
+        except Exception as exc:
+            self._info_label.setText(f"Errore ripresa video: {exc}")
+            return False
+        return True
+
     def get_current_url(self) -> str:
         """Return the last-provided original URL for this player (or empty string)."""
         return getattr(self, "_orig_url", "")
@@ -0,0 +1,58 @@
+"""Insert throughput: salva_evento in a loop vs salva_eventi_batch.
+
+    python benchmarks/bench_batch.py [N]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from core import database, services  # noqa: E402
+
+
+def _evento(i):
+    return {
+        "data": "01/03/2025",
+        "squadra_home": "Rovigo",
+        "squadra_away": "Petrarca",
+        "giocatore": f"Giocatore {i % 23}",
+        "minuto": f"{i % 80}:{i % 60:02d}",
+        "minuto_kickoff": "15:00",
+        "tipo_fase": "Attacco",
+        "evento_principale": "Ruck",
+        "origine_possesso": "Touche",
+        "num_fasi": i % 12,
+        "zona": "50A",
+        "esito": "Neutro",
+        "linea_guadagno": "Neutra",
+        "velocita_ruck": "Veloce",
+        "penalita": "",
+        "commento": "",
+        "video_url": "",
+    }
+
+
+def main(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+        database.init_db()
+
+        singoli = min(n, 2000)
+        t0 = time.perf_counter()
+        for i in range(singoli):
+            services.salva_evento(_evento(i))
+        dt = time.perf_counter() - t0
+        print(f"salva_evento x{singoli}: {dt:.3f}s ({singoli / dt:,.0f} righe/s)")
+
+        t0 = time.perf_counter()
+        ids = services.salva_eventi_batch(_evento(i) for i in range(n))
+        dt = time.perf_counter() - t0
+        n_ids = len(ids)
+        print(f"salva_eventi_batch x{n_ids}: {dt:.3f}s ({n_ids / dt:,.0f} righe/s)")
+        database.close_connection()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
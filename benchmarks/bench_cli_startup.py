@@ -0,0 +1,56 @@
+"""Startup time of the headless CLI (`python -m app.cli`), target < 150 ms.
+
+    python benchmarks/bench_cli_startup.py [RIPETIZIONI]
+
+Times `list-matches` on an already migrated database against a bare
+interpreter start, and checks that no Qt / yt_dlp module gets imported.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OBIETTIVO_MS = 150
+
+
+def _tempo(comando, ripetizioni):
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        subprocess.run(comando, cwd=RADICE, check=True, capture_output=True)
+        tempi.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tempi)
+
+
+def main(ripetizioni):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "cli.db")
+        cli = [sys.executable, "-m", "app.cli", "--db", db, "list-matches"]
+        subprocess.run(
+            cli[:-1] + ["init"], cwd=RADICE, check=True, capture_output=True
+        )
+
+        base = _tempo([sys.executable, "-c", "pass"], ripetizioni)
+        totale = _tempo(cli, ripetizioni)
+
+        moduli = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "app.cli", "--db", db]
+            + ["list-matches"],
+            cwd=RADICE,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stderr
+    pesanti = [m for m in ("PyQt6", "yt_dlp", "numpy") if f" {m}" in moduli]
+
+    print(f"interprete vuoto:     {base:6.1f} ms")
+    print(f"cli list-matches:     {totale:6.1f} ms (obiettivo < {OBIETTIVO_MS} ms)")
+    print(f"moduli pesanti importati: {', '.join(pesanti) or 'nessuno'}")
+    return 0 if totale < OBIETTIVO_MS and not pesanti else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10))
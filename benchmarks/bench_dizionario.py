@@ -0,0 +1,103 @@
+"""File size and filter latency: plain `eventi` vs dictionary-encoded layout.
+
+    python benchmarks/bench_dizionario.py [N]
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from core import database, dizionario, services  # noqa: E402
+from core.models import VOCABOLARI  # noqa: E402
+
+SQUADRE = ["Rovigo", "Petrarca", "Calvisano", "Viadana", "Valorugby", "Fiamme Oro"]
+
+
+def _evento(rnd, i):
+    home, away = rnd.sample(SQUADRE, 2)
+    evento = {campo: rnd.choice(valori) for campo, valori in VOCABOLARI.items()}
+    evento.update(
+        data=f"{1 + i // 5000 % 28:02d}/03/2025",
+        squadra_home=home,
+        squadra_away=away,
+        giocatore=f"{home} {rnd.randint(1, 23)}",
+        minuto=f"{rnd.randint(0, 80)}:{rnd.randint(0, 59):02d}",
+        minuto_kickoff="15:00",
+        num_fasi=rnd.randint(0, 12),
+        commento="",
+        video_url="",
+        match_id=1 + i // 5000,
+    )
+    return evento
+
+
+def _tempo(conn, sql, params, ripetizioni=5):
+    migliore = float("inf")
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        migliore = min(migliore, time.perf_counter() - t0)
+    return migliore * 1000
+
+
+def main(n):
+    rnd = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "legacy.db")
+        norm = os.path.join(tmp, "norm.db")
+        database.DB_NAME = legacy
+        database.init_db()
+        services.salva_eventi_batch(_evento(rnd, i) for i in range(n))
+        database.close_connection()
+
+        t0 = time.perf_counter()
+        dizionario.converti_database(legacy, norm)
+        print(f"conversione {n:,} eventi: {time.perf_counter() - t0:.2f}s")
+
+        for path in (legacy, norm):
+            conn = sqlite3.connect(path)
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.execute("VACUUM")
+            conn.close()
+        print(f"dimensione eventi:     {os.path.getsize(legacy) / 1e6:8.1f} MB")
+        print(f"dimensione normalizzato: {os.path.getsize(norm) / 1e6:6.1f} MB")
+
+        filtro = ("Rovigo", "Turnover", "Negativo")
+        conn = sqlite3.connect(legacy)
+        ms = _tempo(
+            conn,
+            "SELECT COUNT(*) FROM eventi "
+            "WHERE squadra_home=? AND evento_principale=? AND esito=?",
+            filtro,
+        )
+        print(f"filtro su eventi (TEXT):            {ms:7.1f} ms")
+        conn.close()
+
+        conn = sqlite3.connect(norm)
+        ms = _tempo(
+            conn,
+            "SELECT COUNT(*) FROM eventi_v "
+            "WHERE squadra_home=? AND evento_principale=? AND esito=?",
+            filtro,
+        )
+        print(f"filtro su eventi_v (vista):         {ms:7.1f} ms")
+        codici = [
+            conn.execute(f"SELECT id FROM {t} WHERE valore=?", (v,)).fetchone()[0]
+            for t, v in zip(("teams", "lk_evento_principale", "lk_esito"), filtro)
+        ]
+        ms = _tempo(
+            conn,
+            "SELECT COUNT(*) FROM eventi_norm "
+            "WHERE squadra_home_id=? AND evento_principale_id=? AND esito_id=?",
+            codici,
+        )
+        print(f"filtro su eventi_norm (codici INT): {ms:7.1f} ms")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,96 @@
+"""Season analytics: columnar EventBatch vs iterating over `eventi` tuples.
+
+    python benchmarks/bench_event_batch.py [N ...]   (default: 10k 100k 1M)
+
+For each size the same three questions are answered both ways: a filter
+(positive rucks and turnovers), a group-by count (evento_principale x esito)
+and a time window (events of the last 10 minutes, per match).
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from core import database, services  # noqa: E402
+from core.event_batch import EventBatch  # noqa: E402
+from core.models import COLONNE_EVENTI, VOCABOLARI  # noqa: E402
+
+SQUADRE = ["Rovigo", "Petrarca", "Calvisano", "Viadana", "Valorugby", "Fiamme Oro"]
+POS = {campo: i for i, campo in enumerate(COLONNE_EVENTI)}
+FINESTRA = (70 * 60000, 80 * 60000)
+
+
+def _evento(rnd, i):
+    home, away = rnd.sample(SQUADRE, 2)
+    evento = {campo: rnd.choice(valori) for campo, valori in VOCABOLARI.items()}
+    evento.update(
+        data=f"{1 + i // 5000 % 28:02d}/03/2025",
+        squadra_home=home,
+        squadra_away=away,
+        giocatore=f"{home} {rnd.randint(1, 23)}",
+        minuto=f"{rnd.randint(0, 80)}:{rnd.randint(0, 59):02d}",
+        minuto_kickoff="15:00",
+        num_fasi=rnd.randint(0, 12),
+        commento="",
+        video_url="",
+        match_id=1 + i // 500,
+    )
+    return evento
+
+
+def _tuple(righe):
+    positivi = [
+        r
+        for r in righe
+        if r[POS["esito"]] == "Positivo"
+        and r[POS["evento_principale"]] in ("Ruck", "Turnover")
+    ]
+    conteggi = Counter((r[POS["evento_principale"]], r[POS["esito"]]) for r in righe)
+    finale = [r for r in righe if FINESTRA[0] <= r[POS["minuto_ms"]] <= FINESTRA[1]]
+    return len(positivi), conteggi, len(finale)
+
+
+def _batch(batch):
+    positivi = batch.maschera(esito="Positivo", evento_principale=["Ruck", "Turnover"])
+    conteggi = batch.conta_per("evento_principale", "esito")
+    finale = batch.maschera(finestra=FINESTRA)
+    return int(positivi.sum()), conteggi, int(finale.sum())
+
+
+def _cronometra(funzione, *args):
+    t0 = time.perf_counter()
+    risultato = funzione(*args)
+    return risultato, (time.perf_counter() - t0) * 1000
+
+
+def main(dimensioni):
+    rnd = random.Random(1)
+    for n in dimensioni:
+        with tempfile.TemporaryDirectory() as tmp:
+            database.DB_NAME = os.path.join(tmp, "bench.db")
+            database.init_db()
+            services.salva_eventi_batch(_evento(rnd, i) for i in range(n))
+
+            righe, t_righe = _cronometra(lambda: list(services.righe_eventi()))
+            atteso, t_tuple = _cronometra(_tuple, righe)
+            del righe
+            batch, t_batch = _cronometra(EventBatch.da_database)
+            ottenuto, t_ops = _cronometra(_batch, batch)
+            database.close_connection()
+
+        assert atteso[0] == ottenuto[0] and atteso[2] == ottenuto[2]
+        assert atteso[1] == Counter(ottenuto[1])
+        print(
+            f"{n:>9,} eventi"
+            f" | tuple: carica {t_righe:8.1f} ms, analisi {t_tuple:7.1f} ms"
+            f" | EventBatch: carica {t_batch:8.1f} ms, analisi {t_ops:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    argomenti = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    main(argomenti)
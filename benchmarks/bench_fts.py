@@ -0,0 +1,83 @@
+"""Latency of services.cerca_eventi on a large database, target < 50 ms.
+
+    python benchmarks/bench_fts.py [N]   (default 1M events)
+
+Each query runs five times; the slowest run is compared with the target.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from core import database, services  # noqa: E402
+
+RUGBY = (
+    "placcaggio mancato buco linea sostegno avanzamento calcio touche rubata "
+    "ruck lento turnover meta mischia penalità fuorigioco in avanti maul"
+).split()
+# rugby terms plus a long tail of other words, Zipf-distributed like real text
+PAROLE = RUGBY + [f"parola{i}" for i in range(5000)]
+PESI = [1 / (i + 1) for i in range(len(PAROLE))]
+OBIETTIVO_MS = 50
+
+
+def _evento(rnd, i):
+    return {
+        "data": "01/03/2025",
+        "squadra_home": "Rovigo",
+        "squadra_away": "Petrarca",
+        "giocatore": f"Giocatore {rnd.randint(1, 23)}",
+        "minuto": f"{rnd.randint(0, 80)}:{rnd.randint(0, 59):02d}",
+        "minuto_kickoff": "15:00",
+        "tipo_fase": "Attacco",
+        "evento_principale": "Ruck",
+        "origine_possesso": "Touche",
+        "num_fasi": 0,
+        "zona": "50A",
+        "esito": "Neutro",
+        "linea_guadagno": "Neutra",
+        "velocita_ruck": "",
+        "penalita": "",
+        "commento": " ".join(rnd.choices(PAROLE, PESI, k=rnd.randint(0, 8))),
+        "video_url": "",
+        "match_id": 1 + i // 2000,
+    }
+
+
+def main(n):
+    rnd = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+        database.init_db()
+        t0 = time.perf_counter()
+        services.salva_eventi_batch(_evento(rnd, i) for i in range(n))
+        print(f"inserimento di {n} eventi: {time.perf_counter() - t0:.1f} s")
+        lenti = 0
+        for query, match_id in [
+            ("placcaggio mancato", None),
+            ("placcaggio mancato", 42),
+            ("turnover", None),
+            ("fuorigioco", 42),
+            ("plac", None),
+            ("parola300", None),
+        ]:
+            tempi = []
+            for _ in range(5):
+                t0 = time.perf_counter()
+                righe = services.cerca_eventi(query, match_id=match_id)
+                tempi.append((time.perf_counter() - t0) * 1000)
+            lenti += max(tempi) >= OBIETTIVO_MS
+            print(
+                f"{query!r:24} match={match_id}: {len(righe)} righe "
+                f"min {min(tempi):6.1f} ms, max {max(tempi):6.1f} ms"
+            )
+        print(f"obiettivo < {OBIETTIVO_MS} ms: {'mancato' if lenti else 'rispettato'}")
+        database.close_connection()
+    return 1 if lenti else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
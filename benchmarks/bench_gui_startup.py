@@ -0,0 +1,133 @@
+"""GUI startup: time to the match selector and to an interactive main window.
+
+    python benchmarks/bench_gui_startup.py [RIPETIZIONI]
+
+Each repetition starts a fresh interpreter that goes through the steps of
+`app/app.py` (init_db, QApplication, MatchSelector, then MainWindow on the
+first match of a temporary database) and times how long each window takes
+to be built and shown. Uses the offscreen Qt platform unless QT_QPA_PLATFORM
+is set. Also reports whether QtWebEngine, QtMultimedia or yt_dlp were loaded
+at either point: with the players built on first use none of them should be.
+"""
+import time
+
+_AVVIO = time.perf_counter()
+
+import json  # noqa: E402
+import os  # noqa: E402
+import statistics  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RADICE, "app"))
+
+from core import database, services  # noqa: E402
+from core.models import VOCABOLARI  # noqa: E402
+
+# modules that must not be loaded before the main window is on screen
+MODULI_PESANTI = ("PyQt6.QtWebEngineWidgets", "PyQt6.QtMultimedia", "yt_dlp")
+FASI = ("selettore match", "finestra interattiva")
+
+
+def _evento(i, match_id):
+    evento = {campo: valori[i % len(valori)] for campo, valori in VOCABOLARI.items()}
+    evento.update(
+        data="01/03/2025",
+        squadra_home="Rovigo",
+        squadra_away="Petrarca",
+        giocatore=f"Giocatore {i % 23}",
+        minuto=f"{i % 80}:{i % 60:02d}",
+        minuto_kickoff="15:00",
+        num_fasi=i % 8,
+        commento="",
+        video_url="",
+        match_id=match_id,
+    )
+    return evento
+
+
+def _prepara(percorso):
+    database.DB_NAME = percorso
+    database.init_db()
+    match_id = services.salva_match(
+        {
+            "data": "01/03/2025",
+            "squadra_home": "Rovigo",
+            "squadra_away": "Petrarca",
+            "minuto_kickoff": "15:00",
+            "name": "Benchmark",
+        }
+    )
+    services.salva_eventi_batch(_evento(i, match_id) for i in range(2000))
+    database.close_connection()
+    return match_id
+
+
+def _figlio(percorso, match_id):
+    """Steps of app.main() without the event loop; prints the timings as JSON."""
+    from PyQt6.QtCore import QCoreApplication, Qt
+    from PyQt6.QtWidgets import QApplication
+    from ui.match_selector import MatchSelector
+
+    fasi = {}
+
+    def misura(fase):
+        app.processEvents()
+        caricati = [m for m in MODULI_PESANTI if m in sys.modules]
+        fasi[fase] = ((time.perf_counter() - _AVVIO) * 1000, caricati)
+
+    database.DB_NAME = percorso
+    database.init_db()
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv[:1])
+    selector = MatchSelector()
+    selector.show()
+    misura(FASI[0])
+    selector.accept()
+
+    from ui.main_window import MainWindow
+
+    window = MainWindow(match_id=match_id)
+    window.show()
+    misura(FASI[1])
+    window.close()
+    database.close_connection()
+    print(json.dumps(fasi))
+
+
+def _avvia(percorso, match_id):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    uscita = subprocess.run(
+        [sys.executable, __file__, "--figlio", percorso, str(match_id)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    ).stdout
+    return json.loads(uscita.strip().splitlines()[-1])
+
+
+def main(ripetizioni):
+    with tempfile.TemporaryDirectory() as tmp:
+        percorso = os.path.join(tmp, "bench.db")
+        match_id = _prepara(percorso)
+        misure = [_avvia(percorso, match_id) for _ in range(ripetizioni)]
+    for fase in FASI:
+        tempi = [m[fase][0] for m in misure]
+        print(
+            f"{fase:22} mediana {statistics.median(tempi):6.0f} ms, "
+            f"max {max(tempi):6.0f} ms | "
+            f"moduli pesanti: {misure[-1][fase][1] or 'nessuno'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--figlio"]:
+        _figlio(sys.argv[2], int(sys.argv[3]))
+    else:
+        sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
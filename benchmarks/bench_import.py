@@ -0,0 +1,75 @@
+"""Throughput of core.importer.importa_csv on a large tagging sheet.
+
+    python benchmarks/bench_import.py [N]   (default 500k rows)
+
+One row in 50 is invalid and one in 20 is a duplicate of an earlier row.
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from core import database, importer  # noqa: E402
+from core.models import VOCABOLARI  # noqa: E402
+
+SQUADRE = ["Rovigo", "Petrarca", "Calvisano", "Viadana", "Valorugby", "Fiamme Oro"]
+CAMPI = ["Data", "Squadra Home", "Squadra Away", "Minuto Kickoff", "Minuto"]
+CAMPI += ["Giocatore", "Num fasi", "Commento"] + list(VOCABOLARI)
+
+
+def _riga(rnd, i):
+    home, away = rnd.sample(SQUADRE, 2)
+    riga = [
+        f"{1 + i // 5000 % 28:02d}/03/2025",
+        home,
+        away,
+        "15:00",
+        f"{rnd.randint(0, 80)}:{rnd.randint(0, 59):02d}",
+        f"{home} {rnd.randint(1, 23)}",
+        rnd.randint(0, 12),
+        f"nota {i}",
+    ]
+    riga += [rnd.choice(valori) for valori in VOCABOLARI.values()]
+    if i % 50 == 49:
+        riga[8] = "Sconosciuto"
+    return riga
+
+
+def main(n):
+    rnd = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        percorso = os.path.join(tmp, "tag.csv")
+        with open(percorso, "w", newline="", encoding="utf-8") as f:
+            scrittore = csv.writer(f)
+            scrittore.writerow(CAMPI)
+            precedente = None
+            for i in range(n):
+                riga = precedente if i % 20 == 19 else _riga(rnd, i)
+                scrittore.writerow(riga)
+                precedente = riga
+        database.DB_NAME = os.path.join(tmp, "bench.db")
+        database.init_db()
+
+        t0 = time.perf_counter()
+        esito = importer.importa_csv(percorso)
+        durata = time.perf_counter() - t0
+        database.close_connection()
+
+    print(esito.riepilogo().splitlines()[0])
+    print(f"{n:,} righe in {durata:.1f}s ({n / durata:,.0f} righe/s)")
+    try:
+        import resource
+
+        # KiB on Linux; the CSV is written streaming, so this is the import
+        picco = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"RSS massimo del processo: {picco:.0f} MiB")
+    except ImportError:  # Windows
+        pass
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
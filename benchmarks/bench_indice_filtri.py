@@ -0,0 +1,48 @@
+"""Latency of core.indice_filtri.IndiceFiltri.filtra, target < 10 ms.
+
+    python benchmarks/bench_indice_filtri.py [N]   (default 20k events)
+
+Resolves a three-field filter and a "penalties only" filter on one player
+over N random events, as the filter bar does on every change.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "app"))
+
+from core.indice_filtri import NON_VUOTO, IndiceFiltri  # noqa: E402
+from core.models import VOCABOLARI, Evento  # noqa: E402
+
+OBIETTIVO_MS = 10
+
+
+def main(n):
+    rnd = random.Random(1)
+    eventi = [
+        Evento(
+            id=i,
+            giocatore=f"Giocatore {rnd.randint(1, 30)}",
+            **{campo: rnd.choice(v) for campo, v in VOCABOLARI.items()},
+        )
+        for i in range(n)
+    ]
+    indice = IndiceFiltri()
+    t0 = time.perf_counter()
+    indice.aggiungi(eventi)
+    print(f"indice di {n} eventi: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    migliore = float("inf")
+    for _ in range(20):
+        t0 = time.perf_counter()
+        indice.filtra(evento_principale="Turnover", zona="22A", esito="Negativo")
+        indice.filtra(penalita=NON_VUOTO, giocatore="Giocatore 7")
+        migliore = min(migliore, time.perf_counter() - t0)
+    ms = migliore * 1000
+    print(f"due filtri: {ms:.2f} ms (obiettivo < {OBIETTIVO_MS} ms)")
+    return 0 if ms < OBIETTIVO_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+# Some tests import `app.core.*` from the repo root. Bind the `app` namespace
+# package first, otherwise app/app.py would shadow it once app/ is on sys.path.
+import app.core  # noqa: F401
+
+# Application modules import each other as `core.*` / `controllers.*`
+# (app/ is the working root when running app.py), mirror that here.
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Point core.database at a fresh temporary database."""
+    from core import database
+
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "test.db"))
+    database.init_db()
+    yield database
+    database.close_connection()
+
+
+def _nuovo_evento(**campi):
+    evento = {
+        "data": "01/03/2025",
+        "squadra_home": "Rovigo",
+        "squadra_away": "Petrarca",
+        "giocatore": "Rossi",
+        "minuto": "12:30",
+        "minuto_kickoff": "15:00",
+        "tipo_fase": "Attacco",
+        "evento_principale": "Touche",
+        "origine_possesso": "Touche",
+        "num_fasi": 3,
+        "zona": "22A",
+        "esito": "Positivo",
+        "linea_guadagno": "Guadagnata",
+        "velocita_ruck": "",
+        "penalita": "",
+        "commento": "",
+        "video_url": "",
+    }
+    evento.update(campi)
+    return evento
+
+
+@pytest.fixture
+def evento():
+    """Factory for event dicts with realistic defaults; override via kwargs."""
+    return _nuovo_evento
@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from app.ui import caricatore_eventi  # noqa: E402
+from app.ui.caricatore_eventi import CaricatoreEventi  # noqa: E402
+
+
+def _esegui(caricatore):
+    ricevuti = {"pagine": [], "completato": None, "fallito": None}
+
+    def pagina(generazione, eventi):
+        ricevuti["pagine"].append((generazione, len(eventi)))
+        caricatore.pagina_consumata()
+
+    caricatore.pagina.connect(pagina)
+    caricatore.completato.connect(lambda g, n: ricevuti.update(completato=(g, n)))
+    caricatore.fallito.connect(lambda g, e: ricevuti.update(fallito=(g, e)))
+    caricatore.run()  # synchronously, on this thread
+    return ricevuti
+
+
+def test_pages_then_completion(monkeypatch):
+    monkeypatch.setattr(caricatore_eventi, "PAGINA", 2)
+    ricevuti = _esegui(CaricatoreEventi(lambda: range(5), 7))
+    assert ricevuti["pagine"] == [(7, 2), (7, 2), (7, 1)]
+    assert ricevuti["completato"] == (7, 5)
+    assert ricevuti["fallito"] is None
+
+
+def test_cancelled_load_emits_nothing_more(monkeypatch):
+    monkeypatch.setattr(caricatore_eventi, "PAGINA", 2)
+    caricatore = CaricatoreEventi(lambda: range(10), 1)
+    caricatore.pagina.connect(lambda g, e: caricatore.annulla())
+    ricevuti = _esegui(caricatore)
+    assert ricevuti["pagine"] == [(1, 2)]
+    assert ricevuti["completato"] is None
+
+
+def test_errors_are_reported():
+    def sorgente():
+        raise OSError("database is locked")
+
+    ricevuti = _esegui(CaricatoreEventi(sorgente, 3))
+    assert ricevuti["fallito"] == (3, "database is locked")
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import cli
+from core import services
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_cli_does_not_import_qt(tmp_path):
+    codice = (
+        "import sys, runpy\n"
+        f"open({str(tmp_path / 'cli.db')!r}, 'a').close()\n"
+        f"sys.argv = ['cli', '--db', {str(tmp_path / 'cli.db')!r}, 'list-matches']\n"
+        "try:\n"
+        "    runpy.run_module('app.cli', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in "
+        "('PyQt6', 'yt_dlp', 'ui')))\n"
+    )
+    esito = subprocess.run(
+        [sys.executable, "-c", codice], cwd=RADICE, capture_output=True, text=True
+    )
+    assert esito.returncode == 0, esito.stderr
+    assert esito.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_cli_commands(db, evento, tmp_path, capsys):
+    match_id = services.salva_match({"name": "Finale", "data": "01/03/2025"})
+    services.salva_eventi_batch([evento(match_id=match_id)] * 3)
+    percorso = str(tmp_path / "eventi.csv")
+
+    assert cli.main(["--db", db.DB_NAME, "list-matches"]) == 0
+    assert "Finale" in capsys.readouterr().out
+    assert cli.main(["--db", db.DB_NAME, "stats", str(match_id)]) == 0
+    assert "3 eventi" in capsys.readouterr().out
+    comando = ["--db", db.DB_NAME, "export", percorso, "--match", str(match_id)]
+    assert cli.main(comando) == 0
+    assert cli.main(["--db", db.DB_NAME, "import", percorso]) == 0
+    assert "3 duplicate" in capsys.readouterr().out
+    assert cli.main(["--db", db.DB_NAME, "vacuum"]) == 0
+    assert cli.main(["--db", db.DB_NAME, "export", "eventi.txt"]) == 1
+
+
+def test_cli_normalize(db, evento, tmp_path, capsys):
+    services.salva_eventi_batch([evento()] * 3)
+    destinazione = str(tmp_path / "norm.db")
+
+    assert cli.main(["--db", db.DB_NAME, "normalize", destinazione]) == 0
+    assert "3 eventi convertiti" in capsys.readouterr().out
+    conn = sqlite3.connect(destinazione)
+    assert conn.execute("SELECT COUNT(*) FROM eventi_v").fetchone() == (3,)
+    conn.close()
+    # the destination must be a new file
+    assert cli.main(["--db", db.DB_NAME, "normalize", destinazione]) == 1
+
+
+def test_cli_reports_a_broken_database(db, tmp_path, capsys):
+    percorso = tmp_path / "rotto.db"
+    percorso.write_bytes(b"non sono un database SQLite" * 100)
+
+    assert cli.main(["--db", str(percorso), "list-matches"]) == 1
+    assert capsys.readouterr().err.startswith("errore: ")
+
+
+def test_cli_needs_an_existing_database_and_keeps_stdout_clean(db, tmp_path, capsys):
+    percorso = str(tmp_path / "nuovo.db")
+
+    assert cli.main(["--db", percorso, "list-matches"]) == 1
+    assert "database non trovato" in capsys.readouterr().err
+    assert not os.path.exists(percorso)
+
+    assert cli.main(["--db", percorso, "init"]) == 0
+    uscita = capsys.readouterr()
+    assert uscita.out.startswith("database pronto")
+    assert "[DB] migrazione" in uscita.err
+    assert cli.main(["--db", percorso, "export", str(tmp_path / "e.csv")]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        f"0 record esportati in {tmp_path / 'e.csv'}"
+    ]
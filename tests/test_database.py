@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+
+import pytest
+
+from core import services
+
+
+def test_connection_reused_per_thread(db):
+    assert db.get_connection() is db.get_connection()
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(db.get_connection()))
+    t.start()
+    t.join()
+    assert other[0] is not db.get_connection()
+
+
+def test_wal_enabled(db):
+    mode = db.get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode.lower() == "wal"
+
+
+def test_transaction_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as c:
+            c.execute("INSERT INTO matches (name) VALUES ('x')")
+            raise RuntimeError("boom")
+    assert services.lista_matches() == []
+
+
+def test_nested_transaction_joins_outer(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            services.salva_match({"name": "inner"})
+            raise RuntimeError("boom")
+    assert services.lista_matches() == []
+
+
+def test_transaction_closes_cursor_when_commit_fails(db):
+    conn = db.get_connection()
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("CREATE TABLE padre (id INTEGER PRIMARY KEY)")
+    conn.execute(
+        "CREATE TABLE figlio (padre_id REFERENCES padre(id) "
+        "DEFERRABLE INITIALLY DEFERRED)"
+    )
+    # a deferred foreign key is only checked by COMMIT
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as c:
+            c.execute("INSERT INTO figlio VALUES (1)")
+    assert not conn.in_transaction
+    with pytest.raises(sqlite3.ProgrammingError):
+        c.execute("SELECT 1")
@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from core import dizionario, services
+from core.models import VOCABOLARI
+
+
+def test_converti_database_preserves_rows(db, evento, tmp_path):
+    match_id = services.salva_match(
+        {"name": "Rovigo vs Petrarca", "data": "01/03/2025"}
+    )
+    services.salva_eventi_batch(
+        [
+            evento(match_id=match_id),
+            evento(giocatore="Bianchi", evento_principale="Turnover", penalita="CP+"),
+            evento(giocatore=None, zona="Fuori vocabolario"),
+        ]
+    )
+    conn = db.get_connection()
+    originali = conn.execute("SELECT * FROM eventi ORDER BY id").fetchall()
+    db.close_connection()
+
+    destinazione = tmp_path / "norm.db"
+    assert dizionario.converti_database(db.DB_NAME, str(destinazione)) == 3
+
+    conn = sqlite3.connect(destinazione)
+    assert conn.execute("SELECT * FROM eventi_v ORDER BY id").fetchall() == originali
+    assert conn.execute("SELECT id, name FROM matches").fetchall() == [
+        (match_id, "Rovigo vs Petrarca")
+    ]
+    # vocabulary values keep their form order as codes, unknown values are appended
+    codici = dict(conn.execute("SELECT valore, id FROM lk_zona"))
+    assert [codici[v] for v in VOCABOLARI["zona"]] == [1, 2, 3, 4]
+    assert codici["Fuori vocabolario"] == 5
+    conn.close()
+
+
+def test_converti_database_refuses_to_overwrite(db, tmp_path):
+    destinazione = tmp_path / "norm.db"
+    destinazione.write_bytes(b"")
+    with pytest.raises(FileExistsError):
+        dizionario.converti_database(db.DB_NAME, str(destinazione))
@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from core import services  # noqa: E402
+from core.event_batch import NULLO, EventBatch  # noqa: E402
+
+
+@pytest.fixture
+def batch(db, evento):
+    services.salva_eventi_batch(
+        [
+            evento(match_id=1, minuto="05:00", evento_principale="Ruck"),
+            evento(
+                match_id=1, minuto="30:00", evento_principale="Ruck", esito="Neutro"
+            ),
+            evento(match_id=1, minuto="41:00", evento_principale="Meta"),
+            evento(match_id=1, minuto="70:00", evento_principale="Turnover"),
+            evento(match_id=2, minuto="10:00", evento_principale="Meta"),
+        ]
+    )
+    return EventBatch.da_database(match_id=1)
+
+
+def test_built_from_one_match(batch):
+    assert len(batch) == 4
+    assert batch.valori("minuto_ms") == [300000, 1800000, 2460000, 4200000]
+    assert batch.colonne["esito"].dtype == "uint8"
+
+
+def test_filter_and_window(batch):
+    assert batch.filtra(evento_principale="Ruck").valori("minuto_ms") == [
+        300000,
+        1800000,
+    ]
+    solo_primo_tempo = batch.filtra(finestra=(0, 40 * 60000), esito="Positivo")
+    assert solo_primo_tempo.valori("evento_principale") == ["Ruck"]
+    # windows compare minuto_ms, bounds included
+    assert batch.maschera(finestra=(0, 40 * 60000)).tolist() == [1, 1, 0, 0]
+    assert batch.maschera(finestra=(41 * 60000, 90 * 60000)).tolist() == [0, 0, 1, 1]
+    assert len(batch.filtra(esito=["Neutro", "Positivo"], num_fasi=(3, 3))) == 4
+    assert len(batch.filtra(esito="Sconosciuto")) == 0
+
+
+def test_group_by_count(batch):
+    assert batch.conta_per("evento_principale") == {"Ruck": 2, "Meta": 1, "Turnover": 1}
+    assert batch.conta_per("evento_principale", "esito", finestra=(0, 3600000)) == {
+        ("Ruck", "Positivo"): 1,
+        ("Ruck", "Neutro"): 1,
+        ("Meta", "Positivo"): 1,
+    }
+    with pytest.raises(ValueError):
+        batch.conta_per("minuto_ms")
+
+
+def test_nulls_and_wide_vocabularies():
+    righe = [(i, f"giocatore {i}", None if i % 2 else i) for i in range(300)]
+    batch = EventBatch.da_righe(righe, ("id", "giocatore", "minuto_ms"))
+    assert batch.colonne["giocatore"].dtype == "uint16"
+    assert batch.valori("minuto_ms")[:3] == [0, None, 2]
+    assert batch.conta_per("giocatore", giocatore="giocatore 7") == {"giocatore 7": 1}
+    assert len(batch.filtra(finestra=(0, 10))) == 6
+
+
+def test_legacy_num_fasi_is_null():
+    righe = [(1, 3), (2, ""), (3, "tante"), (4, None), (5, "4")]
+    batch = EventBatch.da_righe(righe, ("id", "num_fasi"))
+    assert batch.colonne["num_fasi"].tolist() == [3, NULLO, NULLO, NULLO, 4]
+    assert batch.valori("num_fasi") == [3, None, None, None, 4]
+    assert batch.filtra(num_fasi=(0, 10)).valori("id") == [1, 5]
@@ -0,0 +1,69 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from app.core.models import Evento  # noqa: E402
+from app.ui.eventi_model import COLONNA, EventiModel, EventiProxyModel  # noqa: E402
+from PyQt6.QtCore import Qt  # noqa: E402
+
+
+def _modello(*eventi):
+    modello = EventiModel()
+    modello.imposta_eventi(eventi)
+    return modello
+
+
+def test_data_formats_values_lazily():
+    modello = _modello(Evento(id=1, giocatore="Rossi", num_fasi=3, commento=None))
+    assert modello.rowCount() == 1
+    assert modello.columnCount() == len(COLONNA)
+    assert modello.data(modello.index(0, COLONNA["giocatore"])) == "Rossi"
+    assert modello.data(modello.index(0, COLONNA["num_fasi"])) == "3"
+    assert modello.data(modello.index(0, COLONNA["commento"])) == ""
+
+
+def test_row_updates_and_provisional_ids():
+    modello = _modello(Evento(id=1, giocatore="Rossi"))
+    modello.aggiungi(Evento(id=-1, giocatore="Bianchi"))
+    modificate = []
+    modello.dataChanged.connect(lambda a, b: modificate.append((a.row(), b.row())))
+
+    modello.imposta_id(-1, 7)
+    assert modello.riga_per_id(7) == 1 and modello.riga_per_id(-1) == -1
+    modello.aggiorna(0, Evento(id=1, giocatore="Verdi"))
+    assert modificate == [(1, 1), (0, 0)]
+
+    modello.rimuovi(0)
+    assert [modello.evento(r).id for r in range(modello.rowCount())] == [7]
+
+
+def test_proxy_maps_sorted_rows_back_to_events():
+    modello = _modello(
+        Evento(id=1, giocatore="Rossi"), Evento(id=2, giocatore="Bianchi")
+    )
+    proxy = EventiProxyModel()
+    proxy.setSourceModel(modello)
+    proxy.sort(COLONNA["giocatore"], Qt.SortOrder.AscendingOrder)
+    assert proxy.evento(0).id == 2
+    # sorting happens in the source model; load positions are unchanged
+    assert proxy.riga_sorgente(0) == 0 and modello.posizione(0) == 1
+
+
+def test_multi_column_sort_survives_reload():
+    eventi = [
+        Evento(id=1, minuto="10:05", num_fasi=9),
+        Evento(id=2, minuto="2:30", num_fasi=10),
+        Evento(id=3, minuto="2:30", num_fasi=3),
+    ]
+    modello = _modello(*eventi)
+    modello.sort(COLONNA["num_fasi"], Qt.SortOrder.DescendingOrder)
+    modello.sort(COLONNA["minuto"], Qt.SortOrder.AscendingOrder)
+    assert [modello.evento(r).id for r in range(3)] == [2, 3, 1]
+
+    modello.imposta_eventi(reversed(eventi))
+    assert [modello.evento(r).id for r in range(3)] == [2, 3, 1]
+
+    modello.aggiungi(Evento(id=4, minuto="0:10", num_fasi=0))
+    assert modello.evento(3).id == 4  # appended rows wait for riordina()
+    modello.riordina()
+    assert [modello.evento(r).id for r in range(4)] == [4, 2, 3, 1]
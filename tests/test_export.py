@@ -0,0 +1,82 @@
+import csv
+
+import pytest
+
+from core import export, services
+
+
+def _leggi_csv(percorso):
+    with open(percorso, newline="", encoding="utf-8-sig") as f:
+        return list(csv.reader(f))
+
+
+def test_esporta_eventi_csv_filtered(db, evento, tmp_path):
+    services.salva_eventi_batch(
+        [
+            evento(match_id=1, data="01/03/2025", giocatore="Mario Rossi"),
+            evento(match_id=1, data="15/03/2025", squadra_home="Calvisano"),
+            evento(match_id=2, data="01/04/2025"),
+        ]
+    )
+    percorso = tmp_path / "eventi.csv"
+    scritte = export.esporta_eventi(percorso, match_id=1, colonne=["id", "giocatore"])
+    righe = _leggi_csv(percorso)
+    assert scritte == 2
+    assert righe[0] == ["id", "giocatore"]
+    assert [r[1] for r in righe[1:]] == ["Rossi", "Mario Rossi"]
+
+    export.esporta_eventi(percorso, da_data="10/03/2025", a_data="31/03/2025")
+    assert [r[1] for r in _leggi_csv(percorso)[1:]] == ["15/03/2025"]
+    assert export.esporta_eventi(percorso, squadra="Calvisano") == 1
+
+
+def test_esporta_cancel_leaves_no_file(db, evento, tmp_path):
+    services.salva_eventi_batch([evento()] * 1200)
+    percorso = tmp_path / "eventi.csv"
+    chiamate = []
+
+    def progresso(righe):
+        chiamate.append(righe)
+        return righe < 1000
+
+    with pytest.raises(export.EsportazioneAnnullata):
+        export.esporta_eventi(percorso, progresso=progresso)
+    assert chiamate == [500, 1000]
+    assert not list(tmp_path.glob("eventi.csv*"))
+
+
+def test_esporta_matches_and_formats(db, evento, tmp_path):
+    match_id = services.salva_match({"name": "Finale", "data": "01/03/2025"})
+    services.salva_evento(evento(match_id=match_id))
+    percorso = tmp_path / "match.csv"
+    export.esporta_matches(percorso)
+    assert _leggi_csv(percorso)[1][:2] == [str(match_id), "Finale"]
+
+    with pytest.raises(ValueError):
+        export.formato_da_percorso("eventi.txt")
+    assert export.formato_da_percorso("eventi.XLSX") == "xlsx"
+
+
+def test_esporta_xlsx_and_parquet(db, evento, tmp_path):
+    services.salva_eventi_batch([evento(num_fasi=i) for i in range(3)])
+    openpyxl = pytest.importorskip("openpyxl")
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    export.esporta_eventi(tmp_path / "eventi.xlsx")
+    foglio = openpyxl.load_workbook(tmp_path / "eventi.xlsx").active
+    assert foglio.max_row == 4
+
+    export.esporta_eventi(tmp_path / "eventi.parquet")
+    tabella = pq.read_table(tmp_path / "eventi.parquet")
+    assert sorted(tabella.column("num_fasi").to_pylist()) == [0, 1, 2]
+
+
+def test_esporta_parquet_legacy_num_fasi_is_null(db, evento, tmp_path):
+    services.salva_eventi_batch([evento(num_fasi=""), evento(num_fasi=2)])
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    assert export.esporta_eventi(tmp_path / "eventi.parquet") == 2
+    tabella = pq.read_table(tmp_path / "eventi.parquet")
+    assert sorted(tabella.column("num_fasi").to_pylist(), key=str) == [2, None]
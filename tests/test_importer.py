@@ -0,0 +1,96 @@
+import pytest
+
+from core import importer, services
+
+
+def _scrivi(tmp_path, testo, nome="tag.csv"):
+    percorso = tmp_path / nome
+    percorso.write_text(testo, encoding="utf-8")
+    return percorso
+
+
+INTESTAZIONE = (
+    "Data;Squadra Home;Squadra Away;Minuto Kickoff;Minuto;Evento principale;"
+    "Esito;Velocità ruck;Num fasi;Video URL\n"
+)
+
+
+def test_import_normalizes_and_reports_errors(db, tmp_path):
+    percorso = _scrivi(
+        tmp_path,
+        INTESTAZIONE
+        + "2025-03-01;Rovigo;Petrarca;15:00;12.5;ruck;positivo;Veloce;3;"
+        "youtu.be/dQw4w9WgXcQ\n"
+        + "01/03/2025;Rovigo;Petrarca;15:00;abc;Ruck;Positivo;;;\n"
+        + "01/03/2025;Rovigo;Petrarca;15:00;1:00;Volée;Positivo;;;\n"
+        + "\n"
+        + "01/03/2025;Rovigo;Petrarca;15:00;0:00;Meta;;;x;\n"
+        + "31/02/2025;Rovigo;Petrarca;15:00;1:00;Meta;;;;\n",
+    )
+    esito = importer.importa_csv(percorso, match_id=7)
+
+    assert (esito.letti, esito.importati, esito.scartati) == (5, 1, 4)
+    assert [n for n, _ in esito.errori] == [3, 4, 6, 7]
+    assert "data non valida" in esito.errori[3][1]
+    assert "minuto" in esito.errori[0][1]
+    assert "evento_principale" in esito.errori[1][1]
+    (evento,) = services.lista_eventi_per_match(7)
+    assert (evento.data, evento.minuto) == ("01/03/2025", "12:05")
+    assert evento.minuto_ms == 725000
+    assert (evento.evento_principale, evento.esito) == ("Ruck", "Positivo")
+    assert evento.video_url == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def test_import_skips_duplicates(db, evento, tmp_path):
+    services.salva_evento(evento(minuto="12:30", evento_principale="Ruck"))
+    riga = "01/03/2025,Rovigo,Petrarca,15:00,12:30,Meta\n"
+    percorso = _scrivi(
+        tmp_path,
+        "data,home,away,kickoff,minuto,evento_principale\n" + riga * 3,
+    )
+    esito = importer.importa_csv(percorso, chunk_size=2)
+    assert (esito.importati, esito.duplicati) == (1, 2)
+    assert importer.importa_csv(percorso).duplicati == 3
+
+
+def test_import_requires_mandatory_columns(db, tmp_path):
+    percorso = _scrivi(tmp_path, "data,minuto\n01/03/2025,1:00\n")
+    with pytest.raises(ValueError, match="squadra_home"):
+        importer.importa_csv(percorso)
+
+
+def test_reimporting_an_export_adds_no_rows(db, evento, tmp_path):
+    from core import export
+
+    services.salva_eventi_batch(
+        [
+            evento(match_id=1, minuto="12", video_url="https://youtu.be/dQw4w9WgXcQ"),
+            evento(match_id=1, minuto="3:05", num_fasi="", zona=""),
+        ]
+    )
+    percorso = tmp_path / "eventi.csv"
+    export.esporta_eventi(percorso, match_id=1)
+
+    esito = importer.importa_csv(percorso, match_id=1)
+    assert (esito.importati, esito.duplicati, esito.scartati) == (0, 2, 0)
+    assert services.conta_eventi() == 2
+
+
+def test_update_hashes_the_stored_fixed_fields(db, evento):
+    from core.database import transaction
+    from core.utils import CAMPI_HASH, hash_evento
+
+    evento_id = services.salva_evento(evento(data="01/03/2025"))
+    # the form of another session: UPDATE does not write data / squadre
+    services.modifica_evento(
+        evento_id, evento(data="09/09/2099", squadra_home="X", commento="ok")
+    )
+    with transaction() as c:
+        c.execute(
+            f"SELECT hash_contenuto, {', '.join(CAMPI_HASH)} FROM eventi WHERE id=?",
+            (evento_id,),
+        )
+        hash_salvato, *valori = c.fetchone()
+    memorizzato = dict(zip(CAMPI_HASH, valori))
+    assert (memorizzato["data"], memorizzato["commento"]) == ("01/03/2025", "ok")
+    assert hash_salvato == hash_evento(memorizzato)
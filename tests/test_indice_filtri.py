@@ -0,0 +1,68 @@
+import random
+
+from core.indice_filtri import NON_VUOTO, IndiceFiltri
+from core.models import VOCABOLARI, Evento
+
+
+def _eventi():
+    return [
+        Evento(id=1, giocatore="Rossi", evento_principale="Turnover", zona="22A"),
+        Evento(id=2, giocatore="Bianchi", evento_principale="Ruck", penalita="CP-"),
+        Evento(id=3, giocatore="Rossi", evento_principale="Turnover", zona="50A"),
+        Evento(id=4, giocatore=None, evento_principale="Meta", penalita=""),
+    ]
+
+
+def test_intersects_across_fields_and_unions_within():
+    indice = IndiceFiltri()
+    indice.aggiungi(_eventi())
+    assert indice.filtra() is None
+    assert indice.filtra(evento_principale="Turnover") == {0, 2}
+    assert indice.filtra(evento_principale="Turnover", zona="22A") == {0}
+    assert indice.filtra(giocatore=["Rossi", "Bianchi"], zona=None) == {0, 1, 2}
+    assert indice.filtra(penalita=NON_VUOTO) == {1}
+    assert indice.filtra(giocatore="") == {3}
+    assert indice.filtra(zona="22D") == set()
+    assert indice.valori("giocatore") == ["", "Bianchi", "Rossi"]
+
+
+def test_follows_updates_and_removals():
+    indice = IndiceFiltri()
+    eventi = _eventi()
+    indice.aggiungi(eventi[:2])
+    indice.aggiungi(eventi[2:])
+    indice.aggiorna(0, Evento(id=1, giocatore="Verdi", evento_principale="Ruck"))
+    assert indice.filtra(evento_principale="Ruck") == {0, 1}
+    assert "Turnover" in indice.valori("evento_principale")
+
+    indice.rimuovi(1)  # rows 2 and 3 become 1 and 2
+    assert len(indice) == 3
+    assert indice.filtra(evento_principale="Ruck") == {0}
+    assert indice.filtra(evento_principale="Turnover") == {1}
+    assert indice.conteggi("giocatore") == {"Verdi": 1, "Rossi": 1, "": 1}
+
+
+def test_resolves_20k_events():
+    rnd = random.Random(1)
+    eventi = [
+        Evento(
+            id=i,
+            giocatore=f"Giocatore {rnd.randint(1, 30)}",
+            **{campo: rnd.choice(v) for campo, v in VOCABOLARI.items()},
+        )
+        for i in range(20000)
+    ]
+    indice = IndiceFiltri()
+    indice.aggiungi(eventi)
+
+    righe = indice.filtra(evento_principale="Turnover", zona="22A", esito="Negativo")
+    solo_penalita = indice.filtra(penalita=NON_VUOTO, giocatore="Giocatore 7")
+
+    assert righe == {
+        i
+        for i, e in enumerate(eventi)
+        if (e.evento_principale, e.zona, e.esito) == ("Turnover", "22A", "Negativo")
+    }
+    assert solo_penalita == {
+        i for i, e in enumerate(eventi) if e.penalita and e.giocatore == "Giocatore 7"
+    }
@@ -0,0 +1,149 @@
+import sqlite3
+
+from core import migrations
+
+
+def _piano(conn, sql, params):
+    return " ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def test_fresh_db_at_latest_version(db):
+    assert migrations.versione_corrente() == migrations.SCHEMA_VERSION
+
+
+def test_migrations_run_once(db):
+    # a second init is a no-op: nothing to apply, version unchanged
+    assert db.init_db() == migrations.SCHEMA_VERSION
+
+
+def test_legacy_db_is_upgraded(tmp_path, monkeypatch):
+    from core import database
+
+    path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(path)
+    # schema as shipped before video_url / match_id were added
+    legacy.execute(
+        "CREATE TABLE eventi (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT, "
+        "squadra_home TEXT, squadra_away TEXT, giocatore TEXT, minuto TEXT, "
+        "minuto_kickoff TEXT, tipo_fase TEXT, evento_principale TEXT, "
+        "origine_possesso TEXT, num_fasi INTEGER, zona TEXT, esito TEXT, "
+        "linea_guadagno TEXT, velocita_ruck TEXT, penalita TEXT, commento TEXT)"
+    )
+    legacy.execute("INSERT INTO eventi (data) VALUES ('01/01/2024')")
+    legacy.commit()
+    legacy.close()
+
+    monkeypatch.setattr(database, "DB_NAME", str(path))
+    try:
+        database.init_db()
+        conn = database.get_connection()
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(eventi)")}
+        assert {"video_url", "match_id"} <= cols
+        assert conn.execute("SELECT COUNT(*) FROM eventi").fetchone()[0] == 1
+    finally:
+        database.close_connection()
+
+
+def test_filter_queries_use_indexes(db):
+    conn = db.get_connection()
+    piano = _piano(
+        conn,
+        "SELECT * FROM eventi WHERE data=? AND squadra_home=? AND squadra_away=? "
+        "AND minuto_kickoff=? ORDER BY id DESC",
+        ("01/01/2024", "A", "B", "0"),
+    )
+    assert "idx_eventi_sessione" in piano
+    assert "TEMP B-TREE" not in piano
+
+    piano = _piano(conn, "SELECT * FROM eventi WHERE match_id=? ORDER BY id DESC", (1,))
+    assert "idx_eventi_match" in piano
+    assert "TEMP B-TREE" not in piano
+
+    piano = _piano(
+        conn,
+        "UPDATE eventi SET match_id=? WHERE data=? AND squadra_home=? "
+        "AND squadra_away=? AND minuto_kickoff=?",
+        (1, "01/01/2024", "A", "B", "0"),
+    )
+    assert "idx_eventi_sessione" in piano
+
+
+def test_minuto_ms_backfilled_and_range_uses_index(tmp_path, monkeypatch):
+    from core import database
+
+    path = tmp_path / "v2.db"
+    monkeypatch.setattr(database, "DB_NAME", str(path))
+    try:
+        # build a database that stopped at version 2, with data in it
+        for migrazione in migrations.MIGRATIONS[:2]:
+            with database.transaction() as c:
+                migrazione(c)
+        conn = database.get_connection()
+        conn.execute("PRAGMA user_version = 2")
+        conn.execute("INSERT INTO eventi (minuto, match_id) VALUES ('1:23', 1)")
+
+        database.init_db()
+        assert conn.execute("SELECT minuto_ms FROM eventi").fetchone() == (83000,)
+
+        piano = _piano(
+            conn,
+            "SELECT * FROM eventi WHERE match_id=? AND minuto_ms BETWEEN ? AND ? "
+            "ORDER BY minuto_ms, id",
+            (1, 0, 60000),
+        )
+        assert "idx_eventi_match_minuto" in piano
+        assert "minuto_ms>? AND minuto_ms<?" in piano
+    finally:
+        database.close_connection()
+
+
+def test_match_summary_backfilled(tmp_path, monkeypatch):
+    from core import database
+
+    path = tmp_path / "v4.db"
+    monkeypatch.setattr(database, "DB_NAME", str(path))
+    try:
+        for migrazione in migrations.MIGRATIONS[:4]:
+            with database.transaction() as c:
+                migrazione(c)
+        conn = database.get_connection()
+        conn.execute("PRAGMA user_version = 4")
+        conn.executemany(
+            "INSERT INTO eventi (match_id, minuto_ms, esito) VALUES (?, ?, ?)",
+            [(1, 1000, "Positivo"), (1, 9000, "Positivo"), (1, None, None), (2, 5, "")],
+        )
+
+        database.init_db()
+        assert conn.execute(
+            "SELECT match_id, n_eventi, max_minuto_ms FROM match_summary"
+        ).fetchall() == [(1, 3, 9000), (2, 1, 5)]
+        assert conn.execute(
+            "SELECT valore, n FROM match_summary_conteggi "
+            "WHERE match_id=1 AND campo='esito' ORDER BY valore"
+        ).fetchall() == [("", 1), ("Positivo", 2)]
+    finally:
+        database.close_connection()
+
+
+def test_content_hash_backfilled(tmp_path, monkeypatch):
+    from core import database
+    from core.utils import hash_evento
+
+    monkeypatch.setattr(database, "DB_NAME", str(tmp_path / "v5.db"))
+    try:
+        for migrazione in migrations.MIGRATIONS[:5]:
+            with database.transaction() as c:
+                migrazione(c)
+        conn = database.get_connection()
+        conn.execute("PRAGMA user_version = 5")
+        conn.execute("INSERT INTO eventi (data, minuto) VALUES ('01/03/2025', '1:00')")
+
+        database.init_db()
+        assert conn.execute("SELECT hash_contenuto FROM eventi").fetchone() == (
+            hash_evento({"data": "01/03/2025", "minuto": "1:00"}),
+        )
+        assert "idx_eventi_hash" in _piano(
+            conn, "SELECT 1 FROM eventi WHERE hash_contenuto=?", ("x",)
+        )
+    finally:
+        database.close_connection()
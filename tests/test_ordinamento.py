@@ -0,0 +1,64 @@
+import random
+
+from core.models import Evento
+from core.ordinamento import chiave_ordinamento, ordina
+
+
+def _ordinati(eventi, *criteri):
+    chiavi = [
+        ([chiave_ordinamento(campo)(e) for e in eventi], discendente)
+        for campo, discendente in criteri
+    ]
+    return [eventi[i].id for i in ordina(len(eventi), chiavi)]
+
+
+def test_match_time_sorts_as_time_not_text():
+    eventi = [
+        Evento(id=1, minuto="10:05"),
+        Evento(id=2, minuto="2:30"),
+        Evento(id=3, minuto="3"),
+        Evento(id=4, minuto="1:23", minuto_ms=83000),
+    ]
+    assert _ordinati(eventi, ("minuto", False)) == [4, 2, 3, 1]
+
+
+def test_numbers_dates_and_categories():
+    eventi = [
+        Evento(id=1, num_fasi=10, data="02/03/2025", zona="22A"),
+        Evento(id=2, num_fasi=9, data="15/02/2025", zona="22D"),
+        Evento(id=3, num_fasi=None, data="01/03/2025", zona="50A"),
+    ]
+    assert _ordinati(eventi, ("num_fasi", False)) == [3, 2, 1]
+    assert _ordinati(eventi, ("data", False)) == [2, 3, 1]
+    # zona follows the form order 22D, 50D, 50A, 22A
+    assert _ordinati(eventi, ("zona", False)) == [2, 3, 1]
+
+
+def test_multi_column_sort_is_stable():
+    eventi = [
+        Evento(id=1, esito="Positivo", num_fasi=2),
+        Evento(id=2, esito="Negativo", num_fasi=5),
+        Evento(id=3, esito="Positivo", num_fasi=5),
+        Evento(id=4, esito="Positivo", num_fasi=2),
+    ]
+    ordine = _ordinati(eventi, ("esito", False), ("num_fasi", True))
+    assert ordine == [2, 3, 1, 4]
+    # descending primary key keeps ties in their original order
+    assert _ordinati(eventi, ("num_fasi", True)) == [2, 3, 1, 4]
+
+
+def test_sorts_50k_rows():
+    rnd = random.Random(1)
+    eventi = [
+        Evento(id=i, minuto_ms=rnd.randint(0, 80 * 60000), num_fasi=rnd.randint(0, 12))
+        for i in range(50000)
+    ]
+    chiavi = [
+        ([chiave_ordinamento("num_fasi")(e) for e in eventi], True),
+        ([chiave_ordinamento("minuto")(e) for e in eventi], False),
+    ]
+    ordine = ordina(len(eventi), chiavi)
+    attesi = sorted(
+        range(50000), key=lambda i: (-eventi[i].num_fasi, eventi[i].minuto_ms)
+    )
+    assert ordine == attesi
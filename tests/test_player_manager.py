@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QWidget  # noqa: E402
+
+from app.ui.player_manager import PlayerManager  # noqa: E402
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class _Player(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.url, self.ms, self.playing = "", 0, False
+        self.sospeso = False
+        self.caricamenti = 0
+
+    def set_url(self, url, start_ms=0):
+        self.url, self.ms = url, start_ms
+        self.caricamenti += 1
+
+    def play(self):
+        self.playing = True
+
+    def get_current_url(self):
+        return self.url
+
+    def current_time_ms(self):
+        return self.ms
+
+    def is_playing(self):
+        return self.playing
+
+    def sospendi(self):
+        self.sospeso, self.playing = True, False
+
+    def riprendi(self, ms, avvia=False):
+        self.sospeso, self.ms, self.playing = False, ms, avvia
+        return True
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    # keep a reference: a collected QApplication makes the next widget abort
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+@pytest.fixture
+def manager(qapp):
+    creati = []
+
+    def crea(mode):
+        creati.append(mode)
+        return _Player()
+
+    gestore = PlayerManager(crea)
+    gestore.creati = creati
+    return gestore
+
+
+def test_players_are_built_once_and_kept(manager):
+    embed = manager.mostra("embed")
+    stream = manager.passa_a("stream")
+    assert manager.passa_a("embed") is embed
+    assert manager.passa_a("stream") is stream
+    assert manager.creati == ["embed", "stream"]
+    assert manager.currentWidget() is stream
+
+
+def test_switch_carries_url_position_and_playback(manager):
+    embed = manager.mostra("embed")
+    embed.set_url(VIDEO, 90_000)
+    embed.play()
+    stream = manager.passa_a("stream")
+    assert embed.sospeso
+    assert (stream.url, stream.ms, stream.playing) == (VIDEO, 90_000, True)
+
+    stream.ms = 125_000
+    manager.passa_a("embed")
+    # same video: resumed in place, not loaded again
+    assert embed.caricamenti == 1
+    assert (embed.ms, embed.playing, embed.sospeso) == (125_000, True, False)
+    assert stream.sospeso
+
+
+def test_default_url_only_without_a_current_video(manager):
+    stream = manager.passa_a("stream", url_predefinito=VIDEO)
+    assert (stream.url, stream.ms, stream.playing) == (VIDEO, 0, False)
+    vuoto = PlayerManager(lambda mode: _Player())
+    assert vuoto.passa_a("embed").url == ""
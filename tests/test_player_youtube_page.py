@@ -0,0 +1,31 @@
+import os
+import re
+
+PAGINA = os.path.join(
+    os.path.dirname(__file__), "..", "app", "ui", "player_youtube.html"
+)
+SORGENTE = os.path.join(
+    os.path.dirname(__file__), "..", "app", "ui", "video_player_embed.py"
+)
+
+
+def _leggi(percorso):
+    with open(percorso, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_page_defines_every_function_the_player_calls():
+    pagina = _leggi(PAGINA)
+    definite = set(re.findall(r"function (\w+)\(", pagina))
+    chiamate = set(re.findall(r'_esegui\("(\w+)"', _leggi(SORGENTE)))
+    chiamate |= set(re.findall(r'runJavaScript\("(\w+)\(', _leggi(SORGENTE)))
+    assert chiamate
+    assert chiamate <= definite
+
+
+def test_page_reports_through_the_ponte_object():
+    pagina = _leggi(PAGINA)
+    assert "canale.objects.ponte" in pagina
+    for slot in ("onReady", "onStateChange", "onError", "onTime"):
+        assert f"ponte.{slot}(" in pagina
+        assert f"def {slot}(" in _leggi(SORGENTE)
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6.QtCore")
+
+from core.stream_cache import StreamCache  # noqa: E402
+from PyQt6.QtCore import QCoreApplication  # noqa: E402
+from core.stream_resolver import StreamResolver  # noqa: E402
+
+from app.ui.precaricatore_video import PrecaricatoreVideo  # noqa: E402
+
+URLS = [
+    "https://www.youtube.com/watch?v=aaaaaaaaaaa",
+    "https://youtu.be/aaaaaaaaaaa",  # same video
+    "https://vimeo.com/1",  # not cached: skipped
+    "https://youtu.be/errore00000",
+    "https://youtu.be/bbbbbbbbbbb",
+]
+
+
+def _estrai(url):
+    if "errore" in url:
+        raise RuntimeError("video non disponibile")
+    return f"https://stream/{url}"
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    yield app
+
+
+def test_resolves_each_video_once_and_reports_progress(qapp):
+    cache = StreamCache(percorso=False)
+    resolver = StreamResolver(_estrai, cache=cache)
+    precaricatore = PrecaricatoreVideo(lambda match_id: URLS, resolver=resolver)
+    avanzamento, completato = [], []
+    precaricatore.avanzamento.connect(lambda *a: avanzamento.append(a))
+    precaricatore.completato.connect(lambda *a: completato.append(a))
+
+    precaricatore.esegui(precaricatore.generazione, 1)
+    # signals from the resolver thread are queued: deliver them
+    for _ in range(500):
+        qapp.processEvents()
+        if completato:
+            break
+        time.sleep(0.01)
+    resolver.chiudi()
+
+    g = precaricatore.generazione
+    assert avanzamento[0] == (g, 0, 3)
+    assert sorted(avanzamento[1:]) == [(g, 1, 3), (g, 2, 3), (g, 3, 3)]
+    assert completato == [(g, 2, 1)]
+    assert cache.get(URLS[1]) == f"https://stream/{URLS[0]}"
+    assert len(cache) == 2
+
+
+def test_stale_generation_submits_nothing():
+    chiamate = []
+    resolver = StreamResolver(lambda url: chiamate.append(url) or "x")
+    precaricatore = PrecaricatoreVideo(lambda match_id: URLS, resolver=resolver)
+    vecchia = precaricatore.generazione
+    precaricatore.annulla()
+    precaricatore.esegui(vecchia, 1)
+    resolver.chiudi()
+    assert chiamate == []
@@ -0,0 +1,281 @@
+import pytest
+
+from core import services
+from core.utils import data_iso
+
+
+def test_salva_eventi_batch_returns_ids_in_order(db, evento):
+    services.salva_evento(evento())
+    eventi = (evento(giocatore=f"G{i}") for i in range(25))
+    ids = services.salva_eventi_batch(eventi, chunk_size=10)
+
+    assert len(ids) == 25
+    conn = db.get_connection()
+    for evento_id, i in zip(ids, range(25)):
+        giocatore = conn.execute(
+            "SELECT giocatore FROM eventi WHERE id=?", (evento_id,)
+        ).fetchone()[0]
+        assert giocatore == f"G{i}"
+
+
+def test_salva_eventi_batch_sets_match_id(db, evento):
+    ids = services.salva_eventi_batch([evento(match_id=7), evento(match_id=7)])
+    righe = services.lista_eventi_per_match(7)
+    assert [r.id for r in righe] == sorted(ids, reverse=True)
+
+
+def test_modifica_eventi_batch(db, evento):
+    ids = services.salva_eventi_batch([evento() for _ in range(5)])
+    aggiornati = services.modifica_eventi_batch(
+        evento(id=evento_id, esito="Negativo") for evento_id in ids[:3]
+    )
+    assert aggiornati == 3
+    esiti = db.get_connection().execute(
+        "SELECT esito, COUNT(*) FROM eventi GROUP BY esito ORDER BY esito"
+    ).fetchall()
+    assert esiti == [("Negativo", 3), ("Positivo", 2)]
+
+
+def test_minuto_ms_filled_on_insert_and_update(db, evento):
+    evento_id = services.salva_evento(evento(minuto="1:23"))
+    conn = db.get_connection()
+    sql = "SELECT minuto_ms FROM eventi WHERE id=?"
+    assert conn.execute(sql, (evento_id,)).fetchone() == (83000,)
+    services.modifica_evento(evento_id, evento(minuto="20"))
+    assert conn.execute(sql, (evento_id,)).fetchone() == (1200000,)
+
+
+def test_lista_eventi_intervallo(db, evento):
+    minuti = ["5:00", "19:59", "20:00", "31:10", "40:00", "40:01"]
+    services.salva_eventi_batch(evento(minuto=m, match_id=1) for m in minuti)
+    services.salva_evento(evento(minuto="30:00", match_id=2))
+
+    righe = services.lista_eventi_intervallo(1, 20 * 60_000, 40 * 60_000)
+    assert [r.minuto for r in righe] == ["20:00", "31:10", "40:00"]
+
+
+def test_pagina_eventi_per_match_keyset(db, evento):
+    ids = services.salva_eventi_batch(evento(match_id=1) for _ in range(7))
+    services.salva_evento(evento(match_id=2))
+
+    prima = services.pagina_eventi_per_match(1, limit=3, colonne=["minuto"])
+    assert [(r.id, r.minuto) for r in prima] == [
+        (i, "12:30") for i in sorted(ids, reverse=True)[:3]
+    ]
+    assert prima[0].esito is None  # not selected
+    seconda = services.pagina_eventi_per_match(1, after_id=prima[-1].id, limit=3)
+    assert [r.id for r in seconda] == sorted(ids, reverse=True)[3:6]
+
+
+def test_itera_eventi_matches_lista(db, evento):
+    services.salva_eventi_batch(evento(match_id=1) for _ in range(11))
+    lazy = services.itera_eventi_per_match(1, page_size=4)
+    assert list(lazy) == services.lista_eventi_per_match(1)
+
+    filtrati = services.itera_eventi_filtrati(
+        "01/03/2025", "Rovigo", "Petrarca", "15:00", colonne=["id"], page_size=5
+    )
+    assert len(list(filtrati)) == 11
+
+
+def test_pagina_rejects_unknown_columns(db):
+    with pytest.raises(ValueError):
+        services.pagina_eventi_per_match(1, colonne=["id; DROP TABLE eventi"])
+
+
+def test_cerca_eventi_ranked_and_synced(db, evento):
+    placcaggio = services.salva_evento(
+        evento(commento="Missed tackle sul 10, buco al centro", match_id=1)
+    )
+    services.salva_evento(evento(commento="Tackle ok", match_id=2))
+    services.salva_evento(evento(commento="Touche rubata", giocatore="Tackleton"))
+
+    assert [r.id for r in services.cerca_eventi("missed tackle")] == [placcaggio]
+    # prefix match on the last word, accents/case folded
+    assert len(services.cerca_eventi("tackl")) == 3
+    assert len(services.cerca_eventi("tackle", match_id=2)) == 1
+    # FTS syntax in user input is treated as plain text
+    assert services.cerca_eventi('tackle" OR NOT (') == []
+
+    services.modifica_evento(placcaggio, evento(commento="Placcaggio mancato"))
+    assert services.cerca_eventi("missed") == []
+    assert [r.id for r in services.cerca_eventi("placcaggio")] == [placcaggio]
+    services.elimina_evento(placcaggio)
+    assert services.cerca_eventi("placcaggio") == []
+
+
+def test_large_batches_are_indexed_without_the_trigger(db, evento, monkeypatch):
+    monkeypatch.setattr(services, "FTS_IN_BLOCCO", 3)
+    ids = services.salva_eventi_batch(
+        [evento(commento=f"mischia {i}") for i in range(4)], chunk_size=2
+    )
+    ids += services.salva_eventi_batch([evento(commento="mischia")] * 3)
+    assert sorted(r.id for r in services.cerca_eventi("mischia")) == sorted(ids)
+    # the trigger is back: single inserts are indexed again
+    evento_id = services.salva_evento(evento(commento="maul"))
+    assert [r.id for r in services.cerca_eventi("maul")] == [evento_id]
+
+
+def test_cerca_eventi_ranks_every_hit_of_a_match(db, evento, monkeypatch):
+    migliore = services.salva_evento(evento(commento="tackle tackle", match_id=1))
+    eventi = []
+    for i in range(3000):
+        eventi.append(evento(commento="tackle e altro testo", match_id=2))
+        if i % 500 == 0:
+            eventi.append(evento(commento="tackle alto", match_id=1))
+    services.salva_eventi_batch(eventi)
+
+    # the match's hits are interleaved with thousands of other matches' hits
+    trovati = services.cerca_eventi("tackle", match_id=1)
+    assert len(trovati) == 7
+    assert {e.match_id for e in trovati} == {1}
+    # within the match the oldest event is still the best one
+    assert trovati[0].id == migliore
+    # unscoped, only the most recent CANDIDATI_RICERCA hits are ranked
+    assert services.cerca_eventi("tackle", limit=1)[0].id != migliore
+    monkeypatch.setattr(services, "CANDIDATI_RICERCA", 5000)
+    assert services.cerca_eventi("tackle", limit=1)[0].id == migliore
+
+
+def test_statistiche_match_group_by(db, evento):
+    services.salva_eventi_batch(
+        [
+            evento(match_id=1, evento_principale="Turnover", zona="22A", num_fasi=2),
+            evento(match_id=1, evento_principale="Turnover", zona="22A", num_fasi=4),
+            evento(match_id=1, evento_principale="Turnover", zona="50D", num_fasi=1),
+            evento(match_id=1, evento_principale="Ruck", zona="22A", num_fasi=0),
+            evento(match_id=2, evento_principale="Turnover", zona="22A", num_fasi=9),
+        ]
+    )
+    righe = services.statistiche_match(
+        1, group_by=["evento_principale", "zona"], metrics=["count", "avg:num_fasi"]
+    )
+    assert list(righe[0]) == ["evento_principale", "zona", "count", "avg_num_fasi"]
+    assert [tuple(r.values()) for r in righe] == [
+        ("Ruck", "22A", 1, 0.0),
+        ("Turnover", "22A", 2, 3.0),
+        ("Turnover", "50D", 1, 1.0),
+    ]
+    assert services.statistiche_match(1, group_by=[]) == [{"count": 4}]
+
+
+def test_statistiche_match_rejects_unknown_columns(db):
+    with pytest.raises(ValueError):
+        services.statistiche_match(1, group_by=["commento"])
+    with pytest.raises(ValueError):
+        services.statistiche_match(1, metrics=["avg:commento"])
+    with pytest.raises(ValueError):
+        services.statistiche_match(1, metrics=["median:num_fasi"])
+
+
+def _riepilogo_ricalcolato(match_id):
+    from core.database import transaction
+
+    with transaction() as c:
+        c.execute(
+            "SELECT COUNT(*), MAX(minuto_ms) FROM eventi WHERE match_id=?", (match_id,)
+        )
+        n, massimo = c.fetchone()
+        esiti = dict(
+            c.execute(
+                "SELECT esito, COUNT(*) FROM eventi WHERE match_id=? GROUP BY esito",
+                (match_id,),
+            ).fetchall()
+        )
+    return n, massimo, esiti
+
+
+def test_riepilogo_match_follows_writes(db, evento):
+    from core.database import transaction
+
+    ids = services.salva_eventi_batch(
+        [
+            evento(match_id=1, minuto="10:00", esito="Positivo"),
+            evento(match_id=1, minuto="55:00", esito="Negativo"),
+            evento(match_id=1, minuto="20:00", esito="Positivo"),
+            evento(match_id=2, minuto="05:00"),
+        ]
+    )
+    services.modifica_evento(ids[0], evento(match_id=1, esito="Neutro"))
+    with transaction() as c:
+        c.execute("UPDATE eventi SET match_id=2 WHERE id=?", (ids[1],))
+    services.elimina_evento(ids[2])
+
+    for match_id in (1, 2):
+        r = services.riepilogo_match(match_id)
+        n, massimo, esiti = _riepilogo_ricalcolato(match_id)
+        assert (r["n_eventi"], r["max_minuto_ms"], r["esito"]) == (n, massimo, esiti)
+    assert services.riepilogo_match(1)["esito"] == {"Neutro": 1}
+    assert services.riepilogo_match(2)["max_minuto_ms"] == 55 * 60000
+    assert services.riepilogo_match(99)["n_eventi"] == 0
+
+
+def test_lista_matches_includes_event_count(db, evento):
+    match_id = services.salva_match(
+        {"name": "M", "data": "01/03/2025", "squadra_home": "A", "squadra_away": "B"}
+    )
+    services.salva_eventi_batch([evento(match_id=match_id)] * 3)
+    assert services.lista_matches()[0][5] == 3
+
+    services.elimina_match(match_id)
+    assert services.riepilogo_match(match_id)["n_eventi"] == 0
+
+
+def test_rows_decode_to_evento_by_column_name(db, evento):
+    from core.models import Evento
+
+    evento_id = services.salva_evento(
+        evento(match_id=3, minuto="1:02", video_url="https://youtu.be/abc")
+    )
+    (riga,) = services.lista_eventi_per_match(3)
+    assert isinstance(riga, Evento)
+    assert (riga.id, riga.video_url, riga.match_id, riga.minuto_ms) == (
+        evento_id,
+        "https://youtu.be/abc",
+        3,
+        62000,
+    )
+    (parziale,) = services.pagina_eventi_per_match(3, colonne=["esito", "minuto"])
+    assert (parziale.id, parziale.esito) == (evento_id, "Positivo")
+    assert parziale.video_url is None
+
+
+def test_video_urls_match_distinct_match_first(db, evento):
+    match_id = services.salva_match(
+        {"name": "M", "data": "01/03/2025", "video_url": "https://youtu.be/m"}
+    )
+    services.salva_eventi_batch(
+        [
+            evento(match_id=match_id, video_url="https://youtu.be/b"),
+            evento(match_id=match_id, video_url=""),
+            evento(match_id=match_id, video_url="https://youtu.be/a"),
+            evento(match_id=match_id, video_url="https://youtu.be/b"),
+            evento(match_id=match_id, video_url="https://youtu.be/m"),
+            evento(match_id=match_id + 1, video_url="https://youtu.be/altro"),
+        ]
+    )
+    assert services.video_urls_match(match_id) == [
+        "https://youtu.be/m",
+        "https://youtu.be/b",
+        "https://youtu.be/a",
+    ]
+    assert services.video_urls_match(match_id + 1) == ["https://youtu.be/altro"]
+
+
+def test_righe_eventi_holds_no_transaction_between_blocks(db, evento):
+    services.salva_eventi_batch([evento(match_id=1)] * 5 + [evento(match_id=2)])
+    righe = services.righe_eventi(["id", "match_id"], match_id=1, chunk_size=2)
+    assert next(righe)[1] == 1
+    # half consumed: the connection is free for writers and checkpoints
+    assert not db.get_connection().in_transaction
+    assert len(list(righe)) == 4
+
+
+def test_date_filters_validate_real_days(db, evento):
+    services.salva_eventi_batch([evento(data="28/02/2025"), evento(data="01/03/2025")])
+    assert services.conta_eventi(da_data="2025-03-01") == 1
+    assert services.conta_eventi(a_data="28.02.2025") == 1
+    # the importer rejects the same impossible day (see utils.leggi_data)
+    assert data_iso("31/02/2025") is None
+    with pytest.raises(ValueError, match="data non valida"):
+        services.conta_eventi(da_data="31/02/2025")
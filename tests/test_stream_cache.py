@@ -0,0 +1,90 @@
+import json
+
+from core.stream_cache import SCADENZA_MARGINE, StreamCache, id_video, scadenza_stream
+from core.stream_resolver import StreamResolver
+
+VIDEO = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+BREVE = "https://youtu.be/dQw4w9WgXcQ"
+ALTRO = "https://www.youtube.com/watch?v=aaaaaaaaaaa"
+
+
+class _Orologio:
+    def __init__(self, adesso=1_000_000):
+        self.adesso = adesso
+
+    def __call__(self):
+        return self.adesso
+
+
+def _stream(scadenza):
+    return f"https://rr1.googlevideo.com/videoplayback?expire={scadenza}&itag=18"
+
+
+def test_keyed_by_video_id():
+    assert id_video(BREVE) == id_video(VIDEO) == "dQw4w9WgXcQ"
+    assert id_video("https://vimeo.com/1") is None
+    cache = StreamCache(percorso=False, orologio=_Orologio())
+    cache.put(VIDEO, _stream(2_000_000))
+    assert cache.get(BREVE) == _stream(2_000_000)
+    cache.put("https://vimeo.com/1", "https://x")
+    assert len(cache) == 1
+
+
+def test_honours_expire_parameter():
+    orologio = _Orologio()
+    assert scadenza_stream(_stream(1_003_600)) == 1_003_600
+    assert scadenza_stream("https://x/expire/1234/itag/18") == 1234
+    cache = StreamCache(percorso=False, orologio=orologio)
+    cache.put(VIDEO, _stream(1_003_600))
+    orologio.adesso = 1_003_600 - SCADENZA_MARGINE - 1
+    assert cache.get(VIDEO) is not None
+    orologio.adesso += 1
+    assert cache.get(VIDEO) is None
+
+
+def test_lru_eviction():
+    cache = StreamCache(percorso=False, capacita=2, orologio=_Orologio())
+    cache.put(VIDEO, _stream(2_000_000))
+    cache.put(ALTRO, _stream(2_000_000))
+    cache.get(VIDEO)  # ALTRO is now the least recently used
+    cache.put("https://youtu.be/bbbbbbbbbbb", _stream(2_000_000))
+    assert cache.get(ALTRO) is None and cache.get(VIDEO) is not None
+
+
+def test_persists_on_disk_and_drops_expired(tmp_path):
+    percorso = tmp_path / "sub" / "stream_cache.json"
+    orologio = _Orologio()
+    cache = StreamCache(percorso=str(percorso), orologio=orologio)
+    cache.put(VIDEO, _stream(2_000_000))
+    cache.put(ALTRO, _stream(1_000_100))  # expires within the margin
+    assert set(json.loads(percorso.read_text())) == {"dQw4w9WgXcQ", "aaaaaaaaaaa"}
+
+    riaperta = StreamCache(percorso=str(percorso), orologio=orologio)
+    assert riaperta.get(VIDEO) == _stream(2_000_000)
+    assert riaperta.get(ALTRO) is None
+    riaperta.invalida(VIDEO)
+    assert StreamCache(percorso=str(percorso), orologio=orologio).get(VIDEO) is None
+
+
+def test_corrupt_file_is_an_empty_cache(tmp_path):
+    percorso = tmp_path / "stream_cache.json"
+    percorso.write_text("{non json")
+    assert StreamCache(percorso=str(percorso)).get(VIDEO) is None
+
+
+def test_resolver_extracts_once_per_video():
+    chiamate = []
+
+    def estrai(url):
+        chiamate.append(url)
+        return _stream(9_999_999_999)
+
+    resolver = StreamResolver(estrai, cache=StreamCache(percorso=False))
+    assert resolver.risolvi(VIDEO).result(5) == _stream(9_999_999_999)
+    veloce = resolver.risolvi(BREVE)
+    assert veloce.done() and veloce.result() == _stream(9_999_999_999)
+    assert len(chiamate) == 1
+    # a failed playback asks for a fresh extraction
+    resolver.invalida(VIDEO)
+    resolver.risolvi(VIDEO, aggiorna=True).result(5)
+    assert len(chiamate) == 2
@@ -0,0 +1,127 @@
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from core.stream_cache import StreamCache
+from core.stream_resolver import StreamResolver, seleziona_stream_url
+
+
+class _Estrattore:
+    """Fake extraction that blocks until released, recording its calls."""
+
+    def __init__(self):
+        self.chiamate = []
+        self.via = threading.Event()
+
+    def __call__(self, url):
+        self.chiamate.append(url)
+        self.via.wait(5)
+        if "errore" in url:
+            raise RuntimeError("video non disponibile")
+        return f"https://stream/{url}"
+
+
+@pytest.fixture
+def estrattore():
+    estrattore = _Estrattore()
+    yield estrattore
+    estrattore.via.set()
+
+
+def test_resolves_in_background(estrattore):
+    resolver = StreamResolver(estrattore, max_workers=1)
+    futuro = resolver.risolvi(" a ")
+    assert not futuro.done()
+    estrattore.via.set()
+    assert futuro.result(5) == "https://stream/a"
+
+
+def test_newer_request_supersedes_queued_one(estrattore):
+    resolver = StreamResolver(estrattore, max_workers=1)
+    primo = resolver.risolvi("a")  # occupies the only worker
+    secondo = resolver.risolvi("b")  # queued
+    terzo = resolver.risolvi("c")
+    assert primo.cancelled() and secondo.cancelled()
+    estrattore.via.set()
+    assert terzo.result(5) == "https://stream/c"
+    # "b" never started; "a" was already running and just got dropped
+    assert estrattore.chiamate == ["a", "c"]
+
+
+def test_same_url_shares_one_extraction(estrattore):
+    resolver = StreamResolver(estrattore, max_workers=2)
+    primo = resolver.risolvi("a")
+    resolver.annulla()
+    secondo = resolver.risolvi("a")
+    estrattore.via.set()
+    assert secondo.result(5) == "https://stream/a"
+    assert primo.cancelled()
+    assert estrattore.chiamate == ["a"]
+
+
+def test_errors_reach_the_caller(estrattore):
+    estrattore.via.set()
+    futuro = StreamResolver(estrattore).risolvi("errore")
+    with pytest.raises(RuntimeError, match="non disponibile"):
+        futuro.result(5)
+
+
+def test_shutdown_cancels_pending_requests(estrattore):
+    resolver = StreamResolver(estrattore, max_workers=1)
+    resolver.risolvi("a")  # running
+    futuro = resolver.risolvi("b")  # queued
+    resolver.chiudi()
+    with pytest.raises(CancelledError):
+        futuro.result(5)
+
+
+def test_running_prefetch_is_shared_with_risolvi(estrattore):
+    resolver = StreamResolver(estrattore, max_workers=1)
+    precarica = resolver.precarica("a")
+    while not estrattore.chiamate:  # wait for the prefetch to start
+        threading.Event().wait(0.01)
+    futuro = resolver.risolvi("a")
+    estrattore.via.set()
+    assert futuro.result(5) == precarica.result(5) == "https://stream/a"
+    assert estrattore.chiamate == ["a"]
+
+
+def test_queued_prefetch_does_not_delay_risolvi(estrattore):
+    a, b = "https://youtu.be/aaaaaaaaaaa", "https://youtu.be/bbbbbbbbbbb"
+    resolver = StreamResolver(
+        estrattore, max_workers=1, cache=StreamCache(percorso=False)
+    )
+    resolver.precarica(a)  # occupies the prefetch thread
+    in_coda = resolver.precarica(b)
+    futuro = resolver.risolvi(b)  # runs at once on the request pool
+    while len(estrattore.chiamate) < 2:
+        threading.Event().wait(0.01)
+    assert sorted(estrattore.chiamate) == [a, b]
+    estrattore.via.set()
+    assert futuro.result(5) == in_coda.result(5) == f"https://stream/{b}"
+    # the queued prefetch found b resolved or being resolved: no new extraction
+    assert sorted(estrattore.chiamate) == [a, b]
+
+
+def test_annulla_precarica_drops_queued_prefetches(estrattore):
+    resolver = StreamResolver(estrattore)
+    primo = resolver.precarica("a")
+    secondo = resolver.precarica("b")
+    resolver.annulla_precarica()
+    estrattore.via.set()
+    assert primo.result(5) == "https://stream/a"
+    assert secondo.cancelled()
+    assert estrattore.chiamate == ["a"]
+
+
+def test_selects_http_format():
+    info = {
+        "formats": [
+            {"url": "https://a", "protocol": "https"},
+            {"url": "rtmp://b", "protocol": "rtmp"},
+        ]
+    }
+    assert seleziona_stream_url(info) == "https://a"
+    assert seleziona_stream_url({"url": "https://diretto"}) == "https://diretto"
+    assert seleziona_stream_url({}) is None
@@ -0,0 +1,78 @@
+import pytest
+
+from core import services
+from core.write_behind import WriteBehindExecutor
+
+
+@pytest.fixture
+def scrittore(db):
+    executor = WriteBehindExecutor()
+    yield executor
+    executor.shutdown(timeout=5)
+
+
+def test_salva_returns_provisional_id_then_real_id(scrittore, evento):
+    id_provvisorio, future = scrittore.salva(evento(match_id=1))
+    assert id_provvisorio < 0
+    evento_id = future.result(timeout=5)
+    assert [r.id for r in services.lista_eventi_per_match(1)] == [evento_id]
+    assert scrittore.id_reale(id_provvisorio) == evento_id
+
+
+def test_updates_and_deletes_accept_provisional_ids(scrittore, evento):
+    p1, _ = scrittore.salva(evento(match_id=1, esito="Neutro"))
+    p2, _ = scrittore.salva(evento(match_id=1))
+    scrittore.modifica(p1, evento(esito="Negativo"))
+    scrittore.modifica(p1, evento(esito="Positivo"))
+    scrittore.elimina(p2)
+    scrittore.flush(timeout=5)
+
+    righe = services.pagina_eventi_per_match(1, colonne=["esito"])
+    assert [(r.id, r.esito) for r in righe] == [
+        (scrittore.id_reale(p1), "Positivo")
+    ]
+
+
+def test_failed_write_is_reported_on_future(scrittore, evento):
+    _, ok_prima = scrittore.salva(evento())
+    _, fallito = scrittore.salva({"data": "manca tutto il resto"})
+    _, ok_dopo = scrittore.salva(evento())
+    with pytest.raises(KeyError):
+        fallito.result(timeout=5)
+    # only the offending write fails, even if it shared a batch with others
+    assert ok_prima.result(timeout=5) > 0
+    assert ok_dopo.result(timeout=5) > 0
+
+
+def test_shutdown_flushes_pending_writes(db, evento):
+    executor = WriteBehindExecutor()
+    for _ in range(50):
+        executor.salva(evento(match_id=3))
+    executor.shutdown(timeout=5)
+    assert len(services.lista_eventi_per_match(3)) == 50
+    with pytest.raises(RuntimeError):
+        executor.salva(evento())
+
+
+def test_update_of_a_missing_event_fails(scrittore, evento):
+    id_fallito, salvato = scrittore.salva({"data": "manca tutto il resto"})
+    orfano = scrittore.modifica(id_fallito, evento(esito="Positivo"))
+    sparito = scrittore.modifica(999999, evento(esito="Positivo"))
+    evento_id, ok = scrittore.salva(evento(match_id=1))
+    aggiornato = scrittore.modifica(evento_id, evento(match_id=1, esito="Positivo"))
+    with pytest.raises(KeyError):
+        salvato.result(timeout=5)
+    with pytest.raises(LookupError, match="non salvato"):
+        orfano.result(timeout=5)
+    with pytest.raises(LookupError, match="non trovati"):
+        sparito.result(timeout=5)
+    # the other writes of the batch still go through
+    assert aggiornato.result(timeout=5) == ok.result(timeout=5)
+    assert [r.esito for r in services.lista_eventi_per_match(1)] == ["Positivo"]
+
+
+def test_flush_async_does_not_block(scrittore, evento):
+    scrittore.salva(evento(match_id=4))
+    fatto = scrittore.flush_async()
+    fatto.result(timeout=5)
+    assert len(services.lista_eventi_per_match(4)) == 1